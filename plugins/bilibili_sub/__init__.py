@@ -1,8 +1,6 @@
 import asyncio
 import time
 from datetime import datetime
-from pathlib import Path
-from typing import cast
 
 import nonebot
 from nonebot.drivers import Driver
@@ -12,27 +10,33 @@ from nonebot_plugin_alconna import UniMessage
 from nonebot_plugin_apscheduler import scheduler
 from zhenxun.configs.config import Config
 from zhenxun.configs.utils import PluginExtraData, RegisterConfig
-from zhenxun.models.group_console import GroupConsole
 from zhenxun.services.log import logger
-from zhenxun.utils.message import MessageUtils
 from zhenxun.utils.platform import PlatformUtils
 
 from . import commands as commands
 from .config import (
-    AVATAR_CACHE_DIR,
-    BANGUMI_COVER_CACHE_DIR,
+    LIVE_WS_CONSISTENCY_INTERVAL,
+    LIVE_WS_RECHECK_DELAY,
     base_config,
     check_and_refresh_credential,
     load_credential_from_file,
 )
 from .data_source import (
     BiliSub,
-    BiliSubTarget,
     Notification,
     NotificationType,
     _get_bangumi_status,
+    _get_live_status,
     get_sub_status,
 )
+from .image_cache import avatar_cache, bangumi_cover_cache
+from .live_ws import live_ws_monitor
+from .metrics import poll_metrics
+from .poll_scheduler import poll_scheduler
+from .push_dispatcher import PRIORITY_LIVE, PRIORITY_NORMAL, push_dispatcher
+from .push_router import push_router
+from .screenshot_pool import dynamic_page_pool
+from .utils import fetch_cycle, prefetch_live_status
 
 __plugin_meta__ = PluginMetadata(
     name="B站订阅",
@@ -81,6 +85,7 @@ __plugin_meta__ = PluginMetadata(
     - 是否开启B站订阅定时休眠
     - 是否开启广告过滤
     - 是否推送动态中的图片
+    - 是否通过直播信息流 websocket 实时接收开播事件
 
 """.strip(),
     extra=PluginExtraData(
@@ -101,6 +106,8 @@ __plugin_meta__ = PluginMetadata(
 *   `B站订阅 退出登录`: 清除已保存的B站凭证，退出登录。
 *   `B站订阅 检查`: 立即对所有已订阅的项目进行一次更新检查。
 *   `B站订阅 补发 <ID...>`: 强制推送指定ID订阅的最新内容，无论之前是否已推送。
+*   `B站订阅 统计`: 查看轮询周期耗时、检查最慢的订阅、API错误数、推送延迟与各缓存命中情况。
+*   `B站订阅 模拟 [订阅数] [小时数]`: 使用当前配置在本地伪造的接口上模拟轮询，对比自适应调度与旧的轮转策略的请求量和推送延迟。
 """.strip(),
         configs=[
             RegisterConfig(
@@ -163,10 +170,58 @@ __plugin_meta__ = PluginMetadata(
                 module="bilibili_sub",
                 key="BATCH_SIZE",
                 value=8,
-                help="每次检查的订阅批次大小",
+                help="每次检查最多处理的到期订阅数量",
                 default_value=8,
                 type=int,
             ),
+            RegisterConfig(
+                module="bilibili_sub",
+                key="MAX_CHECK_INTERVAL",
+                value=180,
+                help="不活跃订阅的最大检测间隔（分钟），活跃订阅按 CHECK_TIME 检测",
+                default_value=180,
+                type=int,
+            ),
+            RegisterConfig(
+                module="bilibili_sub",
+                key="REQUEST_BUDGET_PER_MINUTE",
+                value=20,
+                help="订阅检测每分钟最多发出的B站API请求数（全局预算）",
+                default_value=20,
+                type=int,
+            ),
+            RegisterConfig(
+                module="bilibili_sub",
+                key="ENABLE_LIVE_WEBSOCKET",
+                value=False,
+                help="通过直播信息流websocket实时接收开播/下播事件，轮询仅作为低频校验",
+                default_value=False,
+                type=bool,
+            ),
+            RegisterConfig(
+                module="bilibili_sub",
+                key="LIVE_WS_URL",
+                value="",
+                help="直播信息流websocket地址，留空时自动获取（可指向本地测试服务器或中转）",
+                default_value="",
+                type=str,
+            ),
+            RegisterConfig(
+                module="bilibili_sub",
+                key="PUSH_RATE_PER_MINUTE",
+                value=600,
+                help="订阅推送每分钟最多发送的消息数，按 OneBot 后端的承受能力调整",
+                default_value=600,
+                type=int,
+            ),
+            RegisterConfig(
+                module="bilibili_sub",
+                key="PUSH_BURST",
+                value=10,
+                help="订阅推送允许的瞬时突发消息数",
+                default_value=10,
+                type=int,
+            ),
             RegisterConfig(
                 module="bilibili_sub",
                 key="CACHE_TTL_DAYS",
@@ -205,39 +260,31 @@ __plugin_meta__ = PluginMetadata(
 driver: Driver = nonebot.get_driver()
 
 
-_current_sub_index = 0
-_subs_lock = asyncio.Lock()
-
-
 @driver.on_startup
 async def _():
     await load_credential_from_file()
+    # 后台预热动态截图页面，避免首次截图时才启动浏览器上下文
+    dynamic_page_pool.start_warm_up()
+
+
+@driver.on_shutdown
+async def _close_dynamic_page_pool():
+    await dynamic_page_pool.close()
+
+
+@driver.on_shutdown
+async def _stop_live_websocket():
+    await live_ws_monitor.stop()
 
 
 @scheduler.scheduled_job("cron", hour=4, minute=0)
 async def cleanup_bilibili_sub_cache():
-    """定时清理B站订阅插件的图片缓存"""
+    """定时清理B站订阅插件长期未使用的图片缓存（基于缓存索引，不扫描目录）"""
     logger.info("开始执行B站订阅缓存清理任务...")
     ttl_days = base_config.get("CACHE_TTL_DAYS", 30)
     ttl_seconds = ttl_days * 24 * 60 * 60
-    now = time.time()
-    deleted_count = 0
-
-    async def clean_dir(directory: Path):
-        nonlocal deleted_count
-        if not directory.exists():
-            return
-        for f in directory.iterdir():
-            if f.is_file():
-                try:
-                    if now - f.stat().st_mtime > ttl_seconds:
-                        f.unlink()
-                        deleted_count += 1
-                except OSError as e:
-                    logger.warning(f"删除缓存文件 {f} 失败: {e}")
-
-    await clean_dir(AVATAR_CACHE_DIR)
-    await clean_dir(BANGUMI_COVER_CACHE_DIR)
+    deleted_count = avatar_cache.evict_expired(ttl_seconds)
+    deleted_count += bangumi_cover_cache.evict_expired(ttl_seconds)
 
     logger.info(f"B站订阅缓存清理完成，共删除 {deleted_count} 个过期文件。")
 
@@ -247,6 +294,8 @@ async def _check_and_send_update(
 ) -> int:
     """检查单个订阅并发送更新"""
     update_count = 0
+    check_start = time.monotonic()
+    checked = False
     try:
         logger.info(f"B站订阅检查任务开始检测: UID={sub.uid}, 名称={sub.uname}")
 
@@ -260,6 +309,8 @@ async def _check_and_send_update(
             notifications = await asyncio.wait_for(
                 get_sub_status(sub, force_push=force_push), timeout=30
             )
+        poll_metrics.record_check(sub.uid, time.monotonic() - check_start)
+        checked = True
 
         if notifications:
             logger.info(
@@ -278,9 +329,67 @@ async def _check_and_send_update(
         import traceback
 
         logger.debug(f"B站订阅检查任务异常详细信息:\n{traceback.format_exc()}")
+    if not checked:
+        poll_metrics.record_check(sub.uid, time.monotonic() - check_start, error=True)
     return update_count
 
 
+async def _check_and_send_live_update(sub: BiliSub, bot: Bot) -> int:
+    """仅检查直播状态并发送开播通知，直播状态已在本轮批量获取"""
+    try:
+        notifications = await asyncio.wait_for(_get_live_status(sub), timeout=30)
+        for notification in notifications:
+            await send_sub_msg(notification, sub, bot)
+        return len(notifications)
+    except TimeoutError:
+        logger.error(f"B站订阅直播检查超时: UID={sub.uid}, 名称={sub.uname}")
+    except Exception as e:
+        logger.error(
+            f"B站订阅直播检查异常: UID={sub.uid}, 错误类型={type(e).__name__}, 错误信息={e}"
+        )
+        import traceback
+
+        logger.debug(f"B站订阅直播检查异常详细信息:\n{traceback.format_exc()}")
+    return 0
+
+
+async def _on_live_ws_event(room_id: int, cmd: str):
+    """收到直播间 LIVE/PREPARING 事件时，立即执行与轮询相同的直播检查与推送"""
+    if base_config.get("ENABLE_SLEEP_MODE") and not should_run():
+        return
+    bot_instance = PlatformUtils.resolve_bot(
+        platform_scope="qq_client",
+        log_cmd="bilibili_sub",
+    )
+    if not bot_instance:
+        logger.warning("B站订阅直播事件未找到唯一可用的 OneBot 协议端 Bot")
+        return
+    sub = await BiliSub.get_or_none(room_id=room_id)
+    if not sub or not sub.push_live:
+        return
+    if await _check_and_send_live_update(sub, bot_instance):
+        return
+    if cmd == "LIVE" and sub.live_status != 1:
+        # 开播事件可能早于直播间接口的状态更新，稍后再确认一次
+        await asyncio.sleep(LIVE_WS_RECHECK_DELAY)
+        await _check_and_send_live_update(sub, bot_instance)
+
+
+_last_live_consistency_check = 0.0
+live_ws_monitor.handler = _on_live_ws_event
+
+
+def _select_live_polls(live_subs: list[BiliSub]) -> list[BiliSub]:
+    """websocket 模式下只轮询未连接的直播间，已连接的按校验间隔低频轮询"""
+    global _last_live_consistency_check
+    live_ws_monitor.sync(sub.room_id for sub in live_subs)
+    now = time.monotonic()
+    if now - _last_live_consistency_check >= LIVE_WS_CONSISTENCY_INTERVAL:
+        _last_live_consistency_check = now
+        return live_subs
+    return [sub for sub in live_subs if not live_ws_monitor.is_connected(sub.room_id)]
+
+
 def should_run():
     """判断当前时间是否在运行时间段内"""
     time_range_str = Config.get_config(
@@ -317,7 +426,6 @@ semaphore = asyncio.Semaphore(200)
 )
 async def check_subscriptions():
     """定时任务：检查订阅并发送消息"""
-    global _current_sub_index
     start_time = time.time()
     logger.debug(
         f"B站订阅检查任务开始执行 - 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
@@ -341,39 +449,58 @@ async def check_subscriptions():
         try:
             await check_and_refresh_credential()
 
-            total_subs = await BiliSub.all().count()
-
-            if total_subs == 0:
+            await poll_scheduler.sync()
+            if len(poll_scheduler) == 0:
                 logger.debug("B站订阅检查：数据库中没有订阅，跳过本次检查。")
                 return
 
-            batch_size = base_config.get("BATCH_SIZE", 5)
-            batch_to_check = []
-
-            async with _subs_lock:
-                start_index = _current_sub_index
-                end_index = start_index + batch_size
-
-                batch_to_check = (
-                    await BiliSub.all().offset(start_index).limit(batch_size)
+            live_subs = await BiliSub.filter(
+                uid__gt=0, push_live=True, room_id__isnull=False
+            )
+            if base_config.get("ENABLE_LIVE_WEBSOCKET", False):
+                live_subs = _select_live_polls(live_subs)
+            else:
+                await live_ws_monitor.stop()
+
+            with fetch_cycle():
+                live_requests = await prefetch_live_status(
+                    [sub.uid for sub in live_subs]
                 )
 
-                _current_sub_index = end_index if end_index < total_subs else 0
-
+                check_minutes = max(1, base_config.get("CHECK_TIME", 15))
+                request_budget = (
+                    base_config.get("REQUEST_BUDGET_PER_MINUTE", 20) * check_minutes
+                    - live_requests
+                )
+                due_ids = poll_scheduler.pop_due(
+                    max_count=base_config.get("BATCH_SIZE", 8),
+                    request_budget=request_budget,
+                )
+                batch_to_check = await BiliSub.filter(id__in=due_ids) if due_ids else []
                 logger.info(
-                    f"B站订阅检查任务: "
-                    f"本次检查批次 {start_index}-{end_index - 1} (共 {total_subs} 个), "
-                    f"批次大小: {len(batch_to_check)}"
+                    f"B站订阅检查任务: 本次检查 {len(batch_to_check)} 个到期订阅 "
+                    f"(共 {len(poll_scheduler)} 个), 请求预算: {request_budget}, "
+                    f"直播状态批量请求: {live_requests} 次"
                 )
 
-            if not batch_to_check:
-                logger.info("B站订阅检查任务：当前批次为空，可能是由于索引回绕。")
-                return
-
-            tasks = [
-                _check_and_send_update(sub, bot_instance) for sub in batch_to_check
-            ]
-            await asyncio.gather(*tasks)
+                batch_ids = {sub.id for sub in batch_to_check}
+                for sub_id in set(due_ids) - batch_ids:
+                    poll_scheduler.remove(sub_id)
+                live_tasks = [
+                    _check_and_send_live_update(sub, bot_instance)
+                    for sub in live_subs
+                    if sub.id not in batch_ids
+                ]
+                batch_tasks = [
+                    _check_and_send_update(sub, bot_instance) for sub in batch_to_check
+                ]
+                results = await asyncio.gather(*batch_tasks, *live_tasks)
+
+            for sub, update_count in zip(batch_to_check, results, strict=False):
+                poll_scheduler.reschedule(sub, updated=update_count > 0)
+            poll_metrics.record_cycle(
+                time.time() - start_time, len(batch_to_check), len(live_tasks)
+            )
 
         except Exception as e:
             logger.error(
@@ -384,6 +511,8 @@ async def check_subscriptions():
             logger.debug(
                 f"B站订阅检查任务批次处理异常详细信息:\n{traceback.format_exc()}"
             )
+        finally:
+            poll_scheduler.requeue_unfinished()
 
     total_duration = time.time() - start_time
     logger.debug(f"B站订阅检查任务执行完成 - 总耗时: {total_duration:.2f}秒")
@@ -395,114 +524,56 @@ async def send_sub_msg(notification: Notification, sub: BiliSub, bot: Bot):
     logger.debug(f"B站订阅推送开始: UID={sub.uid}, 名称={sub.uname}")
     msg_list = notification.content
 
-    temp_group = []
     if not msg_list:
         logger.warning(f"B站订阅推送收到空消息列表: UID={sub.uid}")
         return
 
-    sub_targets: list[str] = cast(
-        list[str],
-        await BiliSubTarget.filter(subscription_id=sub.id).values_list(
-            "target_id", flat=True
-        ),
-    )
+    sub_targets = await push_router.get_targets(sub.id)
     logger.debug(f"B站订阅推送目标用户数量: {len(sub_targets)}, UID={sub.uid}")
 
-    success_count = 0
-    error_count = 0
-
+    should_at = base_config.get("ENABLE_AT_ALL", True) and (
+        (notification.type == NotificationType.LIVE and sub.at_all_live)
+        or (notification.type == NotificationType.VIDEO and sub.at_all_video)
+        or (notification.type == NotificationType.DYNAMIC and sub.at_all_dynamic)
+    )
+    group_ids = [
+        target_id.replace("group_", "")
+        for target_id in sub_targets
+        if target_id.startswith("group_")
+    ]
+    # 推送前一次性并发刷新过期的群状态，机器人角色仅在需要@全体成员时查询
+    await push_router.refresh_group_states(bot, group_ids, need_roles=should_at)
+
+    targets: dict[str, list] = {}
     for target_id in sub_targets:
-        try:
-            if target_id.startswith("group_"):
-                group_id = target_id.replace("group_", "")
-                if group_id in temp_group:
-                    continue
-                temp_group.append(group_id)
-                logger.debug(f"B站订阅推送准备发送到群: {group_id}, UID={sub.uid}")
-
-                at_all_msg = None
-                try:
-                    role_info = await bot.get_group_member_info(
-                        group_id=int(group_id),
-                        user_id=int(bot.self_id),
-                        no_cache=True,
-                    )
-                    bot_role = role_info["role"]
-                    logger.debug(
-                        f"B站订阅推送机器人在群 {group_id} 中的角色: {bot_role}"
-                    )
-
-                    if base_config.get("ENABLE_AT_ALL", True) and bot_role in [
-                        "owner",
-                        "admin",
-                    ]:
-                        should_at = False
-                        if (
-                            (
-                                notification.type == NotificationType.LIVE
-                                and sub.at_all_live
-                            )
-                            or (
-                                notification.type == NotificationType.VIDEO
-                                and sub.at_all_video
-                            )
-                            or (
-                                notification.type == NotificationType.DYNAMIC
-                                and sub.at_all_dynamic
-                            )
-                        ):
-                            should_at = True
-
-                        if should_at:
-                            at_all_msg = UniMessage.at_all() + "\n"
-                            logger.debug(
-                                f"B站订阅推送将在群 {group_id} 中@全体成员: UID={sub.uid}"
-                            )
-                            msg_list.insert(0, at_all_msg)
-                except Exception as role_err:
-                    logger.warning(
-                        f"B站订阅推送获取机器人在群 {group_id} 中的角色失败: {type(role_err).__name__}, {role_err}"
-                    )
-
-                if await GroupConsole.is_block_plugin(group_id, "bilibili_sub"):
-                    logger.debug(
-                        f"B站订阅推送在群 {group_id} 中被禁用，跳过发送: UID={sub.uid}"
-                    )
-                    continue
-
-                logger.debug(f"B站订阅推送正在发送到群 {group_id}: UID={sub.uid}")
-                await PlatformUtils.send_message(
-                    bot,
-                    user_id=None,
-                    group_id=group_id,
-                    message=MessageUtils.build_message(msg_list),
+        if target_id.startswith("group_"):
+            group_id = target_id.replace("group_", "")
+            if push_router.is_blocked(group_id):
+                logger.debug(
+                    f"B站订阅推送在群 {group_id} 中被禁用，跳过发送: UID={sub.uid}"
                 )
-                logger.debug(f"B站订阅推送成功发送到群 {group_id}: UID={sub.uid}")
-                success_count += 1
-
-                if at_all_msg:
-                    msg_list.remove(at_all_msg)
-
-            elif target_id.startswith("private_"):
-                user_id = target_id.replace("private_", "")
-                logger.debug(f"B站订阅推送准备发送到私聊用户: {user_id}, UID={sub.uid}")
-                await PlatformUtils.send_message(
-                    bot,
-                    user_id=user_id,
-                    group_id=None,
-                    message=MessageUtils.build_message(msg_list),
-                )
-                logger.debug(f"B站订阅推送成功发送到私聊用户: {user_id}, UID={sub.uid}")
-                success_count += 1
-
-        except Exception as e:
-            error_count += 1
-            logger.error(
-                f"B站订阅推送发生错误: UID={sub.uid}, 错误类型={type(e).__name__}, 错误信息={e}"
-            )
-            import traceback
-
-            logger.debug(f"B站订阅推送错误详细信息:\n{traceback.format_exc()}")
+                continue
+
+            targets[target_id] = msg_list
+            if should_at and push_router.get_role(bot, group_id) in [
+                "owner",
+                "admin",
+            ]:
+                logger.debug(f"B站订阅推送将在群 {group_id} 中@全体成员: UID={sub.uid}")
+                targets[target_id] = [UniMessage.at_all() + "\n", *msg_list]
+        elif target_id.startswith("private_"):
+            targets[target_id] = msg_list
+
+    # 开播通知优先于普通动态/视频推送出队
+    priority = (
+        PRIORITY_LIVE if notification.type == NotificationType.LIVE else PRIORITY_NORMAL
+    )
+    success_count = await push_dispatcher.dispatch(bot, targets, priority)
+    error_count = len(targets) - success_count
+    if success_count and notification.published_at:
+        poll_metrics.record_notify(
+            notification.type.name.lower(), time.time() - notification.published_at
+        )
 
     total_duration = time.time() - start_time
     logger.info(
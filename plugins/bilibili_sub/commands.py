@@ -32,6 +32,7 @@ from .data_source import (
     BiliSub,
     BiliSubTarget,
     Notification,
+    NotificationType,
     _get_bangumi_status,
     add_bangumi_sub,
     add_live_sub,
@@ -40,7 +41,22 @@ from .data_source import (
     get_sub_status,
     search_bangumi,
 )
-from .utils import get_cached_avatar, get_cached_bangumi_cover, get_user_card
+from .image_cache import avatar_cache, bangumi_cover_cache
+from .live_ws import live_ws_monitor
+from .metrics import poll_metrics
+from .poll_scheduler import poll_scheduler
+from .push_dispatcher import PRIORITY_LIVE, PRIORITY_NORMAL, push_dispatcher
+from .push_router import push_router
+from .render_cache import render_cache
+from .screenshot_pool import dynamic_page_pool
+from .simulator import STRATEGIES, simulate
+from .utils import (
+    fetch_cycle,
+    get_cached_avatar,
+    get_cached_bangumi_cover,
+    get_user_card,
+    prefetch_live_status,
+)
 
 
 async def get_target_ids(session: EventSession, gids: Query[list[int]]) -> list[str]:
@@ -152,28 +168,18 @@ async def send_notification_to_targets(
     bot: Bot,
     target_ids: list[str],
 ) -> int:
-    success_count = 0
-    for target_id in target_ids:
-        try:
-            if target_id.startswith("group_"):
-                await PlatformUtils.send_message(
-                    bot,
-                    user_id=None,
-                    group_id=target_id.replace("group_", ""),
-                    message=MessageUtils.build_message(notification.content),
-                )
-                success_count += 1
-            elif target_id.startswith("private_"):
-                await PlatformUtils.send_message(
-                    bot,
-                    user_id=target_id.replace("private_", ""),
-                    group_id=None,
-                    message=MessageUtils.build_message(notification.content),
-                )
-                success_count += 1
-        except Exception as e:
-            logger.error(f"B站订阅定向推送失败: target={target_id}, 错误={e}")
-    return success_count
+    priority = (
+        PRIORITY_LIVE if notification.type == NotificationType.LIVE else PRIORITY_NORMAL
+    )
+    return await push_dispatcher.dispatch(
+        bot,
+        {
+            target_id: notification.content
+            for target_id in target_ids
+            if target_id.startswith(("group_", "private_"))
+        },
+        priority,
+    )
 
 
 bilisub_cmd = Alconna(
@@ -223,6 +229,12 @@ bilisub_cmd = Alconna(
         Option("-g|--group|--群", Args["gids", MultiVar(int)]),
         alias=["补发", "强推", "强制推送"],
     ),
+    Subcommand("stats", alias=["统计", "运行统计"]),
+    Subcommand(
+        "simulate",
+        Args["count?", int]["hours?", int],
+        alias=["模拟", "模拟轮询"],
+    ),
 )
 
 
@@ -508,6 +520,8 @@ async def handle_del(
         else:
             fail_list.append(str(db_id))
 
+    if total_deleted_count:
+        push_router.invalidate()
     await BiliSubTarget.clean_orphaned_subs()
 
     msg = f"成功从 {len(target_ids)} 个目标中删除了 {total_deleted_count} 个订阅关系。"
@@ -673,6 +687,7 @@ async def handle_clear(
             deleted_count = await BiliSubTarget.filter(
                 target_id__in=target_ids
             ).delete()
+            push_router.invalidate()
             await BiliSubTarget.clean_orphaned_subs()
             msg = f"✅ 已成功清空「{description}」的 {deleted_count} 个订阅。"
             await MessageUtils.build_message(msg).finish()
@@ -913,8 +928,16 @@ async def handle_check_all(
             logger.error(f"checkall 检查 UID={sub.uid} 时出错: {e}")
         return 0
 
-    tasks = [_check_sub_and_send(sub) for sub in all_subs]
-    results = await asyncio.gather(*tasks)
+    with fetch_cycle():
+        await prefetch_live_status(
+            [
+                sub.uid
+                for sub in all_subs
+                if sub.uid > 0 and sub.push_live and sub.room_id
+            ]
+        )
+        tasks = [_check_sub_and_send(sub) for sub in all_subs]
+        results = await asyncio.gather(*tasks)
     update_count = sum(results)
 
     await MessageUtils.build_message(
@@ -1005,3 +1028,95 @@ async def handle_force_push(
             results.append(f"❌ 为 [{db_id}] {sub.uname} 推送时发生内部错误: {e}")
 
     await MessageUtils.build_message("\n---\n".join(results)).finish()
+
+
+@bilisub_matcher.assign("stats")
+async def handle_stats(bot: Bot, event: Event):
+    await ensure_superuser(bot, event)
+
+    summary = poll_metrics.summary()
+    lines = [f"📊 B站订阅运行统计 (运行 {summary['uptime_hours']:.1f} 小时)"]
+    if last_cycle := summary["last_cycle"]:
+        finished_at, seconds, checked, live_checked = last_cycle
+        lines.append(
+            f"轮询周期: 最近 {summary['cycles']} 次, 耗时 P50 {summary['cycle_p50']:.1f}s"
+            f" / P90 {summary['cycle_p90']:.1f}s / 最大 {summary['cycle_max']:.1f}s"
+        )
+        lines.append(
+            f"上次轮询: {time.strftime('%H:%M:%S', time.localtime(finished_at))},"
+            f" 检查 {checked} 个订阅 + {live_checked} 个直播间, 耗时 {seconds:.1f}s"
+        )
+    else:
+        lines.append("轮询周期: 暂无记录")
+    lines.append(f"调度中的订阅: {len(poll_scheduler)} 个")
+
+    if slowest := poll_metrics.slowest_uids():
+        lines.append("检查最慢的订阅:")
+        lines.extend(
+            f"  UID {uid}: 平均 {stats.avg_seconds:.2f}s, 最大 {stats.max_seconds:.2f}s,"
+            f" {stats.count} 次 (失败 {stats.errors})"
+            for uid, stats in slowest
+        )
+
+    errors = summary["api_errors_last_hour"]
+    lines.append(
+        f"API 错误: 近1小时 {sum(count for _, count in errors)} 次,"
+        f" 累计 {summary['api_error_total']} 次"
+    )
+    lines.extend(f"  {reason} ×{count}" for reason, count in errors[:5])
+
+    kind_names = {"live": "直播", "video": "视频/剧集", "dynamic": "动态"}
+    for kind, (p50, p90, count) in summary["notify"].items():
+        lines.append(
+            f"{kind_names.get(kind, kind)}推送延迟: P50 {p50 / 60:.1f} 分钟"
+            f" / P90 {p90 / 60:.1f} 分钟 ({count} 条)"
+        )
+
+    push = push_dispatcher.stats()
+    lines.append(
+        f"推送队列: 已发送 {push['sent']}, 失败 {push['failed']}, 重试 {push['retried']},"
+        f" 排队 {push['queued']}, 送达耗时 P90 {push['latency_p90']:.1f}s"
+    )
+    ws = live_ws_monitor.stats()
+    lines.append(
+        f"直播 websocket: {ws['connected']}/{ws['rooms']} 已连接,"
+        f" 事件 {ws['events']}, 重连 {ws['reconnects']}"
+    )
+    pool = dynamic_page_pool.stats()
+    lines.append(
+        f"动态截图: 平均 {pool['avg_capture_seconds']:.1f}s,"
+        f" 排队平均 {pool['avg_wait_seconds']:.1f}s, 失败 {pool['failures']}"
+    )
+    lines.append(f"卡片缓存: 命中 {render_cache.hits}, 未命中 {render_cache.misses}")
+    for name, cache in (("头像", avatar_cache), ("番剧封面", bangumi_cover_cache)):
+        stats = cache.stats()
+        lines.append(
+            f"{name}缓存: {stats['entries']} 个 ({stats['bytes'] / 1024 / 1024:.1f}MB),"
+            f" 命中 {stats['hits']}, 下载 {stats['misses']}, 304 {stats['revalidated']}"
+        )
+
+    await MessageUtils.build_message("\n".join(lines)).finish()
+
+
+@bilisub_matcher.assign("simulate")
+async def handle_simulate(
+    bot: Bot,
+    event: Event,
+    arp: Arparma,
+):
+    await ensure_superuser(bot, event)
+
+    sub_count = max(1, min(arp.query("simulate.count", 2000), 20000))
+    sim_hours = max(1, min(arp.query("simulate.hours", 24), 24 * 7))
+    # 纯计算，放到线程中避免阻塞事件循环
+    results = await asyncio.to_thread(
+        lambda: [simulate(strategy, sub_count, sim_hours) for strategy in STRATEGIES]
+    )
+    lines = [
+        (
+            f"🧪 使用当前配置模拟 {sub_count} 个订阅运行 {sim_hours} 小时"
+            "（本地伪造接口，不会请求B站）:"
+        )
+    ]
+    lines.extend(result.describe() for result in results)
+    await MessageUtils.build_message("\n".join(lines)).finish()
@@ -39,6 +39,46 @@ base_config = Config.get(MODULE_NAME)
 HTTP_TIMEOUT = 30
 HTTP_CONNECT_TIMEOUT = 10
 
+LIVE_STATUS_API = "https://api.live.bilibili.com/room/v1/Room/get_status_info_by_uids"
+LIVE_STATUS_BATCH_SIZE = 50
+
+LIVE_WS_DEFAULT_URL = "wss://broadcastlv.chat.bilibili.com/sub"
+LIVE_WS_HEARTBEAT_INTERVAL = 30
+LIVE_WS_MAX_BACKOFF = 300
+LIVE_WS_CONNECT_INTERVAL = 0.5
+LIVE_WS_CONSISTENCY_INTERVAL = 30 * 60
+"""websocket 模式下对已连接直播间做轮询校验的间隔（秒）"""
+LIVE_WS_RECHECK_DELAY = 5
+
+POLL_ACTIVITY_FACTOR = 0.1
+"""检查间隔 = 距最近一次发布的时长 × 该系数（再限制在最小/最大间隔之间）"""
+POLL_BACKOFF_FACTOR = 1.5
+POLL_RESYNC_INTERVAL = 30 * 60
+PUSH_MAX_AGE = 24 * 60 * 60
+"""比记录更新、但发布已超过该时长的动态/视频只更新记录不推送，避免长时间停机后推送过期内容"""
+
+PUSH_ROUTE_TTL = 10 * 60
+"""推送路由表的最长缓存时间，订阅增删时会立即失效"""
+GROUP_ROLE_TTL = 10 * 60
+GROUP_BLOCK_TTL = 60
+GROUP_STATE_CONCURRENCY = 8
+
+DYNAMIC_PAGE_POOL_SIZE = 2
+DYNAMIC_PAGE_MAX_USES = 50
+DYNAMIC_SCREENSHOT_TIMEOUT = 30_000
+"""动态截图页面加载与等待卡片元素的超时（毫秒）"""
+
+METRICS_WINDOW = 500
+"""轮询指标保留的最近周期数/推送延迟样本数"""
+
+PUSH_WORKERS = 4
+PUSH_MAX_RETRIES = 2
+PUSH_RETRY_BASE_DELAY = 2
+"""推送失败后的首次重试延迟（秒），之后每次翻倍"""
+PUSH_LATENCY_WINDOW = 200
+PUSH_DISPATCH_TIMEOUT = 5 * 60
+"""一次分发等待全部目标送达的最长时间（秒），超时后未完成的目标继续在队列中发送"""
+
 bili_credential: Credential | None = None
 _credential_lock = asyncio.Lock()
 _credential_loaded = False
@@ -158,9 +198,17 @@ AVATAR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 BANGUMI_COVER_CACHE_DIR = PLUGIN_CACHE_DIR / "covers"
 BANGUMI_COVER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+AVATAR_CACHE_MAX_BYTES = 32 * 1024 * 1024
+BANGUMI_COVER_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 IMAGE_CACHE_DIR = PLUGIN_CACHE_DIR / "image"
 IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+RENDER_CACHE_DIR = PLUGIN_CACHE_DIR / "render"
+RENDER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RENDER_TEMPLATE_VERSION = 1
+"""推送卡片模板版本，修改卡片样式后递增以使旧的渲染缓存失效"""
+
 DYNAMIC_PATH = DATA_PATH / MODULE_NAME / "dynamic"
 DYNAMIC_PATH.mkdir(exist_ok=True, parents=True)
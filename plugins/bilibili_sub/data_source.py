@@ -2,6 +2,7 @@ import asyncio
 import base64
 import json
 import time
+import weakref
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum, auto
@@ -17,12 +18,18 @@ from zhenxun.ui.models import NotebookData
 from zhenxun.utils.platform import PlatformUtils
 from zhenxun.utils.utils import ResourceDirManager
 
-from .config import DYNAMIC_PATH, base_config, get_credential
+from .config import DYNAMIC_PATH, PUSH_MAX_AGE, base_config, get_credential
 from .filter import is_ad as is_dynamic_ad
+from .metrics import poll_metrics
 from .model import BiliSub, BiliSubTarget
+from .poll_scheduler import poll_scheduler
+from .push_router import push_router
+from .render_cache import render_cache
 from .utils import (
+    fetch_cycle,
     get_cached_bangumi_cover,
     get_dynamic_screenshot,
+    get_prefetched_live_status,
     get_room_info_by_id,
     get_user_card,
     get_user_dynamics,
@@ -46,6 +53,8 @@ class Notification:
 
     content: list
     type: NotificationType
+    published_at: float | None = None
+    """内容发布（开播）的时间戳，用于统计推送延迟"""
 
 
 async def fetch_image_bytes(url: str) -> bytes:
@@ -62,6 +71,7 @@ async def fetch_image_bytes(url: str) -> bytes:
 async def handle_video_info_error(video_info: dict):
     """处理B站视频信息获取错误并发送通知给超级用户"""
     str_msg = "b站订阅检测失败："
+    poll_metrics.record_api_error("get_videos", f"code {video_info['code']}")
     if video_info["code"] == -352:
         str_msg += "风控校验失败，请登录后再尝试。发送'登录b站'"
     elif video_info["code"] == -799:
@@ -106,6 +116,11 @@ async def _add_subscription(
         subscription=sub, target_id=target_id
     )
 
+    if created:
+        poll_scheduler.schedule_now(sub)
+    if created_target:
+        push_router.invalidate()
+
     if not created_target:
         return f"ℹ️ 你已经订阅过「{uname}」(UID/SSID: {uid}) 了。"
 
@@ -299,9 +314,11 @@ async def delete_sub(uid: int, target_id: str) -> str:
             return f"❌ 你没有订阅过 {sub.uname} (UID: {uid})。"
 
         await target.delete()
+        push_router.invalidate()
 
         remaining_targets = await BiliSubTarget.filter(subscription=sub).count()
         if remaining_targets == 0:
+            poll_scheduler.remove(sub.id)
             await sub.delete()
             logger.info(f"删除了孤立的订阅记录: UID={uid}")
 
@@ -317,20 +334,21 @@ async def get_sub_status(sub: BiliSub, force_push: bool = False) -> list[Notific
     all_notifications: list[Notification] = []
 
     try:
-        if sub.uid < 0:
-            bangumi_notifications = await _get_bangumi_status(sub, force_push)
-            if bangumi_notifications:
-                all_notifications.extend(bangumi_notifications)
-        else:
-            if sub.push_dynamic or sub.push_video:
-                up_notifications = await _get_up_status(sub, force_push)
-                if up_notifications:
-                    all_notifications.extend(up_notifications)
+        with fetch_cycle():
+            if sub.uid < 0:
+                bangumi_notifications = await _get_bangumi_status(sub, force_push)
+                if bangumi_notifications:
+                    all_notifications.extend(bangumi_notifications)
+            else:
+                if sub.push_dynamic or sub.push_video:
+                    up_notifications = await _get_up_status(sub, force_push)
+                    if up_notifications:
+                        all_notifications.extend(up_notifications)
 
-            if sub.push_live and sub.room_id:
-                live_notifications = await _get_live_status(sub)
-                if live_notifications:
-                    all_notifications.extend(live_notifications)
+                if sub.push_live and sub.room_id:
+                    live_notifications = await _get_live_status(sub)
+                    if live_notifications:
+                        all_notifications.extend(live_notifications)
 
     except ResponseCodeException as msg:
         error_code = getattr(msg, "code", "unknown")
@@ -361,12 +379,8 @@ async def get_sub_status(sub: BiliSub, force_push: bool = False) -> list[Notific
     return all_notifications
 
 
-async def _get_live_status(sub: BiliSub) -> list[Notification]:
-    """获取直播订阅状态"""
-    start_time = time.time()
-    if not sub.room_id:
-        return []
-
+async def _fetch_room_info(sub: BiliSub) -> dict | None:
+    """单独请求直播间信息，失败时返回 None"""
     try:
         logger.debug(f"获取直播间信息: 房间ID={sub.room_id}")
         live_info_raw = await get_room_info_by_id(sub.room_id)
@@ -374,10 +388,10 @@ async def _get_live_status(sub: BiliSub) -> list[Notification]:
             logger.error(
                 f"直播间信息获取失败或结构异常: 房间ID={sub.room_id}, 返回数据={live_info_raw}"
             )
-            return []
+            return None
 
-        live_info = live_info_raw["room_info"]
         logger.debug(f"成功获取直播间信息: 房间ID={sub.room_id}, 数据结构完整")
+        return live_info_raw["room_info"]
     except Exception as e:
         logger.error(
             f"获取直播间信息异常: 房间ID={sub.room_id}, 异常类型={type(e).__name__}, 异常信息={e}"
@@ -385,12 +399,57 @@ async def _get_live_status(sub: BiliSub) -> list[Notification]:
         import traceback
 
         logger.debug(f"异常详细信息:\n{traceback.format_exc()}")
+        return None
+
+
+_live_check_locks: weakref.WeakValueDictionary[int, asyncio.Lock] = (
+    weakref.WeakValueDictionary()
+)
+"""按订阅ID的直播检查锁，没有检查在使用时条目自动移除，取消订阅后不会残留"""
+
+
+async def _get_live_status(sub: BiliSub) -> list[Notification]:
+    """获取直播订阅状态
+
+    定时轮询、websocket 直播事件与手动检查可能同时检查同一直播间，按订阅串行执行，
+    并以数据库中的最新直播状态为准，避免重复推送同一次开播。
+    """
+    if not sub.room_id:
         return []
+    lock = _live_check_locks.get(sub.id)
+    if lock is None:
+        lock = _live_check_locks[sub.id] = asyncio.Lock()
+    async with lock:
+        await sub.refresh_from_db(fields=["live_status"])
+        return await _check_live_status(sub)
+
+
+async def _check_live_status(sub: BiliSub) -> list[Notification]:
+    """获取直播状态并更新订阅记录，由未开播变为开播时生成开播通知"""
+    start_time = time.time()
+    prefetched, batch_info = get_prefetched_live_status(sub.uid)
+    if prefetched:
+        if not batch_info:
+            logger.debug(f"批量直播状态中没有该主播的直播间: UID={sub.uid}")
+            return []
+        live_info = {
+            "title": batch_info.get("title", ""),
+            "room_id": batch_info.get("room_id", sub.room_id),
+            "live_status": batch_info.get("live_status", 0),
+            "cover": batch_info.get("cover_from_user") or batch_info.get("keyframe"),
+            "live_time": batch_info.get("live_time"),
+        }
+        logger.debug(f"使用批量获取的直播状态: 房间ID={sub.room_id}")
+    else:
+        live_info = await _fetch_room_info(sub)
+        if live_info is None:
+            return []
 
     title = live_info["title"]
     room_id = live_info["room_id"]
     live_status = live_info["live_status"]
     cover = live_info.get("cover")
+    live_time = live_info.get("live_time") or live_info.get("live_start_time")
     logger.debug(
         f"直播间信息: 房间ID={sub.room_id}, 实际房间ID={room_id}, 标题={title}, 直播状态={live_status}"
     )
@@ -424,11 +483,18 @@ async def _get_live_status(sub: BiliSub) -> list[Notification]:
             f"**直播间：** [https://live.bilibili.com/{room_id}](https://live.bilibili.com/{room_id})"
         )
 
-        img_bytes = await ui.render(notebook, use_cache=False)
+        img_bytes = await render_cache.get_or_render(
+            "live",
+            (room_id, title, cover, sub.uname),
+            lambda: ui.render(notebook, use_cache=False),
+        )
         notifications.append(
             Notification(
                 content=[img_bytes, f"直播间链接: https://live.bilibili.com/{room_id}"],
                 type=NotificationType.LIVE,
+                published_at=live_time
+                if isinstance(live_time, int) and live_time > 0
+                else None,
             )
         )
 
@@ -507,7 +573,11 @@ async def _get_bangumi_status(
         notebook.text(f"**标题：** {latest_ep.get('long_title', '未知标题')}")
         notebook.text(f"**Bvid：** {latest_ep.get('bvid', '未知')}")
 
-        img_bytes = await ui.render(notebook, use_cache=False)
+        img_bytes = await render_cache.get_or_render(
+            "bangumi",
+            (season_id, latest_ep.get("id", 0), sub.uname),
+            lambda: ui.render(notebook, use_cache=False),
+        )
         notifications.append(
             Notification(
                 content=[
@@ -515,6 +585,7 @@ async def _get_bangumi_status(
                     f"https://www.bilibili.com/bangumi/play/ep{latest_ep.get('id', '')}",
                 ],
                 type=NotificationType.VIDEO,
+                published_at=latest_ep.get("pub_time") or None,
             )
         )
 
@@ -611,9 +682,11 @@ async def _get_up_status(sub: BiliSub, force_push: bool = False) -> list[Notific
     notifications: list[Notification] = []
     notebook: NotebookData | None = None
     notification_type: NotificationType | None = None
+    card_key: tuple = ()
+    published_at = 0
     is_new_video_pushed = False
 
-    time_threshold = current_time - timedelta(minutes=30)
+    time_threshold = current_time - timedelta(seconds=PUSH_MAX_AGE)
     logger.debug(f"设置时间阈值: UID={sub.uid}, 阈值={time_threshold}")
 
     if sub.uname != uname:
@@ -694,6 +767,8 @@ async def _get_up_status(sub: BiliSub, force_push: bool = False) -> list[Notific
             base64_str = base64.b64encode(dynamic_img).decode()
             notebook.image(f"data:image/png;base64,{base64_str}")
             notification_type = NotificationType.DYNAMIC
+            card_key = (dynamic_url, uname)
+            published_at = dynamic_upload_time
 
             if not force_push:
                 sub.last_dynamic_timestamp = dynamic_upload_time
@@ -733,6 +808,8 @@ async def _get_up_status(sub: BiliSub, force_push: bool = False) -> list[Notific
 
             notebook = NotebookData(elements=[])
             notification_type = NotificationType.VIDEO
+            card_key = (video_bvid, uname)
+            published_at = latest_video_created
 
             notebook.head(f"{uname} 投稿了新视频啦！🎉", level=2)
             notebook.image(video["pic"])
@@ -771,7 +848,12 @@ async def _get_up_status(sub: BiliSub, force_push: bool = False) -> list[Notific
 
     if notebook:
         msg_list_content = []
-        img_bytes = await ui.render(notebook, frameless=True)
+        card_notebook = notebook
+        img_bytes = await render_cache.get_or_render(
+            notification_type.name.lower() if notification_type else "up",
+            card_key,
+            lambda: ui.render(card_notebook, frameless=True),
+        )
         msg_list_content.append(img_bytes)
 
         # 如果有动态原图，且功能开关已开启，则添加到消息列表中
@@ -800,7 +882,11 @@ async def _get_up_status(sub: BiliSub, force_push: bool = False) -> list[Notific
 
         if notification_type:
             notifications.append(
-                Notification(content=msg_list_content, type=notification_type)
+                Notification(
+                    content=msg_list_content,
+                    type=notification_type,
+                    published_at=published_at or None,
+                )
             )
 
     duration = time.time() - start_time
@@ -904,7 +990,11 @@ async def get_user_dynamic(
 
         logger.debug(f"开始获取动态截图: UID={uid}, 动态ID={dynamic_id}")
         try:
-            image = await get_dynamic_screenshot(dynamic_id)
+            image = await render_cache.get_or_render(
+                "dynamic_screenshot",
+                (dynamic_id,),
+                lambda: get_dynamic_screenshot(dynamic_id),
+            )
             if image:
                 logger.debug(
                     f"成功获取动态截图: UID={uid}, 动态ID={dynamic_id}, 图片大小={len(image)}字节"
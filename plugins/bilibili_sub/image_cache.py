@@ -0,0 +1,230 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+from zhenxun.services.log import logger
+from zhenxun.utils.http_utils import AsyncHttpx
+
+from .config import (
+    AVATAR_CACHE_DIR,
+    AVATAR_CACHE_MAX_BYTES,
+    BANGUMI_COVER_CACHE_DIR,
+    BANGUMI_COVER_CACHE_MAX_BYTES,
+    HTTP_TIMEOUT,
+    base_config,
+)
+
+INDEX_FILE_NAME = "index.json"
+
+
+@dataclass
+class CacheEntry:
+    """缓存文件的来源与校验信息"""
+
+    url: str
+    size: int
+    etag: str = ""
+    last_modified: str = ""
+    validated_at: float = 0.0
+    used_at: float = 0.0
+
+
+class ImageCache:
+    """按ID缓存的头像/封面图片
+
+    索引文件记录每个图片的来源URL、ETag/Last-Modified 与大小：URL变化或超过
+    CACHE_TTL_DAYS 未校验时发送条件请求，未变化(304)则继续使用本地文件；
+    总大小按索引增量统计，超出 max_bytes 时按最近使用时间淘汰，无需扫描目录。
+    """
+
+    def __init__(self, name: str, cache_dir: Path, max_bytes: int):
+        self.name = name
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @property
+    def index_path(self) -> Path:
+        return self.cache_dir / INDEX_FILE_NAME
+
+    @property
+    def entries(self) -> OrderedDict[str, CacheEntry]:
+        """按最近使用顺序排列的 ID->缓存信息，首次访问时加载索引"""
+        if self._entries is None:
+            self._entries = self._load_index()
+            self.total_bytes = sum(entry.size for entry in self._entries.values())
+        return self._entries
+
+    def _load_index(self) -> OrderedDict[str, CacheEntry]:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if self.index_path.exists():
+            try:
+                raw = json.loads(self.index_path.read_text(encoding="utf-8"))
+                loaded = [(key, CacheEntry(**value)) for key, value in raw]
+                loaded.sort(key=lambda item: item[1].used_at)
+                return OrderedDict(
+                    (key, entry) for key, entry in loaded if self._path(key).exists()
+                )
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"{self.name}缓存索引损坏，将重新建立: {e}")
+
+        # 没有索引时收录旧版本留下的文件，来源URL未知，首次使用时会重新下载
+        entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        files = sorted(
+            (file for file in self.cache_dir.glob("*.png") if file.is_file()),
+            key=lambda file: file.stat().st_mtime,
+        )
+        for file in files:
+            stat = file.stat()
+            entries[file.stem] = CacheEntry(
+                url="", size=stat.st_size, used_at=stat.st_mtime
+            )
+        return entries
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_name(f"{INDEX_FILE_NAME}.tmp")
+        try:
+            tmp_path.write_text(
+                json.dumps(
+                    [[key, asdict(entry)] for key, entry in self.entries.items()],
+                    ensure_ascii=False,
+                ),
+                encoding="utf-8",
+            )
+            tmp_path.replace(self.index_path)
+        except OSError as e:
+            logger.warning(f"保存{self.name}缓存索引失败: {e}")
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def _touch(self, key: str, entry: CacheEntry):
+        entry.used_at = time.time()
+        self.entries.move_to_end(key)
+
+    def _is_fresh(self, entry: CacheEntry, url: str) -> bool:
+        ttl_seconds = base_config.get("CACHE_TTL_DAYS", 15) * 24 * 60 * 60
+        return entry.url == url and time.time() - entry.validated_at < ttl_seconds
+
+    async def get(self, key: str | int, url: str) -> Path | None:
+        """获取图片的本地路径，必要时下载或重新校验；下载失败时尽量返回旧文件"""
+        key = str(key)
+        entry = self.entries.get(key)
+        path = self._path(key)
+        if entry and self._is_fresh(entry, url) and path.exists():
+            self.hits += 1
+            self._touch(key, entry)
+            logger.debug(f"{self.name}缓存命中: ID {key}")
+            return path
+        if task := self._inflight.get(key):
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.create_task(self._refresh(key, url))
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _refresh(self, key: str, url: str) -> Path | None:
+        path = self._path(key)
+        entry = self.entries.get(key)
+        if entry and not path.exists():
+            self._remove(key)
+            entry = None
+        # 校验信息只对缓存时的地址有效，地址变化（如更换头像）时直接重新下载
+        revalidate = entry is not None and entry.url == url
+        try:
+            headers = {}
+            if revalidate and entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if revalidate and entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+            logger.debug(
+                f"{self.name}缓存{'校验' if revalidate else '未命中，正在下载'}: ID {key}"
+            )
+            response = await AsyncHttpx.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+
+            if response.status_code == 304 and revalidate:
+                self.revalidated += 1
+                entry.validated_at = time.time()
+                self._touch(key, entry)
+                self._save_index()
+                return path
+            if response.status_code != 200 or not response.content:
+                logger.warning(
+                    f"下载{self.name}失败 ID: {key}, 状态码: {response.status_code}"
+                )
+                return path if entry else None
+
+            tmp_path = path.with_name(f"{path.name}.tmp")
+            tmp_path.write_bytes(response.content)
+            tmp_path.replace(path)
+            self._remove(key)
+            new_entry = CacheEntry(
+                url=url,
+                size=len(response.content),
+                etag=response.headers.get("ETag", ""),
+                last_modified=response.headers.get("Last-Modified", ""),
+                validated_at=time.time(),
+            )
+            self.entries[key] = new_entry
+            self.total_bytes += new_entry.size
+            self._touch(key, new_entry)
+            self._evict()
+            self._save_index()
+            return path
+        except (httpx.HTTPError, OSError) as e:
+            logger.error(f"下载{self.name}失败 ID: {key}, URL: {url}", e=e)
+            return path if entry else None
+        finally:
+            self._inflight.pop(key, None)
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.total_bytes -= entry.size
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key = next(iter(self.entries))
+            self._remove(key)
+            self._path(key).unlink(missing_ok=True)
+
+    def evict_expired(self, max_idle_seconds: float) -> int:
+        """删除超过指定时间未被使用的图片，返回删除数量"""
+        now = time.time()
+        expired = [
+            key
+            for key, entry in self.entries.items()
+            if now - entry.used_at > max_idle_seconds
+        ]
+        for key in expired:
+            self._remove(key)
+            self._path(key).unlink(missing_ok=True)
+        # 同时持久化期间累积的使用时间
+        self._save_index()
+        return len(expired)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+
+avatar_cache = ImageCache("头像", AVATAR_CACHE_DIR, AVATAR_CACHE_MAX_BYTES)
+bangumi_cover_cache = ImageCache(
+    "番剧封面", BANGUMI_COVER_CACHE_DIR, BANGUMI_COVER_CACHE_MAX_BYTES
+)
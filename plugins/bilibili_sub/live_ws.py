@@ -0,0 +1,259 @@
+import asyncio
+import json
+import random
+import struct
+import time
+import zlib
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+import aiohttp
+from bilibili_api import live as bilibili_live_module
+from bilibili_api.exceptions import ApiException
+from zhenxun.services.log import logger
+
+from .config import (
+    LIVE_WS_CONNECT_INTERVAL,
+    LIVE_WS_DEFAULT_URL,
+    LIVE_WS_HEARTBEAT_INTERVAL,
+    LIVE_WS_MAX_BACKOFF,
+    base_config,
+    get_credential,
+)
+
+HEADER = struct.Struct(">IHHII")
+"""数据包头: 包长度, 头长度, 协议版本, 操作码, 序列号"""
+
+OP_HEARTBEAT = 2
+OP_HEARTBEAT_REPLY = 3
+OP_MESSAGE = 5
+OP_AUTH = 7
+OP_AUTH_REPLY = 8
+
+PROTO_JSON = 0
+PROTO_INT = 1
+PROTO_ZLIB = 2
+
+LIVE_EVENTS = {"LIVE", "PREPARING"}
+
+LiveEventHandler = Callable[[int, str], Awaitable[Any]]
+
+
+def encode_packet(
+    operation: int, body: bytes = b"", protover: int = PROTO_INT
+) -> bytes:
+    """按直播信息流协议封装数据包"""
+    return (
+        HEADER.pack(HEADER.size + len(body), HEADER.size, protover, operation, 1) + body
+    )
+
+
+def decode_packets(data: bytes) -> list[tuple[int, bytes]]:
+    """解析一帧数据中的全部数据包，返回 (操作码, 包体) 列表，zlib 压缩包会被展开"""
+    packets: list[tuple[int, bytes]] = []
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        packet_len, header_len, protover, operation, _ = HEADER.unpack_from(
+            data, offset
+        )
+        if packet_len < header_len or offset + packet_len > len(data):
+            break
+        body = data[offset + header_len : offset + packet_len]
+        if operation == OP_MESSAGE and protover == PROTO_ZLIB:
+            packets.extend(decode_packets(zlib.decompress(body)))
+        else:
+            packets.append((operation, body))
+        offset += packet_len
+    return packets
+
+
+class LiveWebsocketMonitor:
+    """通过直播信息流 websocket 监听订阅直播间的开播/下播事件
+
+    协议的每个连接只能认证一个直播间，因此每个房间一个连接任务，由同一个监视器统一
+    管理：共享 HTTP 会话与心跳循环，新连接按间隔错开建立，断线后按指数退避重连。
+    收到 LIVE/PREPARING 事件时调用 handler(房间ID, 事件名)。
+    """
+
+    def __init__(self):
+        self.handler: LiveEventHandler | None = None
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._connections: dict[int, aiohttp.ClientWebSocketResponse] = {}
+        self._handler_tasks: set[asyncio.Task] = set()
+        self._session: aiohttp.ClientSession | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._connect_lock = asyncio.Lock()
+        self._last_connect_at = 0.0
+        self.events = 0
+        self.reconnects = 0
+
+    def is_connected(self, room_id: int) -> bool:
+        """直播间是否已通过 websocket 认证并在监听中"""
+        return room_id in self._connections
+
+    def sync(self, room_ids: Iterable[int]):
+        """使监听的直播间与订阅保持一致：新增的开始连接，已取消订阅的断开"""
+        wanted = set(room_ids)
+        for room_id in set(self._tasks) - wanted:
+            self._tasks.pop(room_id).cancel()
+        for room_id in wanted - set(self._tasks):
+            self._tasks[room_id] = asyncio.create_task(self._watch_room(room_id))
+        if self._tasks and (
+            self._heartbeat_task is None or self._heartbeat_task.done()
+        ):
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self):
+        """断开所有连接"""
+        tasks = list(self._tasks.values())
+        if self._heartbeat_task:
+            tasks.append(self._heartbeat_task)
+        self._tasks.clear()
+        self._heartbeat_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def _get_endpoint(self, room_id: int) -> tuple[str, str]:
+        """返回 (websocket地址, 认证token)
+
+        配置了 LIVE_WS_URL 时直接连接该地址且不获取token，用于本地替身服务器或自建中转。
+        """
+        if url := base_config.get("LIVE_WS_URL", ""):
+            return url, ""
+        room = bilibili_live_module.LiveRoom(
+            room_display_id=room_id, credential=get_credential()
+        )
+        info = await room.get_danmu_info()
+        token = info.get("token", "")
+        for host in info.get("host_list") or []:
+            if host.get("host") and host.get("wss_port"):
+                return f"wss://{host['host']}:{host['wss_port']}/sub", token
+        return LIVE_WS_DEFAULT_URL, token
+
+    @staticmethod
+    def _auth_body(room_id: int, token: str) -> bytes:
+        credential = get_credential()
+        uid = 0
+        if credential and credential.dedeuserid:
+            uid = int(credential.dedeuserid)
+        body: dict[str, Any] = {
+            "uid": uid,
+            "roomid": room_id,
+            "protover": PROTO_ZLIB,
+            "platform": "web",
+            "type": 2,
+            "key": token,
+        }
+        if credential and credential.buvid3:
+            body["buvid"] = credential.buvid3
+        return json.dumps(body).encode()
+
+    async def _throttle_connect(self):
+        """错开新连接的建立，避免订阅较多时同时发起大量握手"""
+        async with self._connect_lock:
+            wait = self._last_connect_at + LIVE_WS_CONNECT_INTERVAL - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_connect_at = time.monotonic()
+
+    async def _watch_room(self, room_id: int):
+        backoff = 1.0
+        while True:
+            await self._throttle_connect()
+            try:
+                url, token = await self._get_endpoint(room_id)
+                async with self._get_session().ws_connect(
+                    url, receive_timeout=LIVE_WS_HEARTBEAT_INTERVAL * 3
+                ) as ws:
+                    await ws.send_bytes(
+                        encode_packet(OP_AUTH, self._auth_body(room_id, token))
+                    )
+                    async for msg in ws:
+                        if msg.type != aiohttp.WSMsgType.BINARY:
+                            continue
+                        for operation, body in decode_packets(msg.data):
+                            if operation == OP_AUTH_REPLY:
+                                code = json.loads(body or b"{}").get("code", 0)
+                                if code != 0:
+                                    raise ConnectionError(f"认证失败, code={code}")
+                                self._connections[room_id] = ws
+                                backoff = 1.0
+                                logger.debug(f"直播间 {room_id} websocket 已连接")
+                                await ws.send_bytes(encode_packet(OP_HEARTBEAT))
+                            elif operation == OP_MESSAGE:
+                                self._handle_message(room_id, body)
+                logger.debug(f"直播间 {room_id} websocket 连接被关闭，准备重连")
+            except asyncio.CancelledError:
+                raise
+            except (
+                aiohttp.ClientError,
+                TimeoutError,
+                OSError,
+                ValueError,
+                struct.error,
+                zlib.error,
+                ApiException,
+            ) as e:
+                logger.warning(
+                    f"直播间 {room_id} websocket 连接异常: {type(e).__name__}, {e}"
+                )
+            finally:
+                self._connections.pop(room_id, None)
+
+            self.reconnects += 1
+            delay = backoff * random.uniform(0.8, 1.2)
+            backoff = min(LIVE_WS_MAX_BACKOFF, backoff * 2)
+            await asyncio.sleep(delay)
+
+    def _handle_message(self, room_id: int, body: bytes):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return
+        cmd = str(payload.get("cmd", "")).split(":")[0]
+        if cmd not in LIVE_EVENTS or not self.handler:
+            return
+        self.events += 1
+        logger.info(f"直播间 {room_id} 推送事件: {cmd}")
+        # 在独立任务中处理，避免阻塞该连接的读取
+        task = asyncio.create_task(self.handler(room_id, cmd))
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._on_handler_done)
+
+    def _on_handler_done(self, task: asyncio.Task):
+        self._handler_tasks.discard(task)
+        if not task.cancelled() and (error := task.exception()):
+            logger.error(
+                f"直播事件处理异常: 错误类型={type(error).__name__}, 错误信息={error}"
+            )
+
+    async def _heartbeat_loop(self):
+        packet = encode_packet(OP_HEARTBEAT)
+        while True:
+            await asyncio.sleep(LIVE_WS_HEARTBEAT_INTERVAL)
+            for room_id, ws in list(self._connections.items()):
+                try:
+                    await ws.send_bytes(packet)
+                except (aiohttp.ClientError, OSError) as e:
+                    # 读取循环会感知到断线并负责重连
+                    logger.debug(f"直播间 {room_id} 发送心跳失败: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rooms": len(self._tasks),
+            "connected": len(self._connections),
+            "events": self.events,
+            "reconnects": self.reconnects,
+        }
+
+
+live_ws_monitor = LiveWebsocketMonitor()
@@ -0,0 +1,104 @@
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any
+
+from .config import METRICS_WINDOW
+
+
+@dataclass
+class UidCheckStats:
+    """单个订阅的检查耗时统计"""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    last_seconds: float = 0.0
+    max_seconds: float = 0.0
+    errors: int = 0
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+
+def _percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class PollMetrics:
+    """订阅轮询的运行指标：周期耗时、各UID检查耗时、API错误数与推送延迟"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.uid_stats: dict[int, UidCheckStats] = {}
+        self.cycles: deque[tuple[float, float, int, int]] = deque(maxlen=METRICS_WINDOW)
+        self.api_errors: deque[tuple[float, str]] = deque()
+        self.api_error_total = 0
+        self.notify_delays: dict[str, deque[float]] = {}
+
+    def record_check(self, uid: int, seconds: float, error: bool = False):
+        stats = self.uid_stats.setdefault(uid, UidCheckStats())
+        stats.count += 1
+        stats.total_seconds += seconds
+        stats.last_seconds = seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        if error:
+            stats.errors += 1
+
+    def record_cycle(self, seconds: float, checked: int, live_checked: int):
+        self.cycles.append((time.time(), seconds, checked, live_checked))
+
+    def record_api_error(self, api: str, reason: str):
+        self.api_error_total += 1
+        self.api_errors.append((time.time(), f"{api}: {reason}"))
+        self._prune_api_errors()
+
+    def record_notify(self, kind: str, delay_seconds: float):
+        """记录内容发布到推送完成的耗时"""
+        if delay_seconds < 0:
+            return
+        self.notify_delays.setdefault(kind, deque(maxlen=METRICS_WINDOW)).append(
+            delay_seconds
+        )
+
+    def _prune_api_errors(self):
+        cutoff = time.time() - 3600
+        while self.api_errors and self.api_errors[0][0] < cutoff:
+            self.api_errors.popleft()
+
+    def slowest_uids(self, limit: int = 5) -> list[tuple[int, UidCheckStats]]:
+        return sorted(
+            self.uid_stats.items(),
+            key=lambda item: item[1].avg_seconds,
+            reverse=True,
+        )[:limit]
+
+    def summary(self) -> dict[str, Any]:
+        self._prune_api_errors()
+        durations = [cycle[1] for cycle in self.cycles]
+        return {
+            "uptime_hours": (time.time() - self.started_at) / 3600,
+            "cycles": len(self.cycles),
+            "last_cycle": self.cycles[-1] if self.cycles else None,
+            "cycle_p50": _percentile(durations, 0.5),
+            "cycle_p90": _percentile(durations, 0.9),
+            "cycle_max": max(durations, default=0.0),
+            "api_errors_last_hour": Counter(
+                reason for _, reason in self.api_errors
+            ).most_common(),
+            "api_error_total": self.api_error_total,
+            "notify": {
+                kind: (
+                    _percentile(list(delays), 0.5),
+                    _percentile(list(delays), 0.9),
+                    len(delays),
+                )
+                for kind, delays in self.notify_delays.items()
+            },
+        }
+
+
+poll_metrics = PollMetrics()
@@ -0,0 +1,194 @@
+import heapq
+import random
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from zhenxun.services.log import logger
+
+from .config import (
+    POLL_ACTIVITY_FACTOR,
+    POLL_BACKOFF_FACTOR,
+    POLL_RESYNC_INTERVAL,
+    base_config,
+)
+from .model import BiliSub
+
+
+@dataclass
+class PollState:
+    """单个订阅的调度状态"""
+
+    sub_id: int
+    interval: float
+    next_due: float
+    cost: int
+
+
+def estimate_request_cost(sub: BiliSub) -> int:
+    """估算检查一次该订阅需要的API请求数（直播状态已批量获取，不计入）"""
+    if sub.uid < 0:
+        return 1 if sub.push_video else 0
+    return 2 if sub.push_dynamic or sub.push_video else 0
+
+
+class SubPollScheduler:
+    """按活跃度自适应的订阅轮询调度器
+
+    在内存中维护以下次到期时间为键的优先队列：活跃的UP（刚发布动态/视频或正在直播）
+    按最小间隔检查，长期不活跃的逐步退避到最大间隔；每轮按全局请求预算取出到期订阅，
+    新增订阅会在下一轮立即检查。已取出但未重新调度的订阅由 requeue_unfinished 放回队列。
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._states: dict[int, PollState] = {}
+        self._heap: list[tuple[float, int]] = []
+        self._in_flight: set[int] = set()
+        self._synced_at: float | None = None
+
+    @property
+    def min_interval(self) -> float:
+        return max(1, base_config.get("CHECK_TIME", 15)) * 60
+
+    @property
+    def max_interval(self) -> float:
+        max_minutes = base_config.get("MAX_CHECK_INTERVAL", 180)
+        return max(self.min_interval, max_minutes * 60)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _push(self, state: PollState):
+        heapq.heappush(self._heap, (state.next_due, state.sub_id))
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _activity_interval(self, sub: BiliSub) -> float | None:
+        """根据最近一次发布时间推算检查间隔，最近越活跃间隔越短"""
+        if sub.uid > 0 and sub.live_status == 1:
+            return self.min_interval
+        if sub.uid < 0:
+            return None
+        last_active = max(
+            sub.last_dynamic_timestamp or 0, sub.last_video_timestamp or 0
+        )
+        if last_active <= 0:
+            return None
+        return self._clamp((self._wall_clock() - last_active) * POLL_ACTIVITY_FACTOR)
+
+    def schedule_now(self, sub: BiliSub):
+        """加入或重置订阅，使其在下一轮立即被检查"""
+        state = PollState(
+            sub_id=sub.id,
+            interval=self.min_interval,
+            next_due=self._clock(),
+            cost=estimate_request_cost(sub),
+        )
+        self._states[sub.id] = state
+        self._push(state)
+
+    def remove(self, sub_id: int):
+        self._states.pop(sub_id, None)
+        self._in_flight.discard(sub_id)
+
+    async def sync(self, force: bool = False):
+        """与数据库同步订阅列表，仅在首次调用或超过同步间隔时查询"""
+        if (
+            not force
+            and self._synced_at is not None
+            and self._clock() - self._synced_at < POLL_RESYNC_INTERVAL
+        ):
+            return
+        self.load(await BiliSub.all())
+        logger.debug(f"B站订阅调度器已同步: 共 {len(self._states)} 个订阅")
+
+    def load(self, subs: Iterable[BiliSub]):
+        """以给定的订阅列表为准更新调度状态"""
+        subs = list(subs)
+        now = self._clock()
+        known_ids = set(self._states)
+        current_ids = {sub.id for sub in subs}
+        for sub_id in known_ids - current_ids:
+            self.remove(sub_id)
+
+        for sub in subs:
+            if sub.id in known_ids:
+                self._states[sub.id].cost = estimate_request_cost(sub)
+                continue
+            interval = self._activity_interval(sub) or self.min_interval
+            # 首次加载时在各自间隔内随机错开，之后同步发现的新订阅立即到期
+            next_due = now
+            if self._synced_at is None:
+                next_due += random.uniform(0, interval)
+            state = PollState(
+                sub_id=sub.id,
+                interval=interval,
+                next_due=next_due,
+                cost=estimate_request_cost(sub),
+            )
+            self._states[sub.id] = state
+            self._push(state)
+        self._synced_at = now
+
+    def pop_due(self, max_count: int, request_budget: int) -> list[int]:
+        """取出已到期的订阅ID，受数量上限与请求预算约束，超出的留待下一轮"""
+        now = self._clock()
+        due: list[int] = []
+        spent = 0
+        while self._heap and len(due) < max_count:
+            next_due, sub_id = self._heap[0]
+            if next_due > now:
+                break
+            state = self._states.get(sub_id)
+            if state is None or state.next_due != next_due:
+                heapq.heappop(self._heap)
+                continue
+            if due and spent + state.cost > request_budget:
+                break
+            heapq.heappop(self._heap)
+            spent += state.cost
+            due.append(sub_id)
+        self._in_flight.update(due)
+        return due
+
+    def requeue_unfinished(self):
+        """将已取出但未调用 reschedule 的订阅放回队列（如检查过程中出现异常），下一轮立即检查"""
+        now = self._clock()
+        for sub_id in self._in_flight:
+            if (state := self._states.get(sub_id)) is not None:
+                state.next_due = now
+                self._push(state)
+        self._in_flight.clear()
+
+    def reschedule(self, sub: BiliSub, updated: bool):
+        """根据本次检查结果计算下次到期时间"""
+        self._in_flight.discard(sub.id)
+        state = self._states.get(sub.id)
+        if state is None:
+            return
+        backoff_interval = state.interval * POLL_BACKOFF_FACTOR
+        if updated:
+            interval = self.min_interval
+        elif (target := self._activity_interval(sub)) is not None:
+            # 活跃度上升时立即缩短间隔，下降时每次最多按退避系数增长
+            interval = (
+                target if target <= state.interval else min(target, backoff_interval)
+            )
+        else:
+            interval = backoff_interval
+        interval = self._clamp(interval)
+        state.interval = interval
+        state.cost = estimate_request_cost(sub)
+        # 只向前抖动，保证按最小间隔调度的订阅在下一轮定时任务时已到期
+        state.next_due = self._clock() + interval * random.uniform(0.85, 1.0)
+        self._push(state)
+
+
+poll_scheduler = SubPollScheduler()
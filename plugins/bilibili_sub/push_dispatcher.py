@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from nonebot.exception import ActionFailed, AdapterException, ApiNotAvailable
+from nonebot.internal.adapter import Bot
+from zhenxun.services.log import logger
+from zhenxun.utils.message import MessageUtils
+from zhenxun.utils.platform import PlatformUtils
+
+from .config import (
+    PUSH_DISPATCH_TIMEOUT,
+    PUSH_LATENCY_WINDOW,
+    PUSH_MAX_RETRIES,
+    PUSH_RETRY_BASE_DELAY,
+    PUSH_WORKERS,
+    base_config,
+)
+
+PRIORITY_LIVE = 0
+PRIORITY_NORMAL = 1
+
+
+class TokenBucket:
+    """令牌桶限速器，rate 为每秒补充的令牌数，capacity 为允许的突发量"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass(order=True)
+class PushJob:
+    """单个推送目标的发送任务，按 (优先级, 入队顺序) 出队"""
+
+    priority: int
+    seq: int
+    bot: Bot = field(compare=False)
+    target_id: str = field(compare=False)
+    msg_list: list = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+
+
+class PushDispatcher:
+    """订阅推送的并发分发器
+
+    所有推送目标进入同一个优先队列，由固定数量的发送协程并发发送，整体速率受令牌桶
+    限制以适配 OneBot 后端的承受能力；开播通知优先于普通动态出队，确定未送达的目标
+    按指数退避后重新入队，并记录每个目标从入队到送达的耗时。
+    """
+
+    def __init__(self):
+        self._queue: asyncio.PriorityQueue[PushJob] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._bucket = TokenBucket(*self._rate_config())
+        self._latencies: deque[float] = deque(maxlen=PUSH_LATENCY_WINDOW)
+        self._target_latency: dict[str, float] = {}
+        self._counters = {"sent": 0, "failed": 0, "retried": 0}
+
+    @staticmethod
+    def _rate_config() -> tuple[float, int]:
+        per_minute = max(1, base_config.get("PUSH_RATE_PER_MINUTE", 600))
+        burst = max(1, base_config.get("PUSH_BURST", 10))
+        return per_minute / 60, burst
+
+    def _ensure_workers(self) -> asyncio.PriorityQueue[PushJob]:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._workers = [task for task in self._workers if not task.done()]
+        for _ in range(PUSH_WORKERS - len(self._workers)):
+            self._workers.append(asyncio.create_task(self._worker(self._queue)))
+        return self._queue
+
+    def submit(
+        self, bot: Bot, target_id: str, msg_list: list, priority: int
+    ) -> asyncio.Future:
+        """提交一个推送目标，返回的 future 在送达后为 True，重试耗尽后为 False"""
+        queue = self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait(
+            PushJob(
+                priority=priority,
+                seq=next(self._seq),
+                bot=bot,
+                target_id=target_id,
+                msg_list=msg_list,
+                future=future,
+                enqueued_at=time.monotonic(),
+            )
+        )
+        return future
+
+    async def dispatch(
+        self, bot: Bot, targets: dict[str, list], priority: int = PRIORITY_NORMAL
+    ) -> int:
+        """并发推送到多个目标（目标ID -> 消息列表），返回超时前成功送达的数量"""
+        futures = [
+            self.submit(bot, target_id, msg_list, priority)
+            for target_id, msg_list in targets.items()
+        ]
+        if not futures:
+            return 0
+        done, pending = await asyncio.wait(futures, timeout=PUSH_DISPATCH_TIMEOUT)
+        if pending:
+            logger.warning(
+                f"B站订阅推送分发超时: {len(pending)}/{len(futures)} 个目标未在 "
+                f"{PUSH_DISPATCH_TIMEOUT} 秒内完成，将继续在队列中发送"
+            )
+        return sum(future.result() for future in done)
+
+    async def _worker(self, queue: asyncio.PriorityQueue[PushJob]):
+        while True:
+            job = await queue.get()
+            try:
+                await self._process(queue, job)
+            except Exception as e:
+                # 未知推送目标或发送中的意外异常，不能让发送协程退出、调用方永远等待
+                self._fail(job, e)
+            finally:
+                queue.task_done()
+
+    async def _process(self, queue: asyncio.PriorityQueue[PushJob], job: PushJob):
+        self._bucket.rate, self._bucket.capacity = self._rate_config()
+        await self._bucket.acquire()
+        try:
+            await self._send(job)
+        except (ActionFailed, ApiNotAvailable) as e:
+            # 后端明确返回失败或协议端未连接，消息未发出，重发不会造成重复推送
+            if job.attempt >= PUSH_MAX_RETRIES:
+                self._fail(job, e)
+                return
+            delay = PUSH_RETRY_BASE_DELAY * 2**job.attempt
+            job.attempt += 1
+            self._counters["retried"] += 1
+            logger.warning(
+                f"B站订阅推送发送失败，{delay}秒后重试: target={job.target_id}, "
+                f"错误={e}"
+            )
+            # 退避期间不占用发送协程，到期后按原优先级重新入队
+            asyncio.get_running_loop().call_later(delay, queue.put_nowait, job)
+            return
+        except AdapterException as e:
+            # 调用超时等网络错误时消息可能已经送达，重发可能重复推送，不再重试
+            self._fail(job, e)
+            return
+
+        latency = time.monotonic() - job.enqueued_at
+        self._latencies.append(latency)
+        self._target_latency[job.target_id] = latency
+        self._counters["sent"] += 1
+        logger.debug(f"B站订阅推送成功发送到 {job.target_id}: 耗时={latency:.2f}秒")
+        self._resolve(job, True)
+
+    def _fail(self, job: PushJob, error: Exception):
+        self._counters["failed"] += 1
+        logger.error(
+            f"B站订阅推送失败: target={job.target_id}, "
+            f"已重试 {job.attempt} 次, 错误类型={type(error).__name__}, 错误={error}"
+        )
+        self._resolve(job, False)
+
+    @staticmethod
+    def _resolve(job: PushJob, success: bool):
+        # 调用方可能已超时取消等待，此时结果直接丢弃
+        if not job.future.done():
+            job.future.set_result(success)
+
+    @staticmethod
+    async def _send(job: PushJob):
+        if job.target_id.startswith("group_"):
+            await PlatformUtils.send_message(
+                job.bot,
+                user_id=None,
+                group_id=job.target_id.replace("group_", ""),
+                message=MessageUtils.build_message(job.msg_list),
+            )
+        elif job.target_id.startswith("private_"):
+            await PlatformUtils.send_message(
+                job.bot,
+                user_id=job.target_id.replace("private_", ""),
+                group_id=None,
+                message=MessageUtils.build_message(job.msg_list),
+            )
+        else:
+            raise ValueError(f"未知的推送目标: {job.target_id}")
+
+    def get_target_latency(self, target_id: str) -> float | None:
+        """目标最近一次推送从入队到送达的耗时（秒）"""
+        return self._target_latency.get(target_id)
+
+    def stats(self) -> dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        return {
+            **self._counters,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "latency_p50": percentile(0.5),
+            "latency_p90": percentile(0.9),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+
+push_dispatcher = PushDispatcher()
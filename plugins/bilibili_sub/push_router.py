@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections.abc import Iterable
+
+from nonebot.exception import ActionFailed, NetworkError
+from nonebot.internal.adapter import Bot
+from tortoise.exceptions import BaseORMException
+from zhenxun.models.group_console import GroupConsole
+from zhenxun.services.log import logger
+
+from .config import (
+    GROUP_BLOCK_TTL,
+    GROUP_ROLE_TTL,
+    GROUP_STATE_CONCURRENCY,
+    PUSH_ROUTE_TTL,
+)
+from .model import BiliSubTarget
+
+
+class PushRouter:
+    """订阅推送路由表
+
+    缓存 订阅ID -> 推送目标 的映射，订阅增删时失效并在下次推送时整表重建；
+    机器人在各群的角色和插件禁用状态按短TTL缓存，推送前对过期的群并发批量刷新。
+    """
+
+    def __init__(self):
+        self._routes: dict[int, list[str]] | None = None
+        self._routes_loaded_at = 0.0
+        self._routes_version = 0
+        self._routes_lock = asyncio.Lock()
+        self._roles: dict[tuple[str, str], tuple[str, float]] = {}
+        self._blocked: dict[str, tuple[bool, float]] = {}
+        self._semaphore = asyncio.Semaphore(GROUP_STATE_CONCURRENCY)
+
+    def invalidate(self):
+        """订阅关系发生变化时调用，下次推送时重新加载路由表"""
+        self._routes = None
+        self._routes_version += 1
+
+    async def _load_routes(self) -> dict[int, list[str]]:
+        routes = self._routes
+        if (
+            routes is not None
+            and time.monotonic() - self._routes_loaded_at < PUSH_ROUTE_TTL
+        ):
+            return routes
+        async with self._routes_lock:
+            routes = self._routes
+            if (
+                routes is not None
+                and time.monotonic() - self._routes_loaded_at < PUSH_ROUTE_TTL
+            ):
+                return routes
+            version = self._routes_version
+            rows = await BiliSubTarget.all().values_list("subscription_id", "target_id")
+            routes = {}
+            for sub_id, target_id in rows:
+                targets = routes.setdefault(sub_id, [])
+                if target_id not in targets:
+                    targets.append(target_id)
+            # 加载期间订阅关系有变化时本次结果不入缓存
+            if version == self._routes_version:
+                self._routes = routes
+                self._routes_loaded_at = time.monotonic()
+            logger.debug(
+                f"B站订阅推送路由表已加载: {len(routes)} 个订阅, {len(rows)} 条目标"
+            )
+            return routes
+
+    async def get_targets(self, sub_id: int) -> list[str]:
+        """获取订阅的推送目标列表"""
+        routes = await self._load_routes()
+        return list(routes.get(sub_id, []))
+
+    async def refresh_group_states(
+        self, bot: Bot, group_ids: Iterable[str], need_roles: bool
+    ):
+        """并发刷新已过期的群状态，need_roles 为 False 时跳过角色查询"""
+        now = time.monotonic()
+        tasks = []
+        for group_id in dict.fromkeys(group_ids):
+            blocked = self._blocked.get(group_id)
+            if blocked is None or now - blocked[1] >= GROUP_BLOCK_TTL:
+                tasks.append(self._refresh_block(group_id))
+            if need_roles:
+                role = self._roles.get((bot.self_id, group_id))
+                if role is None or now - role[1] >= GROUP_ROLE_TTL:
+                    tasks.append(self._refresh_role(bot, group_id))
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _refresh_block(self, group_id: str):
+        async with self._semaphore:
+            try:
+                blocked = await GroupConsole.is_block_plugin(group_id, "bilibili_sub")
+            except BaseORMException as e:
+                logger.warning(f"B站订阅推送获取群 {group_id} 插件状态失败: {e}")
+                return
+        self._blocked[group_id] = (blocked, time.monotonic())
+
+    async def _refresh_role(self, bot: Bot, group_id: str):
+        async with self._semaphore:
+            try:
+                role_info = await bot.get_group_member_info(
+                    group_id=int(group_id),
+                    user_id=int(bot.self_id),
+                    no_cache=True,
+                )
+            except (ActionFailed, NetworkError) as e:
+                logger.warning(
+                    f"B站订阅推送获取机器人在群 {group_id} 中的角色失败: "
+                    f"{type(e).__name__}, {e}"
+                )
+                return
+        self._roles[(bot.self_id, group_id)] = (role_info["role"], time.monotonic())
+
+    def get_role(self, bot: Bot, group_id: str) -> str | None:
+        """机器人在群中的角色，未知时返回 None"""
+        role = self._roles.get((bot.self_id, group_id))
+        return role[0] if role else None
+
+    def is_blocked(self, group_id: str) -> bool:
+        """群是否禁用了本插件，状态未知（查询失败）时视为禁用，不向该群推送"""
+        blocked = self._blocked.get(group_id)
+        return blocked[0] if blocked else True
+
+
+push_router = PushRouter()
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from zhenxun.services.log import logger
+
+from .config import RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES, RENDER_TEMPLATE_VERSION
+
+
+class RenderCache:
+    """推送卡片与动态截图的磁盘缓存
+
+    以 (通知类型, 内容ID..., 模板版本) 为键保存渲染结果，总大小超出 max_bytes 时按最近
+    使用时间淘汰；强制推送或异常重试时直接复用，同一内容的并发渲染只执行一次。
+    修改卡片样式后需递增 RENDER_TEMPLATE_VERSION 使旧缓存失效。
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def entries(self) -> OrderedDict[str, int]:
+        """按最近使用顺序排列的 文件名->大小，首次访问时扫描缓存目录"""
+        if self._entries is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            files = [
+                (file, file.stat())
+                for file in self.cache_dir.iterdir()
+                if file.is_file() and not file.name.endswith(".tmp")
+            ]
+            files.sort(key=lambda item: item[1].st_mtime)
+            self._entries = OrderedDict(
+                (file.name, stat.st_size) for file, stat in files
+            )
+            self.total_bytes = sum(self._entries.values())
+        return self._entries
+
+    @staticmethod
+    def make_key(kind: str, *parts: object) -> str:
+        raw = ":".join([kind, *map(str, parts), f"v{RENDER_TEMPLATE_VERSION}"])
+        return f"{kind}_{hashlib.sha1(raw.encode(), usedforsecurity=False).hexdigest()}.png"
+
+    def get(self, name: str) -> bytes | None:
+        """读取缓存的渲染结果，命中时刷新其使用时间"""
+        if name not in self.entries:
+            return None
+        path = self.cache_dir / name
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            self._remove(name)
+            return None
+        self.entries.move_to_end(name)
+        return data
+
+    def put(self, name: str, data: bytes):
+        path = self.cache_dir / name
+        tmp_path = path.with_name(f"{name}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"写入渲染缓存失败 {name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._remove(name)
+        self.entries[name] = len(data)
+        self.total_bytes += len(data)
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            oldest_name = next(iter(self.entries))
+            self._remove(oldest_name)
+            (self.cache_dir / oldest_name).unlink(missing_ok=True)
+
+    def _remove(self, name: str):
+        size = self.entries.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    async def get_or_render(
+        self, kind: str, parts: tuple, render: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """返回缓存的渲染结果，未命中时调用 render 渲染并缓存（结果为空时不缓存）"""
+        name = self.make_key(kind, *parts)
+        if (data := self.get(name)) is not None:
+            self.hits += 1
+            logger.debug(f"渲染缓存命中: {kind} {parts}")
+            return data
+        if task := self._inflight.get(name):
+            self.hits += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.create_task(self._render(name, render))
+        self._inflight[name] = task
+        return await asyncio.shield(task)
+
+    async def _render(
+        self, name: str, render: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        try:
+            data = await render()
+            if data:
+                self.put(name, data)
+            return data
+        finally:
+            self._inflight.pop(name, None)
+
+
+render_cache = RenderCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES)
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from nonebot_plugin_htmlrender import get_browser
+from playwright.async_api import Error as PlaywrightError
+from zhenxun.services.log import logger
+
+from .config import DYNAMIC_PAGE_MAX_USES, DYNAMIC_PAGE_POOL_SIZE, get_credential
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
+
+
+@dataclass
+class _PooledPage:
+    """池中的一个浏览器上下文及其页面"""
+
+    context: Any
+    page: Any
+    credential_key: str
+    uses: int = 0
+
+
+class DynamicPagePool:
+    """动态截图用的预热页面池
+
+    每个上下文创建时注入B站登录 Cookie，可在启动时预先创建；截图出错、使用 max_uses
+    次或登录凭证变化后回收重建。池大小有上限，多个UP同时更新时截图请求排队等待空闲页面。
+    """
+
+    def __init__(self, max_size: int, max_uses: int):
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self._idle: list[_PooledPage] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._warm_up_task: asyncio.Task | None = None
+        self.created = 0
+        self.recycled = 0
+        self.waiting = 0
+        self.failures = 0
+        self.wait_times: deque[float] = deque(maxlen=100)
+        self.capture_times: deque[float] = deque(maxlen=100)
+
+    @staticmethod
+    def _get_credential_cookies() -> tuple[str, list[dict[str, str]]]:
+        """返回当前凭证的标识与 Playwright 格式的 Cookie 列表"""
+        credential = get_credential()
+        if not credential:
+            return "", []
+        cookies = credential.get_cookies()
+        playwright_cookies = [
+            {"domain": ".bilibili.com", "name": name, "path": "/", "value": value}
+            for name, value in cookies.items()
+            if value
+        ]
+        return str(cookies.get("SESSDATA") or ""), playwright_cookies
+
+    async def _create(self) -> _PooledPage:
+        browser = await get_browser()
+        credential_key, playwright_cookies = self._get_credential_cookies()
+        context = await browser.new_context(
+            viewport={"width": 2000, "height": 1000},
+            user_agent=USER_AGENT,
+            device_scale_factor=3,
+        )
+        try:
+            if playwright_cookies:
+                await context.add_cookies(playwright_cookies)  # type: ignore
+            page = await context.new_page()
+        except Exception:
+            await context.close()
+            raise
+
+        self.created += 1
+        logger.debug(f"动态截图池创建新的浏览器上下文 (累计 {self.created})")
+        return _PooledPage(context=context, page=page, credential_key=credential_key)
+
+    async def _close(self, item: _PooledPage):
+        self.recycled += 1
+        try:
+            await item.context.close()
+        except PlaywrightError as e:
+            logger.debug(f"关闭动态截图池浏览器上下文失败: {e}")
+
+    async def _take(self) -> _PooledPage:
+        credential_key, _ = self._get_credential_cookies()
+        while self._idle:
+            item = self._idle.pop()
+            if item.credential_key == credential_key and not item.page.is_closed():
+                return item
+            await self._close(item)
+        return await self._create()
+
+    async def _give_back(self, item: _PooledPage, healthy: bool):
+        item.uses += 1
+        credential_key, _ = self._get_credential_cookies()
+        if (
+            not healthy
+            or item.uses >= self.max_uses
+            or item.credential_key != credential_key
+            or item.page.is_closed()
+        ):
+            await self._close(item)
+            return
+        self._idle.append(item)
+
+    async def warm_up(self):
+        """预先创建页面直至填满空闲池"""
+        while len(self._idle) < self.max_size:
+            try:
+                self._idle.append(await self._create())
+            except PlaywrightError as e:
+                logger.warning(f"动态截图池预热失败: {e}")
+                return
+
+    def start_warm_up(self):
+        """在后台预热，保留任务引用以免任务被提前回收"""
+        if self._warm_up_task is None or self._warm_up_task.done():
+            self._warm_up_task = asyncio.create_task(self.warm_up())
+
+    @asynccontextmanager
+    async def borrow(self) -> AsyncIterator[Any]:
+        """借出一个已登录的页面，使用中抛出异常时该页面会被回收重建"""
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_times.append(time.monotonic() - start)
+
+        item: _PooledPage | None = None
+        healthy = False
+        try:
+            item = await self._take()
+            yield item.page
+            healthy = True
+        finally:
+            if item:
+                await self._give_back(item, healthy)
+            self._semaphore.release()
+
+    async def close(self):
+        """关闭池中所有空闲上下文"""
+        while self._idle:
+            await self._close(self._idle.pop())
+
+    def stats(self) -> dict[str, Any]:
+        """返回池大小、排队等待与截图耗时统计"""
+
+        def _avg(values: deque[float]) -> float:
+            return sum(values) / len(values) if values else 0.0
+
+        return {
+            "max_size": self.max_size,
+            "idle": len(self._idle),
+            "waiting": self.waiting,
+            "created": self.created,
+            "recycled": self.recycled,
+            "failures": self.failures,
+            "avg_wait_seconds": _avg(self.wait_times),
+            "avg_capture_seconds": _avg(self.capture_times),
+            "max_capture_seconds": max(self.capture_times, default=0.0),
+        }
+
+
+dynamic_page_pool = DynamicPagePool(DYNAMIC_PAGE_POOL_SIZE, DYNAMIC_PAGE_MAX_USES)
@@ -0,0 +1,192 @@
+"""脱离 NoneBot/真寻 运行环境加载插件模块
+
+仅为被测模块依赖的宿主框架与第三方接口提供最小替身，插件自身的模块按文件原样加载，
+供 scripts 下的基准与检查脚本使用（python plugins/bilibili_sub/scripts/xxx.py）。
+HTTP 请求由 AsyncHttpx 替身经 aiohttp 真实发出，可配合本地 http.server 使用。
+"""
+
+import importlib
+import sys
+import tempfile
+import types
+from json import loads
+from pathlib import Path
+
+import aiohttp
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "bilibili_sub"
+
+CONFIG: dict[str, dict] = {PACKAGE: {}, "BiliBili": {}}
+"""Config.get 返回的配置，需在 load 之前修改"""
+
+
+class _Logger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _PlaceholderType(type):
+    def __getattr__(cls, name):
+        return lambda *args, **kwargs: None
+
+
+class _Placeholder(metaclass=_PlaceholderType):
+    """宿主框架中的类替身，实例化与调用任意类方法均无副作用"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _Model:
+    class Meta:
+        pass
+
+
+class _Config:
+    @staticmethod
+    def get(module: str) -> dict:
+        return CONFIG.setdefault(module, {})
+
+    @staticmethod
+    def set_config(module: str, key: str, value, auto_save: bool = False):
+        CONFIG.setdefault(module, {})[key] = value
+
+
+class ApiException(Exception):
+    pass
+
+
+class ResponseCodeException(ApiException):
+    def __init__(self, code: int, msg: str, raw: dict | None = None):
+        super().__init__(f"({code}) {msg}")
+        self.code = code
+        self.raw = raw
+
+
+class HTTPError(Exception):
+    pass
+
+
+class _Response:
+    def __init__(self, url: str, status_code: int, headers, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return loads(self.content)
+
+
+class _AsyncHttpx:
+    @staticmethod
+    async def _request(method: str, url: str, timeout: float, **kwargs) -> _Response:
+        try:
+            async with (
+                aiohttp.ClientSession(
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as session,
+                session.request(method, url, **kwargs) as response,
+            ):
+                return _Response(
+                    str(response.url),
+                    response.status,
+                    response.headers.copy(),
+                    await response.read(),
+                )
+        except (aiohttp.ClientError, TimeoutError) as e:
+            raise HTTPError(str(e)) from e
+
+    @classmethod
+    async def get(cls, url: str, headers: dict | None = None, timeout: float = 30):
+        return await cls._request("GET", url, timeout, headers=headers)
+
+    @classmethod
+    async def post(
+        cls,
+        url: str,
+        json: dict | None = None,
+        headers: dict | None = None,
+        timeout: float = 30,
+    ):
+        return await cls._request("POST", url, timeout, json=json, headers=headers)
+
+
+def _module(name: str, path: Path | None = None, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__path__ = [str(path)] if path else []
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def _install_stand_ins():
+    data_path = Path(tempfile.mkdtemp(prefix=f"{PACKAGE}_"))
+
+    _module("nonebot")
+    adapter_exception = type("AdapterException", (Exception,), {})
+    _module(
+        "nonebot.exception",
+        AdapterException=adapter_exception,
+        ActionFailed=type("ActionFailed", (adapter_exception,), {}),
+        NetworkError=type("NetworkError", (adapter_exception,), {}),
+        ApiNotAvailable=type("ApiNotAvailable", (adapter_exception,), {}),
+    )
+    _module("nonebot.internal")
+    _module("nonebot.internal.adapter", Bot=_Placeholder)
+    _module("nonebot_plugin_htmlrender", get_browser=None)
+    _module("playwright")
+    _module("playwright.async_api", Error=type("Error", (Exception,), {}))
+    _module("httpx", HTTPError=HTTPError)
+    _module("tortoise")
+    fields = _module("tortoise.fields")
+    fields.__getattr__ = lambda name: _Placeholder
+    _module(
+        "tortoise.exceptions",
+        BaseORMException=type("BaseORMException", (Exception,), {}),
+    )
+
+    _module("bilibili_api", Credential=_Placeholder)
+    for name in ("bangumi", "live", "search", "user"):
+        setattr(sys.modules["bilibili_api"], name, _module(f"bilibili_api.{name}"))
+    sys.modules["bilibili_api.live"].LiveRoom = _Placeholder
+    sys.modules["bilibili_api.user"].User = _Placeholder
+    _module(
+        "bilibili_api.exceptions",
+        ApiException=ApiException,
+        ResponseCodeException=ResponseCodeException,
+    )
+
+    _module("zhenxun")
+    _module("zhenxun.configs")
+    _module("zhenxun.configs.config", Config=_Config)
+    _module(
+        "zhenxun.configs.path_config",
+        DATA_PATH=data_path / "data",
+        IMAGE_PATH=data_path / "image",
+    )
+    _module("zhenxun.services")
+    _module("zhenxun.services.log", logger=_Logger())
+    _module("zhenxun.services.db_context", Model=_Model)
+    _module("zhenxun.models")
+    _module("zhenxun.models.group_console", GroupConsole=_Placeholder)
+    _module("zhenxun.ui", render=None)
+    _module("zhenxun.ui.models", NotebookData=_Placeholder)
+    sys.modules["zhenxun"].ui = sys.modules["zhenxun.ui"]
+    _module("zhenxun.utils")
+    _module("zhenxun.utils.utils", ResourceDirManager=_Placeholder)
+    _module("zhenxun.utils.http_utils", AsyncHttpx=_AsyncHttpx)
+    _module("zhenxun.utils.message", MessageUtils=_Placeholder)
+    _module("zhenxun.utils.platform", PlatformUtils=_Placeholder)
+
+
+def load(module: str) -> types.ModuleType:
+    """加载插件内的模块，如 load("utils")，不执行插件的 __init__"""
+    if PACKAGE not in sys.modules:
+        _install_stand_ins()
+        _module(PACKAGE, PLUGIN_DIR)
+    return importlib.import_module(f"{PACKAGE}.{module}")
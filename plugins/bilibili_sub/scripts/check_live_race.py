@@ -0,0 +1,104 @@
+"""检查定时轮询与 websocket 直播事件同时检查同一直播间时只推送一次开播
+
+轮询批次通过 get_sub_status、直播事件通过 _get_live_status 各自持有从数据库读出的订阅对象，
+开播前两者的 live_status 都为 0。替身直播间接口带有网络延迟，使两次检查在时间上重叠；
+未加锁的 _check_live_status 作为对照，预期会产生两条开播通知。
+"""
+
+import asyncio
+import sys
+from typing import ClassVar
+
+from _standalone import load
+
+failures: list[str] = []
+
+
+class StandInSub:
+    """只包含直播检查用到字段的订阅替身，live_status 读写共享的“数据库”"""
+
+    database: ClassVar[dict[int, int]] = {}
+
+    def __init__(self, sub_id: int):
+        self.id = sub_id
+        self.uid = 1000 + sub_id
+        self.room_id = 2000 + sub_id
+        self.uname = f"主播{sub_id}"
+        self.push_dynamic = False
+        self.push_video = False
+        self.push_live = True
+        self.live_status = self.database[sub_id]
+
+    async def refresh_from_db(self, fields: list[str] | None = None):
+        await asyncio.sleep(0)
+        self.live_status = self.database[self.id]
+
+    async def save(self, update_fields: list[str] | None = None):
+        await asyncio.sleep(0)
+        self.database[self.id] = self.live_status
+
+
+async def stand_in_room_info(sub) -> dict:
+    await asyncio.sleep(0.05)
+    return {
+        "title": "测试直播",
+        "room_id": sub.room_id,
+        "live_status": 1,
+        "cover": "https://i0.hdslb.com/cover.jpg",
+        "live_time": 1_700_000_000,
+    }
+
+
+async def stand_in_render() -> bytes:
+    return b"png"
+
+
+def check(condition: bool, description: str):
+    print(f"{'通过' if condition else '失败'}: {description}")
+    if not condition:
+        failures.append(description)
+
+
+async def run(data_source):
+    StandInSub.database[1] = 0
+    unlocked = await asyncio.gather(
+        data_source._check_live_status(StandInSub(1)),
+        data_source._check_live_status(StandInSub(1)),
+    )
+    unlocked_count = sum(len(notifications) for notifications in unlocked)
+    print(f"对照（不加锁）: 开播通知 {unlocked_count} 条")
+
+    StandInSub.database[2] = 0
+    poll, event = await asyncio.gather(
+        data_source.get_sub_status(StandInSub(2)),
+        data_source._get_live_status(StandInSub(2)),
+    )
+    check(
+        len(poll) + len(event) == 1,
+        f"轮询与直播事件同时检查: 开播通知 {len(poll) + len(event)} 条",
+    )
+
+    StandInSub.database[3] = 0
+    results = await asyncio.gather(
+        *(data_source._get_live_status(StandInSub(3)) for _ in range(5))
+    )
+    count = sum(len(notifications) for notifications in results)
+    check(count == 1, f"5 个并发检查: 开播通知 {count} 条")
+    check(StandInSub.database[3] == 1, "数据库中的直播状态已更新为开播")
+    check(
+        not data_source._live_check_locks,
+        f"检查结束后不保留直播检查锁: {len(data_source._live_check_locks)} 个",
+    )
+
+
+def main() -> int:
+    data_source = load("data_source")
+    data_source._fetch_room_info = stand_in_room_info
+    data_source.ui.render = lambda notebook, use_cache=False: stand_in_render()
+    asyncio.run(run(data_source))
+    print(f"共 {len(failures)} 项失败")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
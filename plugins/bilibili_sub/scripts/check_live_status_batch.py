@@ -0,0 +1,142 @@
+"""在本地 http.server 替身上检查批量直播状态预取的分批与失败回退
+
+替身接口按真实接口的格式返回 {"code": 0, "data": {uid: 直播间信息}}，
+UID 为 5 的倍数视为未开通直播间（不出现在 data 中）；
+包含 FAIL_CODE_UID 的批次返回风控错误码，包含 FAIL_HTTP_UID 的批次返回 HTTP 500 与非JSON内容。
+失败批次的UID不应写入周期记忆，调用方据此回退为逐个查询直播间。
+"""
+
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from _standalone import load
+
+FAIL_CODE_UID = 777
+FAIL_HTTP_UID = 888
+
+requests_seen: list[list[int]] = []
+failures: list[str] = []
+
+
+class StandInLiveStatusApi(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        uids: list[int] = body["uids"]
+        requests_seen.append(uids)
+        if FAIL_HTTP_UID in uids:
+            self._reply(500, b"<html>502 Bad Gateway</html>")
+            return
+        if FAIL_CODE_UID in uids:
+            payload = {"code": -412, "message": "请求被拦截", "data": None}
+        else:
+            payload = {
+                "code": 0,
+                "data": {
+                    str(uid): {"uid": uid, "room_id": uid * 10, "live_status": uid % 2}
+                    for uid in uids
+                    if uid % 5
+                },
+            }
+        self._reply(200, json.dumps(payload).encode())
+
+    def _reply(self, status: int, content: bytes):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check(condition: bool, description: str):
+    print(f"{'通过' if condition else '失败'}: {description}")
+    if not condition:
+        failures.append(description)
+
+
+async def run(utils, api_url: str):
+    check(
+        await utils.prefetch_live_status([1, 2, 3], api_url=api_url) == 0,
+        "检查周期外不发出请求",
+    )
+
+    with utils.fetch_cycle():
+        uids = list(range(1, 121))
+        requests = await utils.prefetch_live_status(
+            uids + uids[:10], batch_size=50, api_url=api_url
+        )
+        check(
+            requests == 3 and [len(chunk) for chunk in requests_seen] == [50, 50, 20],
+            f"120 个UID(含重复)按 50 个一批分 3 次请求: {requests} 次 "
+            f"{[len(chunk) for chunk in requests_seen]}",
+        )
+        check(
+            utils.get_prefetched_live_status(7)
+            == (True, {"uid": 7, "room_id": 70, "live_status": 1}),
+            "预取结果可按UID取用",
+        )
+        check(
+            utils.get_prefetched_live_status(10) == (True, None),
+            "未开通直播间的UID记为已预取、结果为空",
+        )
+
+        requests_seen.clear()
+        requests = await utils.prefetch_live_status(
+            [*uids, 121], batch_size=50, api_url=api_url
+        )
+        check(
+            requests == 1 and requests_seen == [[121]],
+            "同一周期内已预取的UID不再请求",
+        )
+
+        requests_seen.clear()
+        failing = [
+            *range(201, 211),
+            FAIL_CODE_UID,
+            *range(211, 221),
+            FAIL_HTTP_UID,
+            *range(221, 231),
+        ]
+        requests = await utils.prefetch_live_status(
+            failing, batch_size=11, api_url=api_url
+        )
+        check(requests == 3, f"失败批次不影响后续批次的请求: {requests} 次")
+        check(
+            not utils.get_prefetched_live_status(201)[0]
+            and not utils.get_prefetched_live_status(FAIL_CODE_UID)[0],
+            "接口返回错误码的批次未写入预取结果（回退逐个查询）",
+        )
+        check(
+            not utils.get_prefetched_live_status(215)[0]
+            and not utils.get_prefetched_live_status(FAIL_HTTP_UID)[0],
+            "HTTP 错误/非JSON响应的批次未写入预取结果（回退逐个查询）",
+        )
+        check(
+            utils.get_prefetched_live_status(225)[0],
+            "失败批次之后的批次正常写入预取结果",
+        )
+
+    check(
+        utils.get_prefetched_live_status(7) == (False, None),
+        "检查周期结束后预取结果失效",
+    )
+
+
+def main() -> int:
+    utils = load("utils")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInLiveStatusApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        asyncio.run(run(utils, f"http://127.0.0.1:{server.server_port}/status"))
+    finally:
+        server.shutdown()
+    print(f"共 {len(failures)} 项失败")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""检查直播信息流 websocket 的封包/解包，并在本地替身服务器上检查连接管理
+
+替身服务器按真实协议完成认证与心跳回复，可向指定直播间下发（zlib 压缩的）消息或主动断开，
+监视器通过 LIVE_WS_URL 配置连接到替身服务器。
+"""
+
+import asyncio
+import json
+import sys
+import zlib
+
+from _standalone import CONFIG, load
+from aiohttp import WSMsgType, web
+
+failures: list[str] = []
+
+
+def check(condition: bool, description: str):
+    print(f"{'通过' if condition else '失败'}: {description}")
+    if not condition:
+        failures.append(description)
+
+
+def check_codec(live_ws):
+    auth = json.dumps({"roomid": 1, "key": "token"}).encode()
+    packets = [
+        (live_ws.OP_AUTH, auth),
+        (live_ws.OP_HEARTBEAT, b""),
+        (live_ws.OP_HEARTBEAT_REPLY, (1234).to_bytes(4, "big")),
+        (live_ws.OP_MESSAGE, b'{"cmd":"LIVE","roomid":1}'),
+    ]
+    for operation, body in packets:
+        check(
+            live_ws.decode_packets(live_ws.encode_packet(operation, body))
+            == [(operation, body)],
+            f"单个数据包往返: op={operation}, {len(body)} 字节",
+        )
+
+    frame = b"".join(live_ws.encode_packet(op, body) for op, body in packets)
+    check(live_ws.decode_packets(frame) == packets, "一帧中的多个数据包按顺序解出")
+
+    messages = [
+        json.dumps({"cmd": cmd}).encode() for cmd in ("DANMU_MSG", "LIVE", "PREPARING")
+    ]
+    inner = b"".join(
+        live_ws.encode_packet(live_ws.OP_MESSAGE, body, live_ws.PROTO_JSON)
+        for body in messages
+    )
+    compressed = live_ws.encode_packet(
+        live_ws.OP_MESSAGE, zlib.compress(inner), live_ws.PROTO_ZLIB
+    )
+    check(
+        live_ws.decode_packets(compressed)
+        == [(live_ws.OP_MESSAGE, body) for body in messages],
+        "zlib 压缩包展开为其中的全部消息",
+    )
+    check(
+        live_ws.decode_packets(frame + compressed[:-3]) == packets,
+        "末尾不完整的数据包被忽略",
+    )
+    check(live_ws.decode_packets(b"") == [], "空数据帧")
+
+
+class StandInLiveServer:
+    def __init__(self, live_ws):
+        self.live_ws = live_ws
+        self.auths: list[int] = []
+        self.heartbeats = 0
+        self.connections: dict[int, web.WebSocketResponse] = {}
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        live_ws = self.live_ws
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type != WSMsgType.BINARY:
+                continue
+            for operation, body in live_ws.decode_packets(msg.data):
+                if operation == live_ws.OP_AUTH:
+                    room_id = json.loads(body)["roomid"]
+                    self.auths.append(room_id)
+                    self.connections[room_id] = ws
+                    await ws.send_bytes(
+                        live_ws.encode_packet(live_ws.OP_AUTH_REPLY, b'{"code":0}')
+                    )
+                elif operation == live_ws.OP_HEARTBEAT:
+                    self.heartbeats += 1
+                    await ws.send_bytes(
+                        live_ws.encode_packet(
+                            live_ws.OP_HEARTBEAT_REPLY, (1234).to_bytes(4, "big")
+                        )
+                    )
+        return ws
+
+    async def push(self, room_id: int, *commands: dict):
+        live_ws = self.live_ws
+        inner = b"".join(
+            live_ws.encode_packet(
+                live_ws.OP_MESSAGE, json.dumps(command).encode(), live_ws.PROTO_JSON
+            )
+            for command in commands
+        )
+        await self.connections[room_id].send_bytes(
+            live_ws.encode_packet(
+                live_ws.OP_MESSAGE, zlib.compress(inner), live_ws.PROTO_ZLIB
+            )
+        )
+
+
+async def check_monitor(live_ws):
+    server = StandInLiveServer(live_ws)
+    app = web.Application()
+    app.router.add_get("/sub", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    CONFIG["bilibili_sub"]["LIVE_WS_URL"] = f"http://127.0.0.1:{port}/sub"
+
+    events: list[tuple[int, str]] = []
+
+    async def on_event(room_id: int, cmd: str):
+        events.append((room_id, cmd))
+        if room_id == 119:
+            raise RuntimeError("处理失败")
+
+    monitor = live_ws.LiveWebsocketMonitor()
+    monitor.handler = on_event
+    try:
+        monitor.sync(range(100, 120))
+        await asyncio.sleep(1)
+        stats = monitor.stats()
+        check(
+            stats["connected"] == 20 and sorted(server.auths) == list(range(100, 120)),
+            f"20 个直播间各自建立连接并认证: {stats}",
+        )
+        check(server.heartbeats >= 20, f"认证后发送心跳: {server.heartbeats} 次")
+
+        await server.push(105, {"cmd": "DANMU_MSG", "info": []}, {"cmd": "LIVE"})
+        await server.push(107, {"cmd": "PREPARING", "roomid": "107"})
+        await server.push(119, {"cmd": "LIVE"})
+        await asyncio.sleep(0.2)
+        check(
+            sorted(events) == [(105, "LIVE"), (107, "PREPARING"), (119, "LIVE")],
+            f"只转发开播/下播事件: {events}",
+        )
+        check(not monitor._handler_tasks, "处理任务结束（含抛出异常的）后被移除")
+
+        await server.connections[110].close()
+        await asyncio.sleep(1.6)
+        check(
+            server.auths.count(110) == 2 and monitor.is_connected(110),
+            f"服务器断开后重连: 房间110认证 {server.auths.count(110)} 次, "
+            f"重连 {monitor.reconnects} 次",
+        )
+
+        monitor.sync(range(100, 110))
+        await asyncio.sleep(0.2)
+        check(
+            monitor.stats()["rooms"] == 10 and not monitor.is_connected(115),
+            f"取消订阅的直播间断开连接: {monitor.stats()}",
+        )
+    finally:
+        await monitor.stop()
+        await runner.cleanup()
+    check(monitor.stats()["connected"] == 0, "停止后全部断开")
+
+
+def main() -> int:
+    live_ws = load("live_ws")
+    live_ws.LIVE_WS_CONNECT_INTERVAL = 0.01
+    live_ws.LIVE_WS_HEARTBEAT_INTERVAL = 0.3
+    check_codec(live_ws)
+    asyncio.run(check_monitor(live_ws))
+    print(f"共 {len(failures)} 项失败")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import bisect
+import math
+import random
+from dataclasses import dataclass, field
+
+from .config import PUSH_MAX_AGE, base_config
+from .poll_scheduler import SubPollScheduler, estimate_request_cost
+
+FAKE_RISK_WINDOW = 5 * 60
+FAKE_RISK_LIMIT = 150
+"""伪造接口在每个 FAKE_RISK_WINDOW 秒窗口内允许的请求数，超出的请求按风控失败处理"""
+HISTORY_DAYS = 14
+SIM_EPOCH = 1_700_000_000
+
+STRATEGIES = ("adaptive", "rotation")
+
+
+@dataclass
+class SimSub:
+    """模拟订阅，只包含调度器用到的 BiliSub 字段"""
+
+    id: int
+    uid: int
+    last_dynamic_timestamp: int = 0
+    last_video_timestamp: int = 0
+    live_status: int = 0
+    push_dynamic: bool = True
+    push_video: bool = True
+    push_live: bool = False
+
+
+class FakeBilibiliApi:
+    """本地伪造的B站接口
+
+    按长尾分布为每个UP生成发布时间（少数UP一天多次更新，多数数天甚至数周一次），
+    查询时返回截至当前时间的最新发布，并按时间窗口统计请求数、模拟超限时的风控失败。
+    """
+
+    def __init__(self, uids: list[int], hours: float, seed: int):
+        rng = random.Random(seed)
+        end = hours * 3600
+        self.posts: dict[int, list[float]] = {}
+        for uid in uids:
+            rate_per_second = math.exp(rng.gauss(-1.0, 1.5)) / 86400
+            times: list[float] = []
+            t = -HISTORY_DAYS * 86400 + rng.expovariate(rate_per_second)
+            while t <= end:
+                times.append(t)
+                t += rng.expovariate(rate_per_second)
+            self.posts[uid] = times
+        self.requests = 0
+        self.rejected = 0
+        self._window_counts: dict[int, int] = {}
+
+    def latest_post(self, uid: int, now: float) -> float | None:
+        times = self.posts[uid]
+        index = bisect.bisect_right(times, now)
+        return times[index - 1] if index else None
+
+    def posts_between(self, start: float, end: float) -> int:
+        return sum(
+            bisect.bisect_right(times, end) - bisect.bisect_right(times, start)
+            for times in self.posts.values()
+        )
+
+    def check(self, uid: int, now: float, cost: int) -> tuple[bool, float | None]:
+        """模拟一次订阅检查，返回 (是否成功, 最新发布时间)"""
+        window = int(now // FAKE_RISK_WINDOW)
+        count = self._window_counts.get(window, 0) + cost
+        self._window_counts[window] = count
+        self.requests += cost
+        if count > FAKE_RISK_LIMIT:
+            self.rejected += cost
+            return False, None
+        return True, self.latest_post(uid, now)
+
+
+@dataclass
+class SimulationResult:
+    strategy: str
+    sub_count: int
+    hours: float
+    requests: int = 0
+    rejected: int = 0
+    posts: int = 0
+    pushed: int = 0
+    expired: int = 0
+    """检查到新内容时发布已超过 PUSH_MAX_AGE、只更新记录的次数"""
+    delays: list[float] = field(default_factory=list)
+
+    @property
+    def missed(self) -> int:
+        return self.posts - self.pushed
+
+    def delay_percentile(self, p: float) -> float:
+        if not self.delays:
+            return 0.0
+        ordered = sorted(self.delays)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    def describe(self) -> str:
+        return (
+            f"[{self.strategy}] 请求 {self.requests} 次 "
+            f"(平均 {self.requests / (self.hours * 60):.1f}/分钟, 风控失败 {self.rejected}), "
+            f"新内容 {self.posts} 条, 推送 {self.pushed} 条, 漏推 {self.missed} 条 "
+            f"(其中已过期 {self.expired} 条), "
+            f"推送延迟 P50 {self.delay_percentile(0.5) / 60:.1f} 分钟 / "
+            f"P90 {self.delay_percentile(0.9) / 60:.1f} 分钟"
+        )
+
+
+def simulate(
+    strategy: str, sub_count: int = 2000, hours: float = 24, seed: int = 0
+) -> SimulationResult:
+    """使用当前配置(CHECK_TIME/BATCH_SIZE/请求预算)在虚拟时钟下模拟轮询
+
+    adaptive 为当前按活跃度调度的策略，rotation 为按固定窗口依次轮询全部订阅的旧策略；
+    相同 seed 下两种策略面对完全相同的发布序列，可直接比较请求量与推送延迟。
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"未知的轮询策略: {strategy}")
+    check_minutes = max(1, base_config.get("CHECK_TIME", 15))
+    tick = check_minutes * 60
+    batch_size = base_config.get("BATCH_SIZE", 8)
+    request_budget = base_config.get("REQUEST_BUDGET_PER_MINUTE", 20) * check_minutes
+
+    subs = [SimSub(id=i, uid=i + 1) for i in range(sub_count)]
+    api = FakeBilibiliApi([sub.uid for sub in subs], hours, seed)
+    for sub in subs:
+        if (latest := api.latest_post(sub.uid, 0)) is not None:
+            sub.last_dynamic_timestamp = int(SIM_EPOCH + latest)
+
+    now = 0.0
+    scheduler = SubPollScheduler(clock=lambda: now, wall_clock=lambda: SIM_EPOCH + now)
+    scheduler.load(subs)
+    result = SimulationResult(strategy=strategy, sub_count=sub_count, hours=hours)
+    cursor = 0
+
+    for _ in range(int(hours * 3600 // tick)):
+        now += tick
+        if strategy == "adaptive":
+            due_ids = scheduler.pop_due(batch_size, request_budget)
+        else:
+            due_ids = [(cursor + k) % sub_count for k in range(batch_size)]
+            cursor = (cursor + batch_size) % sub_count
+
+        for sub_id in due_ids:
+            sub = subs[sub_id]
+            ok, latest = api.check(sub.uid, now, estimate_request_cost(sub))
+            updated = False
+            if ok and latest is not None:
+                published = int(SIM_EPOCH + latest)
+                if published > sub.last_dynamic_timestamp:
+                    if now - latest <= PUSH_MAX_AGE:
+                        result.pushed += 1
+                        result.delays.append(now - latest)
+                        updated = True
+                    else:
+                        result.expired += 1
+                    sub.last_dynamic_timestamp = published
+            if strategy == "adaptive":
+                scheduler.reschedule(sub, updated=updated)
+
+    result.requests = api.requests
+    result.rejected = api.rejected
+    result.posts = api.posts_between(0, now)
+    return result
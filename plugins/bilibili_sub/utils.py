@@ -1,22 +1,105 @@
 import asyncio
 import datetime
+import functools
+import time
 import traceback
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
+from typing import Any, TypeVar
 
+import httpx
 from bilibili_api import Credential as BilibiliCredential
 from bilibili_api import live as bilibili_live_module
 from bilibili_api import user as bilibili_user_module
-from nonebot_plugin_htmlrender import get_new_page
+from bilibili_api.exceptions import ResponseCodeException
 from zhenxun.configs.path_config import IMAGE_PATH
 from zhenxun.services.log import logger
 from zhenxun.utils.http_utils import AsyncHttpx
 
-from .config import AVATAR_CACHE_DIR, BANGUMI_COVER_CACHE_DIR, get_credential
+from .config import (
+    DYNAMIC_SCREENSHOT_TIMEOUT,
+    HTTP_TIMEOUT,
+    LIVE_STATUS_API,
+    LIVE_STATUS_BATCH_SIZE,
+    get_credential,
+)
+from .image_cache import avatar_cache, bangumi_cover_cache
+from .metrics import poll_metrics
+from .screenshot_pool import dynamic_page_pool
 
 BORDER_PATH = IMAGE_PATH / "border"
 BORDER_PATH.mkdir(parents=True, exist_ok=True)
 BASE_URL = "https://api.bilibili.com"
 
+ResultT = TypeVar("ResultT")
+
+_fetch_memo: ContextVar[dict[tuple, asyncio.Future] | None] = ContextVar(
+    "bilibili_sub_fetch_memo", default=None
+)
+
+
+@contextmanager
+def fetch_cycle() -> Iterator[None]:
+    """开启一次检查周期
+
+    周期内相同 (接口, 参数) 的API请求只发送一次，其余调用共享同一结果；
+    已处于周期内时直接沿用外层周期。
+    """
+    if _fetch_memo.get() is not None:
+        yield
+        return
+    token = _fetch_memo.set({})
+    try:
+        yield
+    finally:
+        _fetch_memo.reset(token)
+
+
+def memoize_in_cycle(
+    func: Callable[..., Awaitable[ResultT]],
+) -> Callable[..., Awaitable[ResultT]]:
+    """在检查周期内按 (接口, 参数) 记忆请求结果，周期外或指定凭证时不做记忆"""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> ResultT:
+        memo = _fetch_memo.get()
+        if memo is None or kwargs.get("auth") is not None:
+            return await func(*args, **kwargs)
+        try:
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            future = memo.get(key)
+        except TypeError:
+            return await func(*args, **kwargs)
+        if future is None:
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            memo[key] = future
+        else:
+            logger.debug(f"复用本轮检查中的请求结果: {func.__name__}{args}")
+        return await asyncio.shield(future)
+
+    return wrapper
+
+
+def count_api_errors(
+    func: Callable[..., Awaitable[ResultT]],
+) -> Callable[..., Awaitable[ResultT]]:
+    """统计接口调用失败次数（按接口与错误码/异常类型），异常原样抛出"""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> ResultT:
+        try:
+            return await func(*args, **kwargs)
+        except ResponseCodeException as e:
+            poll_metrics.record_api_error(func.__name__, f"code {e.code}")
+            raise
+        except Exception as e:
+            poll_metrics.record_api_error(func.__name__, type(e).__name__)
+            raise
+
+    return wrapper
+
 
 async def get_pic(url: str) -> bytes:
     """获取图像"""
@@ -24,41 +107,21 @@ async def get_pic(url: str) -> bytes:
 
 
 async def get_cached_avatar(uid: int, avatar_url: str) -> Path | None:
-    """获取缓存的用户头像路径，如果不存在则下载"""
+    """获取缓存的用户头像路径，不存在或头像URL变化时下载"""
     if not avatar_url or not uid:
         return None
-    cached_path = AVATAR_CACHE_DIR / f"{uid}.png"
-    if cached_path.exists():
-        logger.debug(f"头像缓存命中: UID {uid}")
-        return cached_path
-
-    logger.debug(f"头像缓存未命中，正在下载: UID {uid}")
-    try:
-        if await AsyncHttpx.download_file(avatar_url, cached_path):
-            return cached_path
-    except Exception as e:
-        logger.error(f"下载头像失败 UID: {uid}, URL: {avatar_url}", e=e)
-    return None
+    return await avatar_cache.get(uid, avatar_url)
 
 
 async def get_cached_bangumi_cover(season_or_ep_id: int, cover_url: str) -> Path | None:
-    """获取缓存的番剧或剧集封面路径，如果不存在则下载"""
+    """获取缓存的番剧或剧集封面路径，不存在或封面URL变化时下载"""
     if not cover_url or not season_or_ep_id:
         return None
-    cached_path = BANGUMI_COVER_CACHE_DIR / f"{season_or_ep_id}.png"
-    if cached_path.exists():
-        logger.debug(f"番剧封面缓存命中: ID {season_or_ep_id}")
-        return cached_path
-
-    logger.debug(f"番剧封面缓存未命中，正在下载: ID {season_or_ep_id}")
-    try:
-        if await AsyncHttpx.download_file(cover_url, cached_path):
-            return cached_path
-    except Exception as e:
-        logger.error(f"下载番剧封面失败 ID: {season_or_ep_id}, URL: {cover_url}", e=e)
-    return None
+    return await bangumi_cover_cache.get(season_or_ep_id, cover_url)
 
 
+@memoize_in_cycle
+@count_api_errors
 async def get_videos(uid: int, auth: BilibiliCredential | None = None, **kwargs):
     """获取用户投搞视频信息"""
     credential = auth or get_credential()
@@ -66,6 +129,8 @@ async def get_videos(uid: int, auth: BilibiliCredential | None = None, **kwargs)
     return await user_instance.get_videos(**kwargs)
 
 
+@memoize_in_cycle
+@count_api_errors
 async def get_user_card(
     mid: int, photo: bool = False, auth: BilibiliCredential | None = None, **kwargs
 ):
@@ -76,6 +141,8 @@ async def get_user_card(
     return user_info
 
 
+@memoize_in_cycle
+@count_api_errors
 async def get_user_dynamics(
     uid: int,
     offset: int = 0,
@@ -249,6 +316,8 @@ def _map_new_dynamic_type(
     return type_map.get(str(dynamic_type or ""), 0)
 
 
+@memoize_in_cycle
+@count_api_errors
 async def get_room_info_by_id(
     live_id: int, auth: BilibiliCredential | None = None, **kwargs
 ):
@@ -260,38 +329,89 @@ async def get_room_info_by_id(
     return await liveroom_instance.get_room_info()
 
 
+@count_api_errors
+async def get_live_status_by_uids(
+    uids: list[int], api_url: str = LIVE_STATUS_API
+) -> dict[int, dict]:
+    """通过多UID接口批量获取直播状态，返回 UID -> 直播间信息（未开通直播间的UID不在结果中）"""
+    response = await AsyncHttpx.post(
+        api_url,
+        json={"uids": uids},
+        headers={
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
+            "Referer": "https://live.bilibili.com/",
+        },
+        timeout=HTTP_TIMEOUT,
+    )
+    result = response.json()
+    if result.get("code") != 0:
+        raise ResponseCodeException(
+            result.get("code", -1),
+            result.get("message", "批量获取直播状态失败"),
+            result,
+        )
+    data = result.get("data") or {}
+    return {int(uid): info for uid, info in data.items() if isinstance(info, dict)}
+
+
+async def prefetch_live_status(
+    uids: list[int],
+    batch_size: int = LIVE_STATUS_BATCH_SIZE,
+    api_url: str = LIVE_STATUS_API,
+) -> int:
+    """在当前检查周期内分批预取直播状态，返回实际发出的请求数
+
+    结果写入周期记忆，之后通过 get_prefetched_live_status 按UID取用；
+    某一批请求失败时，该批UID回退为逐个查询直播间。
+    """
+    memo = _fetch_memo.get()
+    if memo is None:
+        return 0
+    pending = list(
+        dict.fromkeys(uid for uid in uids if ("live_status", uid) not in memo)
+    )
+    requests = 0
+    for i in range(0, len(pending), batch_size):
+        chunk = pending[i : i + batch_size]
+        requests += 1
+        try:
+            statuses = await get_live_status_by_uids(chunk, api_url=api_url)
+        except (ResponseCodeException, httpx.HTTPError, ValueError) as e:
+            logger.warning(f"批量获取直播状态失败 ({len(chunk)} 个UID): {e}")
+            continue
+        for uid in chunk:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(statuses.get(uid))
+            memo[("live_status", uid)] = future
+    if requests:
+        logger.debug(f"批量获取直播状态完成: {len(pending)} 个UID, {requests} 次请求")
+    return requests
+
+
+def get_prefetched_live_status(uid: int) -> tuple[bool, dict | None]:
+    """读取本周期预取的直播状态，返回 (是否已预取, 直播间信息)"""
+    memo = _fetch_memo.get()
+    future = memo.get(("live_status", uid)) if memo is not None else None
+    if future is None or not future.done():
+        return False, None
+    return True, future.result()
+
+
 async def get_dynamic_screenshot(dynamic_id: int) -> bytes | None:
+    """使用预热页面池截取动态卡片"""
     url = f"https://t.bilibili.com/{dynamic_id}"
+    start = time.monotonic()
     try:
-        async with get_new_page(
-            viewport={"width": 2000, "height": 1000},
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
-            device_scale_factor=3,
-        ) as page:
-            credential = get_credential()
-            if credential:
-                try:
-                    cookies = credential.get_cookies()
-                    if cookies:
-                        await page.context.add_cookies(
-                            [
-                                {
-                                    "domain": ".bilibili.com",
-                                    "name": name,
-                                    "path": "/",
-                                    "value": value,
-                                }
-                                for name, value in cookies.items()
-                            ]
-                        )
-                except Exception as e:
-                    logger.warning(f"获取 cookies 失败: {e}")
-            await page.goto(url, wait_until="networkidle")
+        async with dynamic_page_pool.borrow() as page:
+            await page.goto(
+                url, wait_until="networkidle", timeout=DYNAMIC_SCREENSHOT_TIMEOUT
+            )
             if page.url == "https://www.bilibili.com/404":
                 logger.warning(f"动态 {dynamic_id} 不存在")
                 return None
-            await page.wait_for_load_state(state="domcontentloaded")
-            card = await page.query_selector(".card")
+            card = await page.wait_for_selector(
+                ".card", timeout=DYNAMIC_SCREENSHOT_TIMEOUT
+            )
             assert card
             clip = await card.bounding_box()
             assert clip
@@ -300,8 +420,11 @@ async def get_dynamic_screenshot(dynamic_id: int) -> bytes | None:
             bar_bound = await bar.bounding_box()
             assert bar_bound
             clip["height"] = bar_bound["y"] - clip["y"]
-            return await page.screenshot(clip=clip, full_page=True)
+            image = await page.screenshot(clip=clip, full_page=True)
+            dynamic_page_pool.capture_times.append(time.monotonic() - start)
+            return image
     except Exception:
+        dynamic_page_pool.failures += 1
         logger.warning(
             f"Error in get_dynamic_screenshot({url}): {traceback.format_exc()}"
         )
@@ -45,7 +45,7 @@ __plugin_meta__ = PluginMetadata(
 - `bym clear [@user...] [-g] [-a]`：清理记忆（指定用户/当前群/整个插件）
 
 ### 状态与配置查询
-- `bym show [-g <群号>]` / `查看配置`：查看指定群组生效的人设与状态
+- `bym show [-g <群号>]` / `查看配置`：查看指定群组生效的人设与状态，以及群聊记忆缓冲的内存占用
 
 ### 属性配置快捷词
 - `bym设置 prompt/人设 <人设名> [-g 群号/--all]`：为指定群组设置 AI 人设
@@ -130,6 +130,9 @@ __plugin_meta__ = PluginMetadata(
                         "initial_load_turns": 10,
                         "vision_window": 1,
                         "idle_timeout": 1800,
+                        "max_states": 2000,
+                        "state_ttl": 86400,
+                        "max_buffer_chars": 32000,
                         "llm_summary": {
                             "enable": True,
                             "trigger_threshold": 0.7,
@@ -144,7 +147,7 @@ __plugin_meta__ = PluginMetadata(
                     "记忆与上下文分离配置。\n"
                     "- ltm_config: 共有配置，长期向量记忆 RAG。\n"
                     "- user_mode: 私聊及单用户隔离模式专属配置，包含 vision_window 视窗限制和 llm_summary 总结截断策略。\n"
-                    "- group_mode: 群组双缓冲共享记忆专属配置。包含 initial_load_turns(AI被唤醒时携带的被动群聊消息数), idle_timeout(主动会话闲置超时秒数), vision_window 和 llm_summary。"
+                    "- group_mode: 群组双缓冲共享记忆专属配置。包含 initial_load_turns(AI被唤醒时携带的被动群聊消息数), idle_timeout(主动会话闲置超时秒数), max_states(内存中最多保留的缓冲数量), state_ttl(缓冲闲置清理秒数), max_buffer_chars(单个缓冲池的字符上限), vision_window 和 llm_summary。"
                 ),
                 default_value={
                     "ltm_config": {
@@ -167,6 +170,9 @@ __plugin_meta__ = PluginMetadata(
                         "initial_load_turns": 10,
                         "vision_window": 1,
                         "idle_timeout": 1800,
+                        "max_states": 2000,
+                        "state_ttl": 86400,
+                        "max_buffer_chars": 32000,
                         "llm_summary": {
                             "enable": True,
                             "trigger_threshold": 0.7,
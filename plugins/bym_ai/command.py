@@ -21,7 +21,7 @@ from zhenxun.utils.platform import PlatformUtils
 
 from . import build_persona_list
 from .config import PERSONAS_CACHE, load_prompts, save_prompts
-from .data_source import base_config
+from .data_source import base_config, group_buffer_manager
 
 bym_cmd = on_alconna(
     Alconna(
@@ -236,7 +236,7 @@ async def _(arp: Arparma):
 
 
 @bym_cmd.assign("show")
-async def _(arp: Arparma, session: Uninfo):
+async def _(bot: Bot, arp: Arparma, session: Uninfo):
     group_id = arp.query("show.group.group_id") or (
         session.group.id if session.group else None
     )
@@ -268,13 +268,28 @@ async def _(arp: Arparma, session: Uninfo):
         str(group_id), "bym_ai", "context_mode", base_config.get("CONTEXT_MODE", "user")
     )
 
+    buffer_stats = group_buffer_manager.stats(
+        f"{PlatformUtils.get_platform(bot)}_{group_id}"
+    )
+    current = buffer_stats.get("current")
+    current_text = (
+        f"{'主动' if current['is_active'] else '被动'}池 {current['messages']} 条,"
+        f" 约 {current['chars']} 字"
+        if current
+        else "无"
+    )
+
     msg = (
         f"📊 群组 {group_id} 的 BYM_AI 配置状态：\n"
         f"🔸 设定人设: [{current_persona}]\n"
         f"🔸 实际生效: [{actual_persona}]{fallback_msg}\n"
         f"🔸 随机回复: {'开启' if chat_enabled else '关闭'}\n"
         f"🔸 触发概率: {chat_rate}\n"
-        f"🔸 记忆模式: {'群组共享(group)' if context_mode == 'group' else '用户隔离(user)'}"
+        f"🔸 记忆模式: {'群组共享(group)' if context_mode == 'group' else '用户隔离(user)'}\n"
+        f"🔸 本群记忆缓冲: {current_text}\n"
+        f"🔸 全部记忆缓冲: {buffer_stats['states']} 个会话"
+        f" (活跃 {buffer_stats['active']}), {buffer_stats['messages']} 条消息,"
+        f" 约 {buffer_stats['chars']} 字, 已淘汰 {buffer_stats['evicted']} 个"
     )
     await MessageUtils.build_message(msg).finish(reply_to=True)
 
@@ -210,6 +210,9 @@ load_prompts()
 
 DEFAULT_GROUP = "DEFAULT"
 
+NON_TEXT_PART_CHARS = 1000
+"""估算缓冲区大小时，图片等非文本内容按该字符数计"""
+
 JINJA2_PROMPT_TEMPLATE = """[系统上下文状态]
 时间: {{ time }}
 当前环境: {% if group_id and group_id != 'DEFAULT' %}QQ群聊 {{ group_name }}({{ group_id }}){% else %}私聊{% endif %}
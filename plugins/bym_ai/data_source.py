@@ -1,5 +1,5 @@
 import time
-from collections import defaultdict
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any
 
@@ -43,11 +43,13 @@ from zhenxun.utils.utils import infer_plugin_namespace
 
 from .config import (
     JINJA2_PROMPT_TEMPLATE,
+    NON_TEXT_PART_CHARS,
     PERSONAS_CACHE,
     ULTIMATE_FALLBACK_PERSONA,
     base_config,
 )
 from .models import (
+    BufferCounters,
     BymAiMemoryRecord,
     BymAiVectorRecord,
     GroupChatState,
@@ -377,23 +379,145 @@ async def build_bym_system_prompt(
         return [ULTIMATE_FALLBACK_PERSONA]
 
 
+def estimate_message_size(msg: LLMMessage) -> int:
+    """粗略估算消息占用的字符数，图片等非文本内容按固定开销计"""
+    content = msg.content
+    if isinstance(content, str):
+        size = len(content)
+    else:
+        size = 0
+        for part in content or []:
+            text = getattr(part, "text", None)
+            size += len(text) if isinstance(text, str) else NON_TEXT_PART_CHARS
+    if tool_calls := getattr(msg, "tool_calls", None):
+        size += len(str(tool_calls))
+    return size
+
+
+def _is_summary(msg: LLMMessage) -> bool:
+    return bool(msg.metadata and msg.metadata.get("is_summary", False))
+
+
+def _has_media(msg: LLMMessage) -> bool:
+    content = msg.content
+    if isinstance(content, str):
+        return False
+    return any(
+        not isinstance(getattr(part, "text", None), str) for part in content or []
+    )
+
+
+def _count(counters: BufferCounters, msgs: list[LLMMessage], sign: int = 1):
+    """将消息计入(sign=1)或移出(sign=-1)缓冲池统计"""
+    for msg in msgs:
+        counters.chars += sign * estimate_message_size(msg)
+        if _has_media(msg):
+            counters.media += sign
+        if _is_summary(msg):
+            continue
+        if msg.role == "user":
+            counters.user_turns += sign
+        elif msg.role == "assistant":
+            counters.assistant_turns += sign
+
+
+def _recount(msgs: list[LLMMessage]) -> BufferCounters:
+    counters = BufferCounters()
+    _count(counters, msgs)
+    return counters
+
+
+def _media_start(buffer: list[LLMMessage], media_count: int) -> int:
+    """从末尾向前找到仍带有图片的最早一条消息的位置，只扫描到这条消息为止"""
+    seen = 0
+    for index in range(len(buffer) - 1, -1, -1):
+        if _has_media(buffer[index]):
+            seen += 1
+            if seen >= media_count:
+                return index
+    return 0
+
+
+async def _reduce_media(
+    reducer: MultimodalPlaceholderReducer,
+    buffer: list[LLMMessage],
+    counters: BufferCounters,
+) -> list[LLMMessage]:
+    """对缓冲池运行图片占位符压缩并同步扣减统计
+
+    视觉窗口从末尾起算，更早的消息不会被改动，因此只把仍带有图片的最早一条消息之后的部分
+    交给压缩器并重新统计这一段，图片停留在窗口内时不必每条消息都全量扫描缓冲池。
+    """
+    start = _media_start(buffer, counters.media)
+    tail = buffer[start:]
+    reduced, _, _ = await reducer.reduce(tail, 0, "", 0)
+    _count(counters, tail, -1)
+    _count(counters, reduced)
+    buffer[start:] = reduced
+    return buffer
+
+
+def trim_to_budget(
+    buffer: list[LLMMessage], counters: BufferCounters, max_chars: int
+) -> list[LLMMessage]:
+    """从最早的消息开始丢弃直至不超过字符预算并同步扣减统计，保留最近一条总结消息，且不会留下孤立的工具结果"""
+    if max_chars <= 0 or counters.chars <= max_chars:
+        return buffer
+    start = 0
+    summary = None
+    while start < len(buffer) - 1 and (
+        counters.chars > max_chars or buffer[start].role == "tool"
+    ):
+        if _is_summary(buffer[start]):
+            summary = buffer[start]
+        _count(counters, [buffer[start]], -1)
+        start += 1
+    if summary is None:
+        return buffer[start:]
+    _count(counters, [summary])
+    return [summary, *buffer[start:]]
+
+
 class VolatileGroupBufferManager:
-    """易失性群组双缓冲管理器：分离被动嗅探池与主动会话池"""
+    """易失性群组双缓冲管理器：分离被动嗅探池与主动会话池
+
+    状态按最近写入顺序保存，写入时淘汰闲置超过 state_ttl 或超出 max_states 的最久未用状态，
+    每个缓冲池的内容按 max_buffer_chars 截断，保证长时间运行在大量群组中时内存有界。
+    """
 
     def __init__(self):
-        self._states: dict[str, GroupChatState] = defaultdict(GroupChatState)
+        self._states: OrderedDict[str, GroupChatState] = OrderedDict()
+        self.evicted = 0
 
     def get_state(self, key: str) -> GroupChatState:
-        """获取指定键的状态机对象"""
-        return self._states[key]
+        """获取指定键的状态机对象，不存在时创建"""
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = GroupChatState()
+        return state
 
     def get_messages(self, key: str, idle_timeout: int) -> list[LLMMessage]:
         """获取指定键的历史消息副本：严格根据活跃状态与超时判定决定返回哪个池子"""
-        state = self._states[key]
+        state = self._states.get(key)
+        if state is None:
+            return []
         if state.is_active and (time.time() - state.last_active_time <= idle_timeout):
             return state.active_buffer.copy()
         return state.passive_buffer.copy()
 
+    def _evict(self, config: GroupModeMemoryConfig, current_time: float):
+        """淘汰闲置过久的状态，并将状态数量控制在上限内"""
+        while self._states:
+            key, state = next(iter(self._states.items()))
+            if (
+                len(self._states) <= config.max_states
+                and current_time - state.last_message_time <= config.state_ttl
+            ):
+                break
+            self._states.pop(key)
+            self.evicted += 1
+            logger.debug(f"群聊记忆缓冲已淘汰: {key}", "BYM_AI")
+
     async def add_messages(
         self,
         key: str,
@@ -403,96 +527,97 @@ class VolatileGroupBufferManager:
         model_name: str | None = None,
     ):
         """双缓冲状态机核心：处理消息追加、超时降级、唤醒跃迁和主动总结"""
-        state = self._states[key]
         current_time = time.time()
+        state = self.get_state(key)
+        state.last_message_time = current_time
+        self._states.move_to_end(key)
+        self._evict(config, current_time)
 
         if state.is_active and (
             current_time - state.last_active_time > config.idle_timeout
         ):
-            recent = (
-                state.active_buffer[-config.initial_load_turns :]
-                if config.initial_load_turns > 0
-                else []
-            )
-            state.passive_buffer = recent
-            state.active_buffer.clear()
-            state.is_active = False
+            self._demote(state, config)
 
         if is_active_trigger:
             state.last_active_time = current_time
             if not state.is_active:
                 state.active_buffer.extend(state.passive_buffer)
-                state.passive_buffer.clear()
+                _count(state.active_counters, state.passive_buffer)
+                state.passive_buffer = []
+                state.passive_counters = BufferCounters()
                 state.is_active = True
 
         reducer = MultimodalPlaceholderReducer(window_size=config.vision_window)
 
         if state.is_active:
             state.active_buffer.extend(new_msgs)
-            if config.vision_window >= 0:
-                state.active_buffer, _, _ = await reducer.reduce(
-                    state.active_buffer, 0, "", 0
+            _count(state.active_counters, new_msgs)
+            # 只有缓冲池中仍有未替换的图片时才需要运行占位符压缩
+            if config.vision_window >= 0 and state.active_counters.media:
+                state.active_buffer = await _reduce_media(
+                    reducer, state.active_buffer, state.active_counters
                 )
+            state.active_buffer = trim_to_budget(
+                state.active_buffer, state.active_counters, config.max_buffer_chars
+            )
 
-            if config.llm_summary.enable and model_name:
-                user_turns = sum(
-                    1
-                    for m in state.active_buffer
-                    if m.role == "user"
-                    and not (m.metadata and m.metadata.get("is_summary", False))
-                )
-                if user_turns > config.llm_summary.max_history_turns:
-                    if state.is_summarizing:
-                        logger.debug("⏳ 正在后台总结压缩中，跳过本次触发...", "BYM_AI")
-                    else:
-                        working_msgs = [
-                            m
-                            for m in state.active_buffer
-                            if not (m.metadata and m.metadata.get("is_summary", False))
-                            and m.role != "system"
-                        ]
-                        has_recent_assistant = any(
-                            m.role == "assistant" for m in working_msgs
+            if (
+                config.llm_summary.enable
+                and model_name
+                and state.active_counters.user_turns
+                > config.llm_summary.max_history_turns
+            ):
+                if state.is_summarizing:
+                    logger.debug("⏳ 正在后台总结压缩中，跳过本次触发...", "BYM_AI")
+                elif state.active_counters.assistant_turns:
+                    state.is_summarizing = True
+                    try:
+                        summarizer = LLMSummarizerReducer(
+                            keep_recent_turns=config.llm_summary.keep_recent_turns,
+                            trigger_tokens=9999999,
+                            max_turns=config.llm_summary.max_history_turns,
+                            summarization_model=config.llm_summary.summarization_model,
+                            summarization_prompt=config.llm_summary.summarization_prompt,
                         )
-
-                        if has_recent_assistant:
-                            state.is_summarizing = True
-                            try:
-                                summarizer = LLMSummarizerReducer(
-                                    keep_recent_turns=config.llm_summary.keep_recent_turns,
-                                    trigger_tokens=9999999,
-                                    max_turns=config.llm_summary.max_history_turns,
-                                    summarization_model=config.llm_summary.summarization_model,
-                                    summarization_prompt=config.llm_summary.summarization_prompt,
-                                )
-                                state.active_buffer, _, _ = await summarizer.reduce(
-                                    state.active_buffer, 9999999, model_name, 0
-                                )
-                            finally:
-                                state.is_summarizing = False
-                        else:
-                            logger.debug(
-                                "群聊中AI近期未参与互动，触发水群刷屏超限，已执行静默降级...",
-                                "BYM_AI",
-                            )
-                            recent = (
-                                state.active_buffer[-config.initial_load_turns :]
-                                if config.initial_load_turns > 0
-                                else []
-                            )
-                            state.passive_buffer = recent
-                            state.active_buffer.clear()
-                            state.is_active = False
+                        state.active_buffer, _, _ = await summarizer.reduce(
+                            state.active_buffer, 9999999, model_name, 0
+                        )
+                        state.active_counters = _recount(state.active_buffer)
+                    finally:
+                        state.is_summarizing = False
+                else:
+                    logger.debug(
+                        "群聊中AI近期未参与互动，触发水群刷屏超限，已执行静默降级...",
+                        "BYM_AI",
+                    )
+                    self._demote(state, config)
         else:
             state.passive_buffer.extend(new_msgs)
-            if len(state.passive_buffer) > config.initial_load_turns:
-                state.passive_buffer = state.passive_buffer[
-                    -config.initial_load_turns :
-                ]
-            if config.vision_window >= 0:
-                state.passive_buffer, _, _ = await reducer.reduce(
-                    state.passive_buffer, 0, "", 0
+            _count(state.passive_counters, new_msgs)
+            overflow = len(state.passive_buffer) - max(config.initial_load_turns, 0)
+            if overflow > 0:
+                _count(state.passive_counters, state.passive_buffer[:overflow], -1)
+                state.passive_buffer = state.passive_buffer[overflow:]
+            if config.vision_window >= 0 and state.passive_counters.media:
+                state.passive_buffer = await _reduce_media(
+                    reducer, state.passive_buffer, state.passive_counters
                 )
+            state.passive_buffer = trim_to_budget(
+                state.passive_buffer, state.passive_counters, config.max_buffer_chars
+            )
+
+    @staticmethod
+    def _demote(state: GroupChatState, config: GroupModeMemoryConfig):
+        """主动会话降级为被动嗅探，仅保留最近 initial_load_turns 条消息"""
+        state.passive_buffer = (
+            state.active_buffer[-config.initial_load_turns :]
+            if config.initial_load_turns > 0
+            else []
+        )
+        state.passive_counters = _recount(state.passive_buffer)
+        state.active_buffer = []
+        state.active_counters = BufferCounters()
+        state.is_active = False
 
     def clear_group(self, key: str):
         """清理指定群组/用户的记忆，销毁状态"""
@@ -507,5 +632,28 @@ class VolatileGroupBufferManager:
         """清理整个插件的所有临时记忆"""
         self._states.clear()
 
+    def stats(self, key: str | None = None) -> dict[str, Any]:
+        """统计缓冲占用：状态数、活跃数、消息数与估算字符数；指定 key 时附带该会话的占用"""
+        states = self._states.values()
+        result: dict[str, Any] = {
+            "states": len(self._states),
+            "active": sum(1 for state in states if state.is_active),
+            "messages": sum(
+                len(state.passive_buffer) + len(state.active_buffer) for state in states
+            ),
+            "chars": sum(
+                state.passive_counters.chars + state.active_counters.chars
+                for state in states
+            ),
+            "evicted": self.evicted,
+        }
+        if key is not None and (state := self._states.get(key)):
+            result["current"] = {
+                "is_active": state.is_active,
+                "messages": len(state.passive_buffer) + len(state.active_buffer),
+                "chars": state.passive_counters.chars + state.active_counters.chars,
+            }
+        return result
+
 
 group_buffer_manager = VolatileGroupBufferManager()
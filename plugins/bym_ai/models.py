@@ -77,6 +77,12 @@ class GroupModeMemoryConfig(BaseModel):
     """多模态消息视窗限制轮数"""
     idle_timeout: int = 1800
     """主动会话的闲置超时时间（秒）"""
+    max_states: int = 2000
+    """内存中最多保留的群组/私聊缓冲数量，超出时淘汰最久未收到消息的"""
+    state_ttl: int = 86400
+    """缓冲闲置超过该时间（秒）后被清理"""
+    max_buffer_chars: int = 32000
+    """单个缓冲池的内容长度上限（按字符估算，0 为不限制），超出时丢弃最早的消息"""
     llm_summary: LLMSummaryConfig = Field(
         default_factory=lambda: LLMSummaryConfig(
             max_history_turns=30,
@@ -98,6 +104,19 @@ class BymMemorySettings(BaseModel):
     """群组双缓冲共享记忆专属配置"""
 
 
+class BufferCounters(BaseModel):
+    """缓冲池的增量统计，随消息追加与裁剪同步更新，避免每条消息都全量扫描缓冲池"""
+
+    user_turns: int = 0
+    """非总结的用户消息数"""
+    assistant_turns: int = 0
+    """非总结的助手消息数"""
+    media: int = 0
+    """仍带有图片等非文本内容的消息数"""
+    chars: int = 0
+    """估算的内容字符数"""
+
+
 class GroupChatState(BaseModel):
     """群组聊天的双缓冲物理状态机"""
 
@@ -105,9 +124,15 @@ class GroupChatState(BaseModel):
     """当前群组会话是否处于活跃状态"""
     last_active_time: float = Field(default_factory=time.time)
     """上一次活跃的时间戳"""
+    last_message_time: float = Field(default_factory=time.time)
+    """最近一次写入消息的时间戳，用于闲置淘汰"""
     passive_buffer: list[LLMMessage] = Field(default_factory=list)
     """被动嗅探消息缓冲区"""
     active_buffer: list[LLMMessage] = Field(default_factory=list)
     """主动会话消息缓冲区"""
+    passive_counters: BufferCounters = Field(default_factory=BufferCounters)
+    """被动嗅探缓冲区的增量统计"""
+    active_counters: BufferCounters = Field(default_factory=BufferCounters)
+    """主动会话缓冲区的增量统计"""
     is_summarizing: bool = False
     """标记当前是否正在进行大模型后台压缩，用于防并发竞争"""
@@ -0,0 +1,168 @@
+"""脱离 NoneBot/真寻 运行环境加载插件模块
+
+宿主框架的接口由可任意调用、也可作为基类的通用替身代替；被测代码实际用到的消息模型与
+图片占位符压缩器按真寻 AI 框架的接口写了简化替身，插件自身的模块按文件原样加载，
+供 scripts 下的基准脚本使用（python plugins/bym_ai/scripts/xxx.py）。
+"""
+
+import importlib
+import importlib.abc
+import importlib.machinery
+import sys
+import tempfile
+import tomllib
+import types
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "bym_ai"
+HOST_PACKAGES = {
+    "arclet",
+    "nonebot",
+    "nonebot_plugin_alconna",
+    "nonebot_plugin_uninfo",
+    "nonebot_plugin_waiter",
+    "zhenxun",
+}
+
+CONFIG: dict[str, dict] = {PACKAGE: {}}
+"""Config.get 返回的配置，需在 load 之前修改"""
+
+
+class _Anything:
+    """可实例化、调用、读取任意属性，也可作为基类的通用替身"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+    def __getattr__(self, name):
+        return _Anything()
+
+    def __mro_entries__(self, bases):
+        return (object,)
+
+
+class _HostModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Anything()
+
+
+class _HostFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """宿主框架的模块一律以通用替身模块导入"""
+
+    def find_spec(self, name, path, target=None):
+        if name.split(".")[0] in HOST_PACKAGES:
+            return importlib.machinery.ModuleSpec(name, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        return _HostModule(spec.name)
+
+    def exec_module(self, module):
+        module.__path__ = []
+
+
+class _Logger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _Config:
+    @staticmethod
+    def get(module: str) -> dict:
+        return CONFIG.setdefault(module, {})
+
+
+class ContentPart(BaseModel):
+    text: str | None = None
+    image_url: str | None = None
+
+
+class LLMMessage(BaseModel):
+    role: str
+    content: str | list[ContentPart] | None = ""
+    metadata: dict[str, Any] | None = None
+    tool_calls: list | None = None
+
+
+class MultimodalPlaceholderReducer:
+    """图片占位符压缩器替身：最近 window_size 轮用户消息之外的图片替换为文字占位符"""
+
+    calls = 0
+
+    def __init__(self, window_size: int):
+        self.window_size = window_size
+
+    async def reduce(self, messages: list[LLMMessage], *args):
+        type(self).calls += 1
+        reduced: list[LLMMessage] = []
+        user_turns = 0
+        for msg in reversed(messages):
+            if msg.role == "user":
+                user_turns += 1
+            if user_turns > self.window_size and isinstance(msg.content, list):
+                parts = [
+                    part if part.text is not None else ContentPart(text="[图片]")
+                    for part in msg.content
+                ]
+                if parts != msg.content:
+                    msg = msg.model_copy(update={"content": parts})
+            reduced.append(msg)
+        reduced.reverse()
+        return reduced, 0, 0
+
+
+class LLMSummarizerReducer:
+    """总结压缩器替身：以一条总结消息代替保留轮数之外的历史"""
+
+    def __init__(self, keep_recent_turns: int, **kwargs):
+        self.keep_recent_turns = keep_recent_turns
+
+    async def reduce(self, messages: list[LLMMessage], *args):
+        summary = LLMMessage(
+            role="system", content="（历史总结）", metadata={"is_summary": True}
+        )
+        return [summary, *messages[-self.keep_recent_turns * 2 :]], 0, 0
+
+
+def _module(name: str, path: Path | None = None, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__path__ = [str(path)] if path else []
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def _install_stand_ins():
+    sys.meta_path.insert(0, _HostFinder())
+    data_path = Path(tempfile.mkdtemp(prefix=f"{PACKAGE}_"))
+    sys.modules["tomli"] = tomllib
+    _module("zhenxun.configs.config", Config=_Config)
+    _module("zhenxun.configs.path_config", DATA_PATH=data_path)
+    _module("zhenxun.services.log", logger=_Logger())
+    _module(
+        "zhenxun.services.ai.core.messages",
+        ChatResponse=_Anything,
+        LLMMessage=LLMMessage,
+    )
+    _module(
+        "zhenxun.services.ai.context.memory.compression",
+        LLMSummarizerReducer=LLMSummarizerReducer,
+        MultimodalPlaceholderReducer=MultimodalPlaceholderReducer,
+    )
+
+
+def load(module: str) -> types.ModuleType:
+    """加载插件内的模块，如 load("data_source")，不执行插件的 __init__"""
+    if PACKAGE not in sys.modules:
+        _install_stand_ins()
+        _module(PACKAGE, PLUGIN_DIR)
+    return importlib.import_module(f"{PACKAGE}.{module}")
@@ -0,0 +1,92 @@
+"""群聊缓冲池 add_messages 的微基准
+
+主动会话池预先填充 N 条消息后，逐条追加 2000 条消息并统计单次调用耗时。对照组在每次压缩时
+把整个缓冲池交给占位符压缩器并全量重新统计；当前实现只处理仍带有图片的尾部。
+两组的缓冲池内容与统计结果需要完全一致，统计也需要与全量重新统计一致。
+"""
+
+import asyncio
+import sys
+import time
+
+from _standalone import ContentPart, LLMMessage, MultimodalPlaceholderReducer, load
+
+APPEND_COUNT = 2000
+VISION_WINDOW = 4
+
+
+async def full_rescan(reducer, buffer, counters):
+    reduced, _, _ = await reducer.reduce(buffer, 0, "", 0)
+    fresh = data_source._recount(reduced)
+    for name in type(counters).model_fields:
+        setattr(counters, name, getattr(fresh, name))
+    return reduced
+
+
+def make_message(index: int, image_every: int) -> LLMMessage:
+    if image_every and index % image_every == 0:
+        return LLMMessage(
+            role="user",
+            content=[ContentPart(text="看这个"), ContentPart(image_url="https://x")],
+        )
+    return LLMMessage(role="user", content=f"[用户{index % 7}]: 第{index}条消息")
+
+
+async def run(prefill: int, image_every: int, incremental: bool):
+    data_source._reduce_media = reduce_media if incremental else full_rescan
+    config = models.GroupModeMemoryConfig(
+        initial_load_turns=10,
+        vision_window=VISION_WINDOW,
+        max_buffer_chars=0,
+        llm_summary={"max_history_turns": 10**6, "keep_recent_turns": 3},
+    )
+    manager = data_source.VolatileGroupBufferManager()
+    state = manager.get_state("group")
+    state.is_active = True
+    state.last_active_time = time.time() + 10**6
+    await manager.add_messages(
+        "group",
+        [LLMMessage(role="user", content="x" * 60) for _ in range(prefill)],
+        config,
+        is_active_trigger=True,
+    )
+
+    MultimodalPlaceholderReducer.calls = 0
+    elapsed = 0.0
+    for i in range(APPEND_COUNT):
+        message = make_message(i, image_every)
+        start = time.perf_counter()
+        await manager.add_messages("group", [message], config)
+        elapsed += time.perf_counter() - start
+    return elapsed / APPEND_COUNT * 1e6, MultimodalPlaceholderReducer.calls, state
+
+
+def main() -> int:
+    mismatches = 0
+    print(f"每次追加1条消息, 共 {APPEND_COUNT} 次, 视觉窗口 {VISION_WINDOW} 轮")
+    for prefill in (100, 1000, 5000, 20000):
+        for image_every in (0, 50, 10):
+            old_us, old_calls, old_state = asyncio.run(run(prefill, image_every, False))
+            new_us, new_calls, new_state = asyncio.run(run(prefill, image_every, True))
+            same = (
+                old_state.active_buffer == new_state.active_buffer
+                and old_state.active_counters == new_state.active_counters
+                and new_state.active_counters
+                == data_source._recount(new_state.active_buffer)
+            )
+            mismatches += not same
+            images = f"每{image_every}条1张图" if image_every else "纯文本"
+            print(
+                f"缓冲池 {prefill:>5} 条, {images:<8}: "
+                f"全量重算 {old_us:8.1f} us/条 -> 仅处理尾部 {new_us:6.1f} us/条 "
+                f"(压缩器调用 {old_calls}/{new_calls} 次){'' if same else ' 结果不一致!'}"
+            )
+    return 1 if mismatches else 0
+
+
+data_source = load("data_source")
+models = load("models")
+reduce_media = data_source._reduce_media
+
+if __name__ == "__main__":
+    sys.exit(main())
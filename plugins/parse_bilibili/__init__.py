@@ -7,7 +7,9 @@ from bilibili_api import select_client
 from nonebot import get_driver, on_message
 from nonebot.adapters import Bot, Event
 from nonebot.plugin import PluginMetadata
+from nonebot.typing import T_State
 from nonebot_plugin_alconna import Image, Segment, Text, UniMessage, UniMsg
+from nonebot_plugin_alconna.uniseg import Hyper
 from nonebot_plugin_session import EventSession
 from nonebot_plugin_uninfo import Uninfo
 from zhenxun.configs.utils import PluginExtraData, RegisterConfig, Task
@@ -20,6 +22,7 @@ from .commands import (
     bili_cover_matcher,
     bili_download_matcher,
     credential_status_matcher,
+    download_stats_matcher,
     login_matcher,
 )
 from .config import (
@@ -33,6 +36,7 @@ from .model import ArticleInfo, LiveInfo, SeasonInfo, UserInfo, VideoInfo
 from .services.cache_service import CacheService
 from .services.download_service import DownloadTask, download_manager
 from .services.network_service import ParserService
+from .services.utility_service import screenshot_pool
 from .utils.exceptions import (
     BilibiliBaseException,
     ResourceNotFoundError,
@@ -41,18 +45,20 @@ from .utils.exceptions import (
 )
 from .utils.message import (
     MessageBuilder,
+    prefetch_assets,
     render_live_info_to_image,
     render_season_info_to_image,
     render_user_info_to_image,
     render_video_info_to_image,
 )
-from .utils.url_parser import UrlParserRegistry, extract_bilibili_url_from_message
+from .utils.url_parser import BilibiliUrlScanner, extract_bilibili_url_from_message
 
 _ = (  # type: ignore
     login_matcher,
     bili_download_matcher,
     bili_cover_matcher,
     credential_status_matcher,
+    download_stats_matcher,
 )
 
 
@@ -88,6 +94,9 @@ async def _shutdown():
 
     from bilibili_api.utils.network import get_session
 
+    await CacheService.flush_url_cache()
+    await screenshot_pool.close()
+
     session = cast(httpx.AsyncClient, get_session())
     if session and not session.is_closed:
         await session.aclose()
@@ -150,6 +159,12 @@ __plugin_meta__ = PluginMetadata(
 - **命令**: `bili状态`
 
 > 查询当前 B 站账号的登录凭证状态，如是否有效、是否需要刷新等。
+
+**7. 运行统计 (仅限**超级用户**)**
+
+- **命令**: `bili统计`
+
+> 查看最近下载任务的排队等待、下载吞吐、合并/转码/上传耗时的百分位数，以及各级缓存的命中情况。
     """.strip(),
     extra=PluginExtraData(
         author="leekooyo",
@@ -225,7 +240,7 @@ __plugin_meta__ = PluginMetadata(
                 key="MAX_VIDEO_CACHE_SIZE_MB",
                 value=1024,
                 default_value=1024,
-                help="视频缓存最大大小(MB), 超过此大小自动清理最旧的缓存",
+                help="视频缓存最大大小(MB), 超过此大小按最近最少使用顺序淘汰缓存，设为0不限制",
                 type=int,
             ),
             RegisterConfig(
@@ -236,6 +251,22 @@ __plugin_meta__ = PluginMetadata(
                 help="视频下载质量(16=360P, 32=480P, 64=720P, 80=1080P)",
                 type=int,
             ),
+            RegisterConfig(
+                module=MODULE_NAME,
+                key="STREAMING_MERGE",
+                value=True,
+                default_value=True,
+                help="是否启用边下载边合并（FFmpeg直接读取音视频流），失败时自动回退到先下载后合并",
+                type=bool,
+            ),
+            RegisterConfig(
+                module=MODULE_NAME,
+                key="ENABLE_TRANSCODE",
+                value=False,
+                default_value=False,
+                help="最低清晰度仍超过下载大小限制时，是否按目标大小重新编码视频（消耗较多CPU）",
+                type=bool,
+            ),
             RegisterConfig(
                 module="BiliBili",
                 key="COOKIES",
@@ -250,49 +281,50 @@ __plugin_meta__ = PluginMetadata(
 )
 
 
-async def _rule(uninfo: Uninfo, message: UniMsg) -> bool:
-    plain_text = message.extract_plain_text().strip()
-    if await CommonUtils.task_is_block(uninfo, "parse_bilibili"):
-        return False
-    if plain_text.startswith(("bili下载", "b站下载")):
-        logger.debug("消息被识别为 bili下载 命令，被动解析跳过", "B站解析")
-        return False
+_COMMAND_PREFIXES = ("bili下载", "b站下载", "bili封面", "b站封面")
 
+
+async def _rule(uninfo: Uninfo, message: UniMsg, state: T_State) -> bool:
     plain_text = message.extract_plain_text().strip()
-    if (
-        plain_text.startswith("bili下载")
-        or plain_text.startswith("b站下载")
-        or plain_text.startswith("bili封面")
-        or plain_text.startswith("b站封面")
-    ):
+    if plain_text.startswith(_COMMAND_PREFIXES):
         logger.debug(f"消息文本以命令开头，被动解析跳过: {plain_text}", "B站解析")
         return False
 
-    check_hyper = base_config.get("ENABLE_MINIAPP_PARSE", True)
-    if not check_hyper:
-        logger.debug("小程序/卡片解析已禁用，跳过 Hyper 检查", "B站解析")
-
-    url = extract_bilibili_url_from_message(message, check_hyper=check_hyper)
+    scan_result = BilibiliUrlScanner.scan(plain_text) if plain_text else None
+    hyper_url = None
 
-    if url:
-        logger.debug(f"从消息中提取到B站URL: {url}", "B站解析")
-        return True
+    if not scan_result:
+        check_hyper = base_config.get("ENABLE_MINIAPP_PARSE", True)
+        has_hyper_candidate = check_hyper and any(
+            isinstance(seg, Hyper)
+            and seg.raw
+            and BilibiliUrlScanner.may_contain(seg.raw)
+            for seg in message
+        )
+        if has_hyper_candidate:
+            hyper_url = extract_bilibili_url_from_message(message, check_hyper=True)
+        if not hyper_url:
+            return False
 
-    plain_text_for_check = message.extract_plain_text().strip()
-    if plain_text_for_check:
-        logger.debug(f"检查文本内容: '{plain_text_for_check[:100]}...'", "B站解析")
-        parser_found = UrlParserRegistry.get_parser(plain_text_for_check)
-        if (
-            parser_found
-            and parser_found.__name__ == "PureVideoIdParser"
-            and hasattr(parser_found, "PATTERN")
-        ):
-            if parser_found.PATTERN.fullmatch(plain_text_for_check):  # type: ignore
-                logger.debug("文本内容匹配到纯视频ID，符合规则", "B站解析")
-                return True
+    if await CommonUtils.task_is_block(uninfo, "parse_bilibili"):
+        return False
 
-    logger.debug("消息不符合被动解析规则", "B站解析")
-    return False
+    # 识别结果交给处理函数，避免再次提取与匹配URL
+    if scan_result:
+        resource_type, resource_id = scan_result
+        logger.debug(
+            f"从消息文本识别到B站资源: {resource_type.name} {resource_id}",
+            "B站解析",
+        )
+        state["bili_target"] = (
+            resource_type,
+            resource_id,
+            BilibiliUrlScanner.to_url(resource_type, resource_id),
+        )
+    else:
+        logger.debug("从小程序/卡片中识别到B站链接", "B站解析")
+        state["bili_target"] = (None, None, hyper_url)
+    return True
 
 
 async def _create_rendered_message(
@@ -376,6 +408,7 @@ async def _build_message_for_content(
         if isinstance(content, content_type):
             type_name = content_type.__name__.replace("Info", "").upper()
             if base_config.get(f"ENABLE_{type_name}_PARSE", True):
+                prefetch_assets(content)
                 return await _create_rendered_message(
                     content, render_func, builder_func, render_enabled
                 )
@@ -395,15 +428,10 @@ async def _(
     bot: Bot,
     event: Event,
     session: EventSession,
-    message: UniMsg,
+    state: T_State,
     group_config: GroupSettings = GetGroupConfig(GroupSettings),
 ):
-    check_hyper = base_config.get("ENABLE_MINIAPP_PARSE", True)
-    target_url = extract_bilibili_url_from_message(message, check_hyper=check_hyper)
-
-    if not target_url:
-        logger.debug("被动解析：在消息中未找到有效的B站URL/ID，退出处理。")  # type: ignore
-        return
+    resource_type, resource_id, target_url = state["bili_target"]
 
     if not await CacheService.should_parse_url(target_url, session):
         logger.debug(f"被动解析：URL在缓存中且TTL未过期，跳过: {target_url}")
@@ -411,7 +439,12 @@ async def _(
 
     try:
         logger.info(f"被动解析：开始解析URL: {target_url}", session=session)
-        parsed_content = await ParserService.parse(target_url)
+        if resource_type:
+            parsed_content = await ParserService.parse_resource(
+                resource_type, resource_id, target_url
+            )
+        else:
+            parsed_content = await ParserService.parse(target_url)
 
         if not parsed_content:
             return
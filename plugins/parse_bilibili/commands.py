@@ -15,11 +15,19 @@ from nonebot_plugin_alconna import AlconnaMatcher, AlconnaMatches, on_alconna
 from zhenxun.builtin_plugins.superuser.plugin_config_manager import pconf_cmd
 from zhenxun.services.log import logger
 
-from .config import get_credential, save_credential_to_file
+from .config import MAX_CONCURRENT_DOWNLOADS, get_credential, save_credential_to_file
+from .services.cache_service import CacheService
 from .services.cover_service import CoverService
 from .services.download_service import DownloadTask, download_manager
+from .services.metadata_cache import metadata_cache
 from .services.network_service import ParserService
+from .services.short_url_cache import short_url_cache
+from .services.transcode_service import transcode_pool
+from .services.utility_service import screenshot_pool
+from .utils.asset_cache import asset_cache
 from .utils.exceptions import BilibiliBaseException
+from .utils.metrics import download_metrics
+from .utils.render_cache import render_cache
 from .utils.url_parser import extract_bilibili_url_from_event
 
 bili_cover_cmd = Alconna("bili封面")
@@ -142,6 +150,9 @@ login_matcher = on_command("bili登录", permission=SUPERUSER, priority=5, block
 credential_status_matcher = on_command(
     "bili状态", permission=SUPERUSER, priority=5, block=True
 )
+download_stats_matcher = on_command(
+    "bili统计", permission=SUPERUSER, priority=5, block=True
+)
 
 login_sessions: dict[str, login_v2.QrCodeLogin] = {}
 
@@ -318,3 +329,82 @@ async def handle_credential_status(bot: Bot, event: Event, matcher: Matcher):
             status_lines.append(f"{name}: {'✅ 已设置' if has_value else '❌ 未设置'}")
 
     await matcher.finish("\n".join(status_lines))
+
+
+def _format_rate(bytes_per_second: float) -> str:
+    return f"{bytes_per_second / 1024 / 1024:.2f}MB/s"
+
+
+@download_stats_matcher.handle()
+async def handle_download_stats(matcher: Matcher):
+    """输出下载队列、各阶段耗时与各级缓存的统计"""
+    summary = download_metrics.summary()
+    lines = [
+        "B站解析运行统计（最近任务）：",
+        (
+            f"下载任务: {summary['tasks']} 个，成功 {summary['succeeded']}，"
+            f"缓存命中 {summary['cache_hits']}"
+        ),
+        (
+            f"下载并发: 运行/排队中 {len(download_manager.active_tasks)}，"
+            f"上限 {MAX_CONCURRENT_DOWNLOADS}"
+        ),
+    ]
+
+    queue_wait = summary["queue_wait"]
+    lines.append(
+        f"排队等待: p50 {queue_wait['p50']:.1f}s / p90 {queue_wait['p90']:.1f}s"
+        f" / max {queue_wait['max']:.1f}s"
+    )
+    for stage, stat in summary["stages"].items():
+        lines.append(
+            f"阶段 {stage}: p50 {stat['p50']:.1f}s / p90 {stat['p90']:.1f}s"
+            f" / max {stat['max']:.1f}s ({stat['count']}次)"
+        )
+    for name, stat in summary["throughput"].items():
+        lines.append(
+            f"吞吐 {name}: p50 {_format_rate(stat['p50'])}"
+            f" / p90 {_format_rate(stat['p90'])} ({stat['count']}次)"
+        )
+    lines.append(
+        f"转码队列: 运行 {transcode_pool.running}，排队 {transcode_pool.queue_length()}"
+    )
+
+    cache_stats = CacheService.get_stats()
+    lines.append(
+        f"视频缓存: {cache_stats['video_entries']} 个"
+        f" ({cache_stats['video_bytes'] / 1024 / 1024:.1f}MB)，"
+        f"命中率 {cache_stats['video_hit_rate']:.0%}"
+    )
+    lines.append(
+        f"链接去重: 放行 {cache_stats['url_passed']}，"
+        f"拦截 {cache_stats['url_suppressed']}"
+    )
+
+    meta_stats = metadata_cache.stats()
+    lines.append(
+        f"元数据缓存: {meta_stats['entries']} 条，命中率 {meta_stats['hit_rate']:.0%}"
+    )
+    render_stats = render_cache.stats()
+    lines.append(
+        f"渲染缓存: {render_stats['entries']} 条"
+        f" ({render_stats['bytes'] / 1024 / 1024:.1f}MB)，"
+        f"命中率 {render_stats['hit_rate']:.0%}"
+    )
+    asset_stats = asset_cache.stats()
+    lines.append(
+        f"图片资源缓存: {asset_stats['entries']} 个"
+        f" ({asset_stats['bytes'] / 1024 / 1024:.1f}MB)，"
+        f"命中率 {asset_stats['hit_rate']:.0%}"
+    )
+    lines.append(
+        f"短链缓存: 命中 {short_url_cache.hits}，未命中 {short_url_cache.misses}"
+    )
+    pool_stats = screenshot_pool.stats()
+    lines.append(
+        f"截图页面池: 空闲 {pool_stats['idle']}，借出 {pool_stats['borrowed']}，"
+        f"等待 {pool_stats['waiting']}，平均截图 "
+        f"{pool_stats['avg_screenshot_seconds']:.1f}s"
+    )
+
+    await matcher.finish("\n".join(lines))
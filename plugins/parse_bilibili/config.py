@@ -156,9 +156,15 @@ PLUGIN_TEMP_DIR.mkdir(parents=True, exist_ok=True)
 IMAGE_CACHE_DIR = PLUGIN_CACHE_DIR / "image"
 IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+ASSET_CACHE_DIR = IMAGE_CACHE_DIR / "assets"
+ASSET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+ASSET_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
 SCREENSHOT_ELEMENT_OPUS = "#app > div.opus-detail > div.bili-opus-view"
 SCREENSHOT_ELEMENT_ARTICLE = ".article-holder"
 SCREENSHOT_TIMEOUT = 60
+SCREENSHOT_POOL_SIZE = 2
+SCREENSHOT_CONTEXT_MAX_USES = 50
 
 DOWNLOAD_TIMEOUT = 120
 DOWNLOAD_MAX_RETRIES = 3
@@ -167,3 +173,21 @@ SEND_VIDEO_RETRY_DELAY = 5
 SEND_VIDEO_TIMEOUT = 120
 
 MAX_CONCURRENT_DOWNLOADS = 2
+
+METADATA_CACHE_MAX_ENTRIES = 512
+METADATA_CACHE_TTL = {
+    "VIDEO": 300,
+    "LIVE": 30,
+    "ARTICLE": 1800,
+    "OPUS": 600,
+    "USER": 600,
+    "BANGUMI": 1800,
+}
+
+RENDER_CACHE_TTL = 600
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+SHORT_URL_MEMORY_CACHE_SIZE = 1024
+
+MAX_CONCURRENT_TRANSCODES = 1
+TRANSCODE_AUDIO_BITRATE_KBPS = 96
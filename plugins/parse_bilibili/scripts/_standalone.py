@@ -0,0 +1,47 @@
+"""脱离 NoneBot/真寻 运行环境加载插件模块
+
+仅为被测模块依赖的宿主框架接口提供最小替身，插件自身的模块按文件原样加载，
+供 scripts 下的基准与检查脚本使用（python plugins/parse_bilibili/scripts/xxx.py）。
+"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "parse_bilibili"
+
+
+class _Logger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _Placeholder:
+    pass
+
+
+def _module(name: str, path: Path | None = None, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__path__ = [str(path)] if path else []
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def load(module: str) -> types.ModuleType:
+    """加载插件内的模块，如 load("utils.url_parser")，不执行插件的 __init__"""
+    _module("nonebot")
+    _module("nonebot.adapters", Bot=_Placeholder, Event=_Placeholder)
+    _module("nonebot_plugin_alconna")
+    _module("nonebot_plugin_alconna.uniseg", Hyper=_Placeholder, Reply=_Placeholder)
+    _module("nonebot_plugin_alconna.uniseg.tools", reply_fetch=None)
+    _module("zhenxun")
+    _module("zhenxun.services")
+    _module("zhenxun.services.log", logger=_Logger())
+
+    _module(PACKAGE, PLUGIN_DIR)
+    for sub in ("services", "utils"):
+        _module(f"{PACKAGE}.{sub}", PLUGIN_DIR / sub)
+    return importlib.import_module(f"{PACKAGE}.{module}")
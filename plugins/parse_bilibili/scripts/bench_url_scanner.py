@@ -0,0 +1,89 @@
+"""被动解析URL识别基准
+
+对比旧的识别路径（多正则提取URL + 逐个解析器匹配）与 BilibiliUrlScanner 的单次扫描，
+先确认两者对每条消息识别出的资源一致，再分别计时。
+
+    python plugins/parse_bilibili/scripts/bench_url_scanner.py
+"""
+
+import random
+import timeit
+
+from _standalone import load
+
+url_parser = load("utils.url_parser")
+exceptions = load("utils.exceptions")
+
+CHAT = [
+    "今天晚上吃什么",
+    "哈哈哈哈哈哈哈哈",
+    "有人打游戏吗？来两把",
+    "这个视频挺有意思的 https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "明天几点集合",
+    "[图片]",
+    "草",
+    "我刚看到一个很长很长的消息，" * 8,
+    "Bravo, very nice!",
+    "github.com/some/repo 这个项目不错",
+]
+LINKS = [
+    "https://www.bilibili.com/video/BV1GJ411x7h7",
+    "看这个 https://www.bilibili.com/video/av170001 笑死",
+    "https://b23.tv/Ab3dEfG",
+    "【某视频】 https://b23.tv/xYz1234 分享自哔哩哔哩",
+    "https://live.bilibili.com/21452505",
+    "https://space.bilibili.com/2",
+    "https://www.bilibili.com/read/cv1234567",
+    "https://www.bilibili.com/opus/913325471012175874",
+    "https://www.bilibili.com/bangumi/play/ep1231",
+    "BV1GJ411x7h7",
+]
+
+
+class TextMessage(str):
+    def extract_plain_text(self) -> str:
+        return self
+
+
+def old_identify(text: str):
+    url = url_parser.extract_bilibili_url_from_message(
+        TextMessage(text), check_hyper=False
+    )
+    if not url:
+        return None
+    try:
+        return url_parser.UrlParserRegistry.parse(url)
+    except (exceptions.UrlParseError, exceptions.UnsupportedUrlError):
+        return None
+
+
+def new_identify(text: str):
+    return url_parser.BilibiliUrlScanner.scan(text.strip())
+
+
+def main():
+    rng = random.Random(0)
+    messages = [rng.choice(CHAT) for _ in range(2000)]
+    messages += [rng.choice(LINKS) for _ in range(200)]
+    rng.shuffle(messages)
+
+    mismatches = [m for m in messages if old_identify(m) != new_identify(m)]
+    print(
+        f"{len(messages)} 条消息, 其中B站链接 200 条, 识别结果不一致 {len(mismatches)} 条"
+    )
+    for message in dict.fromkeys(mismatches):
+        print(f"  {message!r}: {old_identify(message)} != {new_identify(message)}")
+
+    for name, identify in (("旧路径", old_identify), ("单次扫描", new_identify)):
+        seconds = min(
+            timeit.repeat(
+                lambda identify=identify: [identify(m) for m in messages],
+                number=5,
+                repeat=5,
+            )
+        )
+        print(f"{name}: {seconds / 5 / len(messages) * 1e6:.2f} us/条")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from .api_service import BilibiliApiService
 from .cache_service import CacheService
 from .cover_service import CoverService
 from .download_service import DownloadManager, DownloadTask, download_manager
+from .metadata_cache import MetadataCache, metadata_cache
 from .network_service import ParserService
 from .utility_service import ScreenshotService
 
@@ -11,7 +12,9 @@ __all__ = [
     "CoverService",
     "DownloadManager",
     "DownloadTask",
+    "MetadataCache",
     "ParserService",
     "ScreenshotService",
     "download_manager",
+    "metadata_cache",
 ]
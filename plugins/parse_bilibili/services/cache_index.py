@@ -0,0 +1,175 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from zhenxun.services.log import logger
+
+
+class VideoCacheIndex:
+    """基于 SQLite 的视频缓存索引，按键 O(1) 查询，并维护缓存总字节数"""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS video_cache (
+        cache_key TEXT PRIMARY KEY,
+        video_id TEXT NOT NULL,
+        page_num INTEGER NOT NULL,
+        file_path TEXT NOT NULL,
+        file_size INTEGER NOT NULL DEFAULT 0,
+        create_time REAL NOT NULL,
+        last_access_time REAL NOT NULL
+    )
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._conn: sqlite3.Connection | None = None
+        self.total_size = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        if self._conn is None:
+            raise sqlite3.Error(f"无法打开视频缓存索引数据库: {self.db_path}")
+        return self._conn
+
+    def open(self):
+        """打开数据库并建表，同时统计当前缓存总大小"""
+        if self._conn is not None:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(self._SCHEMA)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_video_cache_last_access "
+            "ON video_cache(last_access_time)"
+        )
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(file_size), 0) FROM video_cache"
+        ).fetchone()
+        self.total_size = int(row[0])
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM video_cache").fetchone()[0]
+
+    def get(self, cache_key: str) -> dict[str, Any] | None:
+        """按缓存键查询条目"""
+        row = self.conn.execute(
+            "SELECT * FROM video_cache WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def touch(self, cache_key: str, access_time: float):
+        """更新条目的最后访问时间"""
+        self.conn.execute(
+            "UPDATE video_cache SET last_access_time = ? WHERE cache_key = ?",
+            (access_time, cache_key),
+        )
+
+    def upsert(
+        self,
+        cache_key: str,
+        video_id: str,
+        page_num: int,
+        file_path: str,
+        file_size: int,
+        now: float,
+    ):
+        """插入或替换条目，并同步更新总大小"""
+        if old := self.get(cache_key):
+            self.total_size -= old["file_size"]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO video_cache "
+            "(cache_key, video_id, page_num, file_path, file_size, "
+            "create_time, last_access_time) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (cache_key, video_id, page_num, file_path, file_size, now, now),
+        )
+        self.total_size += file_size
+
+    def remove(self, cache_key: str) -> dict[str, Any] | None:
+        """删除条目并返回被删除的条目"""
+        old = self.get(cache_key)
+        if old:
+            self.conn.execute(
+                "DELETE FROM video_cache WHERE cache_key = ?", (cache_key,)
+            )
+            self.total_size -= old["file_size"]
+        return old
+
+    def all_entries(self) -> list[dict[str, Any]]:
+        """返回所有条目"""
+        rows = self.conn.execute("SELECT * FROM video_cache").fetchall()
+        return [dict(row) for row in rows]
+
+    def expired_entries(self, before: float) -> list[dict[str, Any]]:
+        """返回最后访问时间早于指定时间的条目"""
+        rows = self.conn.execute(
+            "SELECT * FROM video_cache WHERE last_access_time < ? "
+            "ORDER BY last_access_time",
+            (before,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def lru_entries_to_free(
+        self, bytes_to_free: int, exclude: str | None = None
+    ) -> list[dict[str, Any]]:
+        """按最近最少使用顺序挑选条目，直到累计大小达到需要释放的字节数"""
+        selected = []
+        freed = 0
+        cursor = self.conn.execute(
+            "SELECT * FROM video_cache ORDER BY last_access_time"
+        )
+        for row in cursor:
+            if freed >= bytes_to_free:
+                break
+            if row["cache_key"] == exclude:
+                continue
+            selected.append(dict(row))
+            freed += row["file_size"]
+        cursor.close()
+        return selected
+
+    def migrate_from_json(self, json_path: Path) -> int:
+        """将旧版 cache_index.json 中的条目导入数据库，完成后重命名旧文件"""
+        if not json_path.exists():
+            return 0
+
+        try:
+            data: dict[str, dict[str, Any]] = json.loads(
+                json_path.read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError) as e:
+            logger.error(f"读取旧版视频缓存索引失败: {e}", "B站解析")
+            return 0
+
+        migrated = 0
+        for cache_key, info in data.items():
+            file_path = info.get("file_path", "")
+            if not file_path or self.get(cache_key):
+                continue
+            create_time = info.get("create_time", 0)
+            self.upsert(
+                cache_key,
+                info.get("video_id", ""),
+                info.get("page_num", 0),
+                file_path,
+                info.get("file_size", 0),
+                create_time,
+            )
+            self.touch(cache_key, info.get("last_access_time", create_time))
+            migrated += 1
+
+        try:
+            json_path.replace(json_path.with_suffix(".json.migrated"))
+        except OSError as e:
+            logger.warning(f"重命名旧版视频缓存索引失败: {e}", "B站解析")
+
+        return migrated
@@ -1,30 +1,41 @@
 import asyncio
 import json
 import shutil
+import sqlite3
 import time
 from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import Any, ClassVar
 
 from nonebot_plugin_session import EventSession
 from zhenxun.services.log import logger
 
 from ..config import IMAGE_CACHE_DIR, PLUGIN_CACHE_DIR, PLUGIN_TEMP_DIR, base_config
+from .cache_index import VideoCacheIndex
 
 VIDEO_CACHE_DIR = PLUGIN_CACHE_DIR / "video_cache"
 VIDEO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 CACHE_INDEX_FILE = PLUGIN_CACHE_DIR / "cache_index.json"
+VIDEO_CACHE_DB_FILE = PLUGIN_CACHE_DIR / "video_cache.db"
 URL_CACHE_FILE = PLUGIN_CACHE_DIR / "url_cache.json"
+URL_CACHE_JOURNAL_FILE = PLUGIN_CACHE_DIR / "url_cache.journal"
 
 _video_cache_lock = asyncio.Lock()
 _url_cache_lock = asyncio.Lock()
 _clean_lock = asyncio.Lock()
 
-_video_cache_index: dict[str, dict[str, Any]] = {}
+_video_cache_index = VideoCacheIndex(VIDEO_CACHE_DB_FILE)
 _url_context_caches: dict[str, OrderedDict[str, float]] = {}
 _URL_CONTEXT_CACHE_CAPACITY = 100
 
+_url_journal_pending: list[str] = []
+_url_journal_lines = 0
+_url_compaction_needed = False
+_url_flush_task: asyncio.Task | None = None
+_URL_FLUSH_INTERVAL = 5
+_URL_JOURNAL_COMPACT_LINES = 2000
+
 _video_cache_initialized = False
 _url_cache_initialized = False
 
@@ -44,6 +55,13 @@ class CacheService:
 
     _CLEAN_INTERVAL = 24 * 3600
 
+    _stats: ClassVar[dict[str, int]] = {
+        "video_hits": 0,
+        "video_misses": 0,
+        "url_passed": 0,
+        "url_suppressed": 0,
+    }
+
     @classmethod
     async def initialize(cls):
         """初始化缓存服务"""
@@ -74,7 +92,7 @@ class CacheService:
     @classmethod
     async def _init_video_cache(cls):
         """初始化视频文件缓存"""
-        global _video_cache_initialized, _video_cache_index
+        global _video_cache_initialized
 
         if _video_cache_initialized:
             return
@@ -84,38 +102,40 @@ class CacheService:
                 VIDEO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
                 logger.info(f"已创建视频缓存目录: {VIDEO_CACHE_DIR}", "B站解析")
 
+            try:
+                _video_cache_index.open()
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"打开视频缓存索引数据库失败: {e}", "B站解析")
+                return
+
             if CACHE_INDEX_FILE.exists():
-                try:
-                    _video_cache_index = json.loads(
-                        CACHE_INDEX_FILE.read_text(encoding="utf-8")
-                    )
-                    logger.info(
-                        f"已加载视频缓存索引，包含 {len(_video_cache_index)} 个条目",
-                        "B站解析",
-                    )
-                except Exception as e:
-                    logger.error(f"加载视频缓存索引失败: {e}", "B站解析")
-                    _video_cache_index = {}
+                migrated = _video_cache_index.migrate_from_json(CACHE_INDEX_FILE)
+                logger.info(
+                    f"已将 {migrated} 个视频缓存条目从 JSON 索引迁移到 SQLite",
+                    "B站解析",
+                )
 
-            invalid_keys = []
-            for cache_key, cache_info in _video_cache_index.items():
+            invalid_count = 0
+            for cache_info in _video_cache_index.all_entries():
                 file_path = cache_info.get("file_path", "")
                 if not file_path or not Path(file_path).exists():
-                    invalid_keys.append(cache_key)
-
-            for key in invalid_keys:
-                del _video_cache_index[key]
+                    _video_cache_index.remove(cache_info["cache_key"])
+                    invalid_count += 1
 
-            if invalid_keys:
-                logger.info(f"已移除 {len(invalid_keys)} 个无效的缓存条目", "B站解析")
-                await cls._save_video_cache_index()
+            if invalid_count:
+                logger.info(f"已移除 {invalid_count} 个无效的缓存条目", "B站解析")
 
+            logger.info(
+                f"已加载视频缓存索引，包含 {len(_video_cache_index)} 个条目，"
+                f"共 {_video_cache_index.total_size / (1024 * 1024):.2f}MB",
+                "B站解析",
+            )
             _video_cache_initialized = True
 
     @classmethod
     async def _init_url_cache(cls):
         """初始化URL缓存"""
-        global _url_cache_initialized, _url_context_caches
+        global _url_cache_initialized, _url_compaction_needed
 
         if _url_cache_initialized:
             return
@@ -123,6 +143,10 @@ class CacheService:
         await cls._load_url_cache_from_disk()
         _url_cache_initialized = True
 
+        if _url_journal_lines:
+            _url_compaction_needed = True
+            cls._schedule_url_flush()
+
     @classmethod
     async def get_video_cache(cls, video_id: str, page_num: int = 0) -> Path | None:
         """获取视频缓存文件路径"""
@@ -134,6 +158,7 @@ class CacheService:
         async with _video_cache_lock:
             cache_info = _video_cache_index.get(cache_key)
             if not cache_info:
+                cls._stats["video_misses"] += 1
                 logger.debug(f"视频缓存未命中: {cache_key}", "B站解析")
                 return None
 
@@ -145,12 +170,12 @@ class CacheService:
             file_path = Path(file_path_str)
             if not file_path.exists():
                 logger.warning(f"缓存文件不存在: {file_path}", "B站解析")
-                del _video_cache_index[cache_key]
-                await cls._save_video_cache_index()
+                _video_cache_index.remove(cache_key)
+                cls._stats["video_misses"] += 1
                 return None
 
-            _video_cache_index[cache_key]["last_access_time"] = time.time()
-            await cls._save_video_cache_index()
+            _video_cache_index.touch(cache_key, time.time())
+            cls._stats["video_hits"] += 1
 
             logger.info(f"视频缓存命中: {cache_key} -> {file_path}", "B站解析")
             return file_path
@@ -184,15 +209,15 @@ class CacheService:
                 )
 
             async with _video_cache_lock:
-                _video_cache_index[cache_key] = {
-                    "video_id": video_id,
-                    "page_num": page_num,
-                    "file_path": str(cache_file_path),
-                    "file_size": cache_file_path.stat().st_size,
-                    "create_time": time.time(),
-                    "last_access_time": time.time(),
-                }
-                await cls._save_video_cache_index()
+                _video_cache_index.upsert(
+                    cache_key,
+                    video_id,
+                    page_num,
+                    str(cache_file_path),
+                    cache_file_path.stat().st_size,
+                    time.time(),
+                )
+                cls._enforce_video_cache_budget(exclude=cache_key)
 
             logger.info(
                 f"视频已保存到缓存: {cache_key} -> {cache_file_path}", "B站解析"
@@ -202,6 +227,19 @@ class CacheService:
             logger.error(f"保存视频到缓存失败: {e}", "B站解析")
             return False
 
+    @classmethod
+    def get_stats(cls) -> dict[str, Any]:
+        """返回视频缓存与URL去重的命中统计"""
+        video_lookups = cls._stats["video_hits"] + cls._stats["video_misses"]
+        return {
+            **cls._stats,
+            "video_hit_rate": (
+                cls._stats["video_hits"] / video_lookups if video_lookups else 0.0
+            ),
+            "video_entries": len(_video_cache_index),
+            "video_bytes": _video_cache_index.total_size,
+        }
+
     @classmethod
     async def should_parse_url(cls, url: str, session: EventSession) -> bool:
         """检查URL是否应该被解析（基于缓存TTL）"""
@@ -237,7 +275,8 @@ class CacheService:
                 except KeyError:
                     pass
             context_cache[url] = current_time
-            asyncio.create_task(cls._save_url_cache_to_disk())
+            cls._record_url(context_key, url, current_time)
+            cls._stats["url_passed"] += 1
             return True
         else:
             if current_time - timestamp > cache_ttl_seconds:
@@ -247,13 +286,15 @@ class CacheService:
                 )
                 context_cache[url] = current_time
                 context_cache.move_to_end(url)
-                asyncio.create_task(cls._save_url_cache_to_disk())
+                cls._record_url(context_key, url, current_time)
+                cls._stats["url_passed"] += 1
                 return True
             else:
                 logger.debug(
                     f"URL '{url}' 在上下文 '{context_key}' 的缓存未过期", "B站解析"
                 )
                 context_cache.move_to_end(url)
+                cls._stats["url_suppressed"] += 1
                 return False
 
     @classmethod
@@ -286,11 +327,13 @@ class CacheService:
             f"手动添加/更新 URL '{url}' 到上下文 '{context_key}' 的缓存", "B站解析"
         )
 
-        asyncio.create_task(cls._save_url_cache_to_disk())
+        cls._record_url(context_key, url, current_time)
 
     @classmethod
     async def clear_url_cache(cls, context_key: str | None = None):
         """清空URL缓存"""
+        global _url_compaction_needed
+
         if not _url_cache_initialized:
             await cls._init_url_cache()
 
@@ -304,11 +347,14 @@ class CacheService:
             _url_context_caches.clear()
             logger.info("已清空所有上下文的缓存", "B站解析")
 
-        asyncio.create_task(cls._save_url_cache_to_disk())
+        _url_compaction_needed = True
+        cls._schedule_url_flush()
 
     @classmethod
     async def clean_expired_cache(cls, force: bool = False) -> int:
         """清理过期缓存文件和视频缓存"""
+        global _url_compaction_needed
+
         if not _video_cache_initialized:
             await cls._init_video_cache()
 
@@ -317,76 +363,84 @@ class CacheService:
 
             cleaned_files = await cls._clean_temp_files()
 
+            _url_compaction_needed = True
+            await cls.flush_url_cache()
+
             total_cleaned = cleaned_videos + cleaned_files
             if total_cleaned > 0:
                 logger.info(f"缓存清理完成，共清理 {total_cleaned} 个文件", "B站解析")
 
             return total_cleaned
 
+    @staticmethod
+    def _get_video_cache_budget() -> int:
+        """获取视频缓存的字节预算，小于等于0表示不限制"""
+        max_cache_size_mb = base_config.get("MAX_VIDEO_CACHE_SIZE_MB", 1024)
+        return int(max_cache_size_mb * 1024 * 1024)
+
+    @staticmethod
+    def _remove_video_cache_entries(entries: list[dict[str, Any]]) -> int:
+        """删除缓存条目及其对应文件，返回删除的文件数"""
+        cleaned_count = 0
+        for cache_info in entries:
+            file_path_str = cache_info.get("file_path", "")
+            if file_path_str:
+                file_path = Path(file_path_str)
+                if file_path.exists():
+                    try:
+                        file_path.unlink()
+                        logger.debug(f"已删除缓存文件: {file_path}", "B站解析")
+                        cleaned_count += 1
+                    except OSError as e:
+                        logger.warning(
+                            f"删除缓存文件失败: {file_path}, 错误: {e}", "B站解析"
+                        )
+            _video_cache_index.remove(cache_info["cache_key"])
+        return cleaned_count
+
+    @classmethod
+    def _enforce_video_cache_budget(cls, exclude: str | None = None) -> int:
+        """按 LRU 顺序淘汰视频缓存，直到总大小不超过预算（调用方需持有锁）"""
+        budget = cls._get_video_cache_budget()
+        if budget <= 0 or _video_cache_index.total_size <= budget:
+            return 0
+
+        bytes_to_free = _video_cache_index.total_size - budget
+        to_evict = _video_cache_index.lru_entries_to_free(bytes_to_free, exclude)
+        cleaned_count = cls._remove_video_cache_entries(to_evict)
+        logger.info(
+            f"视频缓存超过预算 {budget / (1024 * 1024):.0f}MB，"
+            f"已按LRU淘汰 {len(to_evict)} 个条目",
+            "B站解析",
+        )
+        return cleaned_count
+
     @classmethod
     async def _clean_video_cache(cls, force: bool = False) -> int:
         """清理过期视频缓存"""
         expiry_days = base_config.get("CACHE_EXPIRY_DAYS", 7)
-        max_cache_size_mb = base_config.get("MAX_VIDEO_CACHE_SIZE_MB", 1024)
 
         if expiry_days <= 0 and not force:
             logger.debug("视频缓存过期时间设置为0或负数，跳过清理", "B站解析")
             return 0
 
-        current_time = time.time()
         expiry_seconds = expiry_days * 86400
 
         async with _video_cache_lock:
-            sorted_cache = sorted(
-                _video_cache_index.items(),
-                key=lambda x: x[1].get("last_access_time", 0),
-            )
-
-            total_size = sum(info.get("file_size", 0) for _, info in sorted_cache)
-            total_size_mb = total_size / (1024 * 1024)
-
             logger.debug(
-                f"当前视频缓存大小: {total_size_mb:.2f}MB, 限制: {max_cache_size_mb}MB",
+                f"当前视频缓存大小: {_video_cache_index.total_size / (1024 * 1024):.2f}MB, "
+                f"限制: {cls._get_video_cache_budget() / (1024 * 1024):.0f}MB",
                 "B站解析",
             )
 
-            to_clean = []
-
-            for cache_key, cache_info in sorted_cache:
-                last_access_time = cache_info.get("last_access_time", 0)
-                if current_time - last_access_time > expiry_seconds:
-                    to_clean.append((cache_key, cache_info))
-
-            if total_size_mb > max_cache_size_mb:
-                size_to_free = total_size - (max_cache_size_mb * 1024 * 1024)
-                freed_size = 0
-
-                for cache_key, cache_info in sorted_cache:
-                    if cache_key not in [x[0] for x in to_clean]:
-                        to_clean.append((cache_key, cache_info))
-                        freed_size += cache_info.get("file_size", 0)
-                        if freed_size >= size_to_free:
-                            break
-
             cleaned_count = 0
-            for cache_key, cache_info in to_clean:
-                file_path_str = cache_info.get("file_path", "")
-                if file_path_str:
-                    file_path = Path(file_path_str)
-                    if file_path.exists():
-                        try:
-                            file_path.unlink()
-                            logger.debug(f"已删除缓存文件: {file_path}", "B站解析")
-                            cleaned_count += 1
-                        except Exception as e:
-                            logger.warning(
-                                f"删除缓存文件失败: {file_path}, 错误: {e}", "B站解析"
-                            )
-
-                _video_cache_index.pop(cache_key, None)
-
-            if to_clean:
-                await cls._save_video_cache_index()
+            if expiry_days > 0:
+                expired = _video_cache_index.expired_entries(
+                    time.time() - expiry_seconds
+                )
+                cleaned_count += cls._remove_video_cache_entries(expired)
+
+            cleaned_count += cls._enforce_video_cache_budget()
 
             if cleaned_count > 0:
                 logger.info(
@@ -495,43 +549,35 @@ class CacheService:
             )
             return "global_fallback_cache"
 
-    @classmethod
-    async def _save_video_cache_index(cls):
-        """保存视频缓存索引"""
-        try:
-            CACHE_INDEX_FILE.write_text(
-                json.dumps(_video_cache_index, ensure_ascii=False), encoding="utf-8"
-            )
-            logger.debug(
-                f"视频缓存索引已保存: {len(_video_cache_index)} 个条目", "B站解析"
-            )
-        except Exception as e:
-            logger.error(f"保存视频缓存索引失败: {e}", "B站解析")
-
     @classmethod
     async def _load_url_cache_from_disk(cls):
-        """从磁盘加载URL缓存数据"""
-        global _url_context_caches
+        """从磁盘加载URL缓存数据（快照 + 追加日志）"""
+        global _url_context_caches, _url_journal_lines
 
-        if not URL_CACHE_FILE.exists():
+        if not URL_CACHE_FILE.exists() and not URL_CACHE_JOURNAL_FILE.exists():
             logger.info("URL缓存文件不存在，将使用空缓存", "B站解析")
             return
 
         try:
             async with _url_cache_lock:
-                cache_data = json.loads(URL_CACHE_FILE.read_text(encoding="utf-8"))
-
-                for context_key, urls_data in cache_data.items():
-                    if context_key not in _url_context_caches:
-                        _url_context_caches[context_key] = OrderedDict()
-
-                    sorted_items = sorted(urls_data.items(), key=lambda x: x[1])
-
-                    if len(sorted_items) > _URL_CONTEXT_CACHE_CAPACITY:
-                        sorted_items = sorted_items[-_URL_CONTEXT_CACHE_CAPACITY:]
-
-                    for url, timestamp in sorted_items:
-                        _url_context_caches[context_key][url] = timestamp
+                if URL_CACHE_FILE.exists():
+                    cache_data = json.loads(URL_CACHE_FILE.read_text(encoding="utf-8"))
+
+                    for context_key, urls_data in cache_data.items():
+                        sorted_items = sorted(urls_data.items(), key=lambda x: x[1])
+                        for url, timestamp in sorted_items:
+                            cls._apply_url_entry(context_key, url, timestamp)
+
+                if URL_CACHE_JOURNAL_FILE.exists():
+                    with URL_CACHE_JOURNAL_FILE.open(encoding="utf-8") as f:
+                        for line in f:
+                            _url_journal_lines += 1
+                            try:
+                                context_key, url, timestamp = json.loads(line)
+                            except (ValueError, TypeError):
+                                # 进程中断时最后一行可能只写了一半，跳过即可
+                                continue
+                            cls._apply_url_entry(context_key, url, timestamp)
 
                 logger.info(
                     f"从磁盘加载了 {len(_url_context_caches)} 个上下文的URL缓存数据",
@@ -541,18 +587,80 @@ class CacheService:
             logger.error(f"从磁盘加载URL缓存失败: {e}", "B站解析")
             _url_context_caches = {}
 
+    @staticmethod
+    def _apply_url_entry(context_key: str, url: str, timestamp: float):
+        """将一条URL记录应用到内存缓存，保持容量上限"""
+        context_cache = _url_context_caches.setdefault(context_key, OrderedDict())
+        if url in context_cache:
+            context_cache.move_to_end(url)
+        elif len(context_cache) >= _URL_CONTEXT_CACHE_CAPACITY:
+            context_cache.popitem(last=False)
+        context_cache[url] = timestamp
+
+    @classmethod
+    def _record_url(cls, context_key: str, url: str, timestamp: float):
+        """记录一条URL缓存变更，由后台写入任务统一追加到日志文件"""
+        _url_journal_pending.append(
+            json.dumps([context_key, url, timestamp], ensure_ascii=False)
+        )
+        cls._schedule_url_flush()
+
+    @classmethod
+    def _schedule_url_flush(cls):
+        """确保只有一个延迟写入任务在运行"""
+        global _url_flush_task
+        if _url_flush_task is None or _url_flush_task.done():
+            _url_flush_task = asyncio.create_task(cls._delayed_url_flush())
+
     @classmethod
-    async def _save_url_cache_to_disk(cls):
-        """将URL缓存数据保存到磁盘"""
+    async def _delayed_url_flush(cls):
+        await asyncio.sleep(_URL_FLUSH_INTERVAL)
+        await cls.flush_url_cache()
+
+    @classmethod
+    async def flush_url_cache(cls):
+        """将待写入的URL记录追加到日志，日志过长或需要时压缩为快照"""
+        global _url_journal_lines, _url_compaction_needed
+
         try:
             async with _url_cache_lock:
-                cache_data = {}
-                for context_key, ordered_dict in _url_context_caches.items():
-                    cache_data[context_key] = dict(ordered_dict)
-
-                URL_CACHE_FILE.write_text(
-                    json.dumps(cache_data, ensure_ascii=False), encoding="utf-8"
-                )
-                logger.debug(f"URL缓存数据已保存到磁盘: {URL_CACHE_FILE}", "B站解析")
+                if _url_journal_pending:
+                    lines = _url_journal_pending.copy()
+                    _url_journal_pending.clear()
+                    with URL_CACHE_JOURNAL_FILE.open("a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+                    _url_journal_lines += len(lines)
+
+                if (
+                    _url_compaction_needed
+                    or _url_journal_lines >= _URL_JOURNAL_COMPACT_LINES
+                ):
+                    cls._compact_url_cache()
+                    _url_journal_lines = 0
+                    _url_compaction_needed = False
         except Exception as e:
             logger.error(f"保存URL缓存到磁盘失败: {e}", "B站解析")
+
+    @staticmethod
+    def _compact_url_cache():
+        """剔除过期条目，将内存缓存写为新快照并清空日志（调用方需持有锁）"""
+        cache_ttl_seconds = base_config.get("CACHE_TTL", 5) * 60
+        expire_before = time.time() - cache_ttl_seconds
+
+        cache_data = {}
+        for context_key in list(_url_context_caches):
+            ordered_dict = _url_context_caches[context_key]
+            for url in [u for u, ts in ordered_dict.items() if ts < expire_before]:
+                del ordered_dict[url]
+            if ordered_dict:
+                cache_data[context_key] = dict(ordered_dict)
+            else:
+                del _url_context_caches[context_key]
+
+        tmp_file = URL_CACHE_FILE.with_suffix(".json.tmp")
+        tmp_file.write_text(
+            json.dumps(cache_data, ensure_ascii=False), encoding="utf-8"
+        )
+        tmp_file.replace(URL_CACHE_FILE)
+        URL_CACHE_JOURNAL_FILE.unlink(missing_ok=True)
+        logger.debug(f"URL缓存已压缩为快照: {URL_CACHE_FILE}", "B站解析")
@@ -1,4 +1,5 @@
 import asyncio
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -7,6 +8,7 @@ from urllib.parse import parse_qs, urlparse
 from bilibili_api import bangumi, video
 from nonebot import get_driver
 from nonebot.adapters import Bot, Event
+from nonebot.exception import ActionFailed, NetworkError
 from nonebot_plugin_alconna import AlconnaMatcher
 from zhenxun.services.log import logger
 
@@ -18,10 +20,13 @@ from ..config import (
 )
 from ..model import SeasonInfo, VideoInfo
 from ..utils.exceptions import BilibiliBaseException, DownloadError, MediaProcessError
-from ..utils.file_utils import merge_media_files
+from ..utils.file_utils import merge_media_files, stream_merge_media
+from ..utils.headers import get_bilibili_video_headers
 from ..utils.message import send_video_with_retry
+from ..utils.metrics import download_metrics
 from .cache_service import VIDEO_CACHE_DIR, CacheService
 from .network_service import download_bilibili_file
+from .transcode_service import transcode_pool
 
 
 @dataclass
@@ -40,6 +45,7 @@ class DownloadManager:
     def __init__(self):
         self._initialized = False
         self.active_tasks: set[asyncio.Task] = set()
+        self.inflight_tasks: dict[tuple[str, int, int], asyncio.Task] = {}
         self.semaphore: asyncio.Semaphore | None = None
 
     def initialize(self):
@@ -50,25 +56,126 @@ class DownloadManager:
         self._initialized = True
         logger.info(f"下载管理器已初始化，最大并发数: {MAX_CONCURRENT_DOWNLOADS}")
 
+    @staticmethod
+    def _get_page_index(video_info: VideoInfo) -> int:
+        """从解析链接的 p 参数中获取分P索引（从0开始）"""
+        parsed_url = urlparse(video_info.parsed_url)
+        if parsed_url.query:
+            query_params = parse_qs(parsed_url.query)
+            if (p_value := query_params.get("p")) and p_value[0].isdigit():
+                return int(p_value[0]) - 1
+        return 0
+
+    @classmethod
+    def _get_task_key(cls, info_model: Any) -> tuple[str, int, int] | None:
+        """生成用于合并重复下载的任务键 (视频ID, 分P, 画质)，不支持合并时返回 None"""
+        if not isinstance(info_model, VideoInfo):
+            return None
+        video_id = info_model.bvid or f"av{info_model.aid}"
+        quality = base_config.get("VIDEO_DOWNLOAD_QUALITY", 80)
+        return video_id, cls._get_page_index(info_model), quality
+
     async def add_task(self, task: DownloadTask, matcher: AlconnaMatcher | None = None):
-        """为下载任务创建后台任务，并进行并发控制"""
-        if matcher and self.semaphore and self.semaphore.locked():
-            await matcher.send(
-                f'"{task.info_model.title}" 已加入下载任务，正在等待空闲下载位...'
-            )
+        """为下载任务创建后台任务，并进行并发控制
+
+        同一视频（相同分P与画质）正在下载时，新请求不会占用新的下载位，
+        而是等待已有任务完成后直接发送缓存文件。
+        """
+        task_key = self._get_task_key(task.info_model)
+        leader = self.inflight_tasks.get(task_key) if task_key else None
 
-        new_task = asyncio.create_task(self._task_wrapper(task))
+        if matcher:
+            if leader:
+                await matcher.send(
+                    f'"{task.info_model.title}" 正在被其他请求下载，完成后将直接发送缓存文件...'
+                )
+            elif self.semaphore and self.semaphore.locked():
+                await matcher.send(
+                    f'"{task.info_model.title}" 已加入下载任务，正在等待空闲下载位...'
+                )
+
+        if leader and task_key:
+            new_task = asyncio.create_task(self._follow_task(task, task_key, leader))
+        else:
+            new_task = asyncio.create_task(self._task_wrapper(task))
+            if task_key:
+                self.inflight_tasks[task_key] = new_task
+                new_task.add_done_callback(
+                    lambda t, key=task_key: self._release_inflight(key, t)
+                )
         self.active_tasks.add(new_task)
         new_task.add_done_callback(self.active_tasks.discard)
 
-    async def _task_wrapper(self, task: DownloadTask):
+    def _release_inflight(self, task_key: tuple[str, int, int], task: asyncio.Task):
+        """任务结束后移除进行中的任务记录"""
+        if self.inflight_tasks.get(task_key) is task:
+            del self.inflight_tasks[task_key]
+
+    async def _follow_task(
+        self,
+        task: DownloadTask,
+        task_key: tuple[str, int, int],
+        leader: asyncio.Task,
+    ):
+        """等待同一视频的进行中任务完成，然后发送其缓存文件"""
+        video_id, page_num, _ = task_key
+        logger.info(f"任务: {task.info_model.title}, 等待进行中的相同下载任务完成...")
+        await asyncio.wait({leader})
+
+        leader_error = None if leader.cancelled() else leader.result()
+        if leader_error is not None:
+            # 相同的下载刚刚失败（如超出大小限制），重新下载多半仍会失败，直接告知结果
+            logger.info(
+                f"进行中的相同下载任务失败，不再重复下载: {task.info_model.title}"
+            )
+            await self._notify_failure(task, leader_error)
+            return
+
+        cached_file = await CacheService.get_video_cache(video_id, page_num)
+        if not cached_file:
+            logger.info(
+                f"进行中的任务未生成缓存，重新发起下载: {task.info_model.title}"
+            )
+            await self.add_task(task)
+            return
+
+        metrics = download_metrics.start_task(task.info_model.title)
+        metrics.cache_hit = True
+        success = False
+        try:
+            await send_video_with_retry(task.bot, task.event, cached_file)
+            success = True
+        except DownloadError as e:
+            logger.error(f"发送合并任务的缓存视频 '{task.info_model.title}' 失败", e=e)
+            await self._notify_failure(task, getattr(e, "message", str(e)))
+        finally:
+            download_metrics.finish_task(metrics, success)
+
+    @staticmethod
+    async def _notify_failure(task: DownloadTask, error_message: str):
+        """手动触发的任务失败时告知用户"""
+        if not task.is_manual:
+            return
+        try:
+            await task.bot.send(
+                task.event,
+                f'❌ 下载"{task.info_model.title}"失败: {error_message}',
+            )
+        except (ActionFailed, NetworkError) as send_err:
+            logger.error(f"发送下载失败消息也失败了: {send_err}")
+
+    async def _task_wrapper(self, task: DownloadTask) -> str | None:
         """
         包装单个下载任务的完整生命周期，包括并发控制、消息通知和异常处理。
+        失败时返回错误信息，供等待同一下载的合并任务直接告知用户。
         """
+        metrics = download_metrics.start_task(task.info_model.title)
+        success = False
         try:
             logger.info(f"任务: {task.info_model.title}, 等待信号量...")
             assert self.semaphore is not None
             async with self.semaphore:
+                metrics.queue_wait = time.monotonic() - metrics.created_at
                 logger.info(f"信号量已获取，开始处理任务: {task.info_model.title}")
                 if task.is_manual:
                     try:
@@ -80,17 +187,15 @@ class DownloadManager:
                 await self._execute_download(
                     task.bot, task.event, task.info_model, task.is_manual
                 )
+                success = True
         except Exception as e:
             logger.error(f"下载任务 '{task.info_model.title}' 执行失败", e=e)
-            if task.is_manual:
-                try:
-                    error_message = getattr(e, "message", str(e))
-                    await task.bot.send(
-                        task.event,
-                        f'❌ 下载"{task.info_model.title}"失败: {error_message}',
-                    )
-                except Exception as send_err:
-                    logger.error(f"发送下载失败消息也失败了: {send_err}")
+            error_message = getattr(e, "message", str(e))
+            await self._notify_failure(task, error_message)
+            return error_message
+        finally:
+            download_metrics.finish_task(metrics, success)
+        return None
 
     @staticmethod
     def _estimate_video_size(
@@ -202,6 +307,50 @@ class DownloadManager:
             logger.warning(error_msg)
             raise DownloadError(error_msg)
 
+    async def _ensure_size_limit(
+        self,
+        bot: Bot,
+        event: Event,
+        file_path: Path,
+        duration_seconds: float,
+        is_manual: bool,
+    ) -> None:
+        """文件超过大小上限且开启了转码时，按目标大小重新编码并原地替换文件"""
+        if not base_config.get("ENABLE_TRANSCODE", False):
+            return
+
+        max_size_mb = base_config.get("MAX_DOWNLOAD_SIZE_MB", 100)
+        size_mb = file_path.stat().st_size / (1024 * 1024)
+        if size_mb <= max_size_mb:
+            return
+
+        logger.info(
+            f"视频大小 {size_mb:.2f}MB 超过限制 {max_size_mb}MB，进入转码队列: "
+            f"{file_path.name}"
+        )
+
+        async def _notify_queued(position: int):
+            if is_manual:
+                await bot.send(
+                    event,
+                    f"⏳ 视频超过 {max_size_mb}MB，正在排队压缩 (第 {position} 位)...",
+                )
+
+        transcoded_path = file_path.with_name(f"{file_path.stem}-transcoded.mp4")
+        start_time = time.monotonic()
+        transcoded = await transcode_pool.transcode(
+            file_path,
+            transcoded_path,
+            duration_seconds,
+            max_size_mb,
+            on_queued=_notify_queued,
+        )
+        download_metrics.record_stage("transcode", time.monotonic() - start_time)
+        if transcoded:
+            transcoded_path.replace(file_path)
+        else:
+            logger.warning(f"转码失败，将发送原始文件: {file_path.name}")
+
     async def _execute_download(
         self,
         bot: Bot,
@@ -228,13 +377,7 @@ class DownloadManager:
     ) -> None:
         """执行普通视频的下载、合并和发送"""
         video_id = video_info.bvid or f"av{video_info.aid}"
-        page_num = 0
-        parsed_url = urlparse(video_info.parsed_url)
-        if parsed_url.query:
-            query_params = parse_qs(parsed_url.query)
-            if p_value := query_params.get("p"):
-                if p_value[0].isdigit():
-                    page_num = int(p_value[0]) - 1
+        page_num = self._get_page_index(video_info)
 
         logger.info(
             f"开始处理视频: {video_info.title} (ID: {video_id}, P{page_num + 1})"
@@ -242,6 +385,7 @@ class DownloadManager:
 
         if cached_file := await CacheService.get_video_cache(video_id, page_num):
             logger.info(f"使用缓存视频: {cached_file.name}")
+            download_metrics.mark_cache_hit()
             await send_video_with_retry(bot, event, cached_file)
             return
 
@@ -306,6 +450,28 @@ class DownloadManager:
         cache_filename = f"{video_id}_P{page_num + 1}.mp4"
         output_mp4_path = VIDEO_CACHE_DIR / cache_filename
 
+        if base_config.get("STREAMING_MERGE", True):
+            logger.info(f"尝试边下载边合并: {video_id}")
+            start_time = time.monotonic()
+            merged = await stream_merge_media(
+                video_url, audio_url, output_mp4_path, get_bilibili_video_headers()
+            )
+            elapsed = time.monotonic() - start_time
+            download_metrics.record_stage("stream_merge", elapsed)
+            if merged:
+                download_metrics.record_stream(
+                    "stream_merge", output_mp4_path.stat().st_size, elapsed
+                )
+                await self._ensure_size_limit(
+                    bot, event, output_mp4_path, video_info.duration, is_manual
+                )
+                await CacheService.save_video_to_cache(
+                    video_id, page_num, output_mp4_path
+                )
+                await send_video_with_retry(bot, event, output_mp4_path)
+                return
+            logger.warning(f"边下载边合并失败，回退到临时文件模式: {video_id}")
+
         try:
             # 创建包含主URL和备用URL的列表
             video_urls = (
@@ -327,13 +493,18 @@ class DownloadManager:
             if not all(isinstance(r, bool) and r for r in results):
                 raise DownloadError(f"下载视频媒体流失败: {video_id}")
 
+            start_time = time.monotonic()
             merge_success = await merge_media_files(
                 v_stream_path, a_stream_path, output_mp4_path
             )
+            download_metrics.record_stage("merge", time.monotonic() - start_time)
             if not merge_success:
                 raise MediaProcessError("FFmpeg合并或编码失败")
 
             logger.info(f"视频处理成功: {output_mp4_path.name}")
+            await self._ensure_size_limit(
+                bot, event, output_mp4_path, video_info.duration, is_manual
+            )
             await CacheService.save_video_to_cache(video_id, page_num, output_mp4_path)
             await send_video_with_retry(bot, event, output_mp4_path)
         finally:
@@ -446,11 +617,14 @@ class DownloadManager:
                 raise DownloadError(f"下载番剧媒体流失败: ep{ep_id}")
 
             logger.info("番剧音视频流下载完成，开始合并...")
-            if not await merge_media_files(
+            start_time = time.monotonic()
+            merge_success = await merge_media_files(
                 video_path=v_stream_path,
                 audio_path=a_stream_path,
                 output_path=output_path,
-            ):
+            )
+            download_metrics.record_stage("merge", time.monotonic() - start_time)
+            if not merge_success:
                 raise MediaProcessError("番剧合并失败")
             downloaded_file_path = output_path
 
@@ -471,6 +645,9 @@ class DownloadManager:
 
         if downloaded_file_path and downloaded_file_path.exists():
             logger.info(f"番剧下载成功: {downloaded_file_path}")
+            await self._ensure_size_limit(
+                bot, event, downloaded_file_path, duration_seconds, is_manual
+            )
             await send_video_with_retry(bot, event, output_path)
             if downloaded_file_path.exists():
                 downloaded_file_path.unlink()
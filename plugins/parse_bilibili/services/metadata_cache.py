@@ -0,0 +1,112 @@
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from zhenxun.services.log import logger
+
+from ..config import METADATA_CACHE_MAX_ENTRIES, METADATA_CACHE_TTL
+from ..utils.url_parser import ResourceType
+
+MetadataKey = tuple[ResourceType, str]
+
+
+class MetadataCache:
+    """进程级资源元数据缓存
+
+    按 (资源类型, 资源ID) 缓存 BilibiliApiService 返回的信息模型，
+    每种资源类型有独立的 TTL，超出容量时按 LRU 淘汰，
+    相同键的并发查询只会发起一次请求。
+    """
+
+    def __init__(self, max_entries: int, ttl: dict[str, int]):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[MetadataKey, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[MetadataKey, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _get_ttl(self, resource_type: ResourceType) -> int:
+        return self.ttl.get(resource_type.name, 0)
+
+    def get(self, key: MetadataKey) -> Any | None:
+        """读取未过期的缓存条目"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expire_at, value = entry
+        if time.monotonic() >= expire_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: MetadataKey, value: Any):
+        """写入缓存条目，超出容量时淘汰最久未使用的条目"""
+        ttl = self._get_ttl(key[0])
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: MetadataKey | None = None):
+        """删除指定条目，不指定时清空缓存"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get_or_fetch(
+        self, key: MetadataKey, fetcher: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """命中时返回缓存，否则调用 fetcher 获取；并发的相同查询共享同一次请求
+
+        返回的是缓存对象的副本，调用方可以安全地修改。
+        """
+        if (value := self.get(key)) is not None:
+            self.hits += 1
+            logger.debug(f"元数据缓存命中: {key[0].name} {key[1]}", "B站解析")
+            return copy.deepcopy(value)
+
+        if task := self._inflight.get(key):
+            self.coalesced += 1
+            logger.debug(f"等待进行中的元数据请求: {key[0].name} {key[1]}", "B站解析")
+            return copy.deepcopy(await asyncio.shield(task))
+
+        self.misses += 1
+        task = asyncio.create_task(self._fetch_and_store(key, fetcher))
+        self._inflight[key] = task
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _fetch_and_store(
+        self, key: MetadataKey, fetcher: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        try:
+            value = await fetcher()
+            self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        """返回缓存命中统计"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+metadata_cache = MetadataCache(METADATA_CACHE_MAX_ENTRIES, METADATA_CACHE_TTL)
@@ -1,3 +1,4 @@
+import time
 import urllib.parse
 from pathlib import Path
 
@@ -7,6 +8,7 @@ from zhenxun.utils.exception import AllURIsFailedError
 from zhenxun.utils.http_utils import AsyncHttpx
 
 from ..model import ArticleInfo, LiveInfo, SeasonInfo, UserInfo, VideoInfo
+from ..utils.common import get_page_number
 from ..utils.exceptions import (
     DownloadError,
     ShortUrlError,
@@ -14,7 +16,10 @@ from ..utils.exceptions import (
     UrlParseError,
 )
 from ..utils.headers import get_bilibili_headers
-from ..utils.url_parser import ResourceType, UrlParserRegistry
+from ..utils.metrics import download_metrics
+from ..utils.url_parser import ResourceType, ShortUrlParser, UrlParserRegistry
+from .metadata_cache import metadata_cache
+from .short_url_cache import short_url_cache
 
 
 async def download_bilibili_file(url: str | list[str], file_path: Path) -> bool:
@@ -31,12 +36,18 @@ async def download_bilibili_file(url: str | list[str], file_path: Path) -> bool:
     url_list = url if isinstance(url, list) else [url]
 
     logger.info(f"开始下载文件: {file_path.name} (使用 AsyncHttpx)")
+    start_time = time.monotonic()
     try:
         success = await AsyncHttpx.download_file(
             url=url, path=file_path, headers=headers, stream=True
         )
         if not success:
             raise DownloadError(f"下载文件 {file_path.name} 失败，但未抛出异常。")
+        download_metrics.record_stream(
+            "audio" if "audio" in file_path.stem else "video",
+            file_path.stat().st_size if file_path.exists() else 0,
+            time.monotonic() - start_time,
+        )
         return success
     except AllURIsFailedError as e:
         logger.error(f"下载文件 {file_path.name} 失败，已达到最大重试次数", e=e)
@@ -68,57 +79,103 @@ async def download_bilibili_file(url: str | list[str], file_path: Path) -> bool:
 class ParserService:
     """URL解析服务"""
 
-    @staticmethod
-    async def resolve_short_url(url: str) -> str:
-        """解析短链接，返回原始URL"""
+    @classmethod
+    async def resolve_short_url(cls, url: str) -> str:
+        """解析短链接，返回原始URL（解析结果会被持久化缓存）"""
         original_url = url.strip()
 
         if "b23.tv" in original_url:
             logger.debug(f"检测到b23.tv短链接: {original_url}", "B站解析")
-            try:
-                if not original_url.startswith(("http://", "https://")):
-                    original_url = f"https://{original_url}"
-
-                response = await AsyncHttpx.get(
-                    original_url, timeout=10, headers=get_bilibili_headers()
-                )
-                resolved_url = str(response.url)
-
-                parsed_url_obj = urllib.parse.urlparse(resolved_url)
-                query_params = urllib.parse.parse_qs(parsed_url_obj.query)
-                filtered_params = {k: v for k, v in query_params.items() if k in ["p"]}
-                new_query = (
-                    urllib.parse.urlencode(filtered_params, doseq=True)
-                    if filtered_params
-                    else ""
+            if match := ShortUrlParser.PATTERN.search(original_url):
+                resolved_url = await short_url_cache.get_or_resolve(
+                    match.group(1), lambda: cls._request_short_url(original_url)
                 )
+            else:
+                resolved_url = await cls._request_short_url(original_url)
+            if resolved_url:
+                return resolved_url
 
-                clean_url = urllib.parse.urlunparse(
-                    (
-                        parsed_url_obj.scheme,
-                        parsed_url_obj.netloc,
-                        parsed_url_obj.path,
-                        parsed_url_obj.params,
-                        new_query,
-                        "",
-                    )
-                )
+        return original_url
 
-                logger.debug(f"短链接解析结果: {clean_url}", "B站解析")
-                return clean_url
-            except (ShortUrlError, httpx.HTTPError) as e:
-                logger.warning(
-                    f"短链接解析失败 {original_url}: {e}，将使用原始链接继续尝试解析",
-                    "B站解析",
+    @staticmethod
+    async def _request_short_url(url: str) -> str | None:
+        """请求b23.tv短链接并返回清理后的跳转地址，失败时返回None"""
+        try:
+            if not url.startswith(("http://", "https://")):
+                url = f"https://{url}"
+
+            response = await AsyncHttpx.get(
+                url, timeout=10, headers=get_bilibili_headers()
+            )
+            resolved_url = str(response.url)
+
+            parsed_url_obj = urllib.parse.urlparse(resolved_url)
+            query_params = urllib.parse.parse_qs(parsed_url_obj.query)
+            filtered_params = {k: v for k, v in query_params.items() if k in ["p"]}
+            new_query = (
+                urllib.parse.urlencode(filtered_params, doseq=True)
+                if filtered_params
+                else ""
+            )
+
+            clean_url = urllib.parse.urlunparse(
+                (
+                    parsed_url_obj.scheme,
+                    parsed_url_obj.netloc,
+                    parsed_url_obj.path,
+                    parsed_url_obj.params,
+                    new_query,
+                    "",
                 )
+            )
 
-        return original_url
+            if "b23.tv" in parsed_url_obj.netloc:
+                logger.warning(f"短链接未发生跳转: {url}", "B站解析")
+                return None
+
+            logger.debug(f"短链接解析结果: {clean_url}", "B站解析")
+            return clean_url
+        except (ShortUrlError, httpx.HTTPError) as e:
+            logger.warning(
+                f"短链接解析失败 {url}: {e}，将使用原始链接继续尝试解析",
+                "B站解析",
+            )
+            return None
 
     @staticmethod
+    def _get_metadata_cache_id(
+        resource_type: ResourceType, resource_id: str, parsed_url: str
+    ) -> str:
+        """生成元数据缓存ID，视频需要区分分P（AI总结按分P获取）"""
+        if resource_type == ResourceType.VIDEO:
+            page = get_page_number(parsed_url)
+            if page is not None:
+                return f"{resource_id}_p{page}"
+        return resource_id
+
+    @classmethod
     async def fetch_resource_info(
+        cls, resource_type: ResourceType, resource_id: str, parsed_url: str
+    ) -> VideoInfo | LiveInfo | ArticleInfo | UserInfo | SeasonInfo:
+        """根据资源类型和ID获取详细信息，优先使用进程级元数据缓存"""
+        cache_id = cls._get_metadata_cache_id(resource_type, resource_id, parsed_url)
+        info = await metadata_cache.get_or_fetch(
+            (resource_type, cache_id),
+            lambda: cls._fetch_resource_info_uncached(
+                resource_type, resource_id, parsed_url
+            ),
+        )
+        if isinstance(info, ArticleInfo):
+            info.url = parsed_url
+        else:
+            info.parsed_url = parsed_url
+        return info
+
+    @staticmethod
+    async def _fetch_resource_info_uncached(
         resource_type: ResourceType, resource_id: str, parsed_url: str
     ) -> VideoInfo | LiveInfo | ArticleInfo | UserInfo | SeasonInfo:
-        """根据资源类型和ID获取详细信息"""
+        """根据资源类型和ID请求详细信息"""
         from .api_service import BilibiliApiService
         from .utility_service import ScreenshotService
 
@@ -171,6 +228,17 @@ class ParserService:
         else:
             raise UnsupportedUrlError(f"不支持的资源类型: {resource_type}")
 
+    @classmethod
+    async def parse_resource(
+        cls, resource_type: ResourceType, resource_id: str, url: str
+    ) -> VideoInfo | LiveInfo | ArticleInfo | UserInfo | SeasonInfo:
+        """解析已识别出类型和ID的资源，跳过URL匹配；短链接仍需先解析跳转"""
+        if resource_type == ResourceType.SHORT_URL:
+            return await cls.parse(url)
+        return await cls.fetch_resource_info(
+            resource_type=resource_type, resource_id=resource_id, parsed_url=url
+        )
+
     @classmethod
     async def parse(
         cls, url: str
@@ -0,0 +1,108 @@
+import asyncio
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from zhenxun.services.log import logger
+
+from ..config import PLUGIN_CACHE_DIR, SHORT_URL_MEMORY_CACHE_SIZE
+
+SHORT_URL_DB_FILE = PLUGIN_CACHE_DIR / "short_url.db"
+
+
+class ShortUrlCache:
+    """b23.tv 短链接解析结果缓存
+
+    短链接一经生成便不会改变，因此解析结果持久化保存在 SQLite 中，
+    前面再加一层内存 LRU；相同短链的并发解析只发起一次请求。
+    """
+
+    def __init__(self, db_path: Path, memory_size: int):
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._conn: sqlite3.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS short_url ("
+                "code TEXT PRIMARY KEY, url TEXT NOT NULL, create_time REAL NOT NULL)"
+            )
+        return self._conn
+
+    def _remember(self, code: str, url: str):
+        self._memory[code] = url
+        self._memory.move_to_end(code)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, code: str) -> str | None:
+        """依次查询内存与数据库"""
+        if url := self._memory.get(code):
+            self._memory.move_to_end(code)
+            return url
+        try:
+            row = self.conn.execute(
+                "SELECT url FROM short_url WHERE code = ?", (code,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"查询短链接缓存失败: {e}", "B站解析")
+            return None
+        if row:
+            self._remember(code, row[0])
+            return row[0]
+        return None
+
+    def set(self, code: str, url: str):
+        """保存解析结果到内存与数据库"""
+        self._remember(code, url)
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO short_url (code, url, create_time) "
+                "VALUES (?, ?, ?)",
+                (code, url, time.time()),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"保存短链接缓存失败: {e}", "B站解析")
+
+    async def get_or_resolve(
+        self, code: str, resolver: Callable[[], Awaitable[str | None]]
+    ) -> str | None:
+        """获取短链接对应的原始URL，未缓存时调用 resolver 解析，解析失败不缓存"""
+        if url := self.get(code):
+            self.hits += 1
+            logger.debug(f"短链接缓存命中: {code} -> {url}", "B站解析")
+            return url
+
+        if task := self._inflight.get(code):
+            self.hits += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.create_task(self._resolve_and_store(code, resolver))
+        self._inflight[code] = task
+        return await asyncio.shield(task)
+
+    async def _resolve_and_store(
+        self, code: str, resolver: Callable[[], Awaitable[str | None]]
+    ) -> str | None:
+        try:
+            url = await resolver()
+            if url:
+                self.set(code, url)
+            return url
+        finally:
+            self._inflight.pop(code, None)
+
+
+short_url_cache = ShortUrlCache(SHORT_URL_DB_FILE, SHORT_URL_MEMORY_CACHE_SIZE)
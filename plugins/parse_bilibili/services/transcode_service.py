@@ -0,0 +1,73 @@
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from nonebot.exception import ActionFailed, NetworkError
+from zhenxun.services.log import logger
+
+from ..config import MAX_CONCURRENT_TRANSCODES, TRANSCODE_AUDIO_BITRATE_KBPS
+from ..utils.file_utils import transcode_to_target_size
+
+
+class TranscodePool:
+    """有界的转码工作池
+
+    同时运行的 FFmpeg 转码进程数不超过 max_workers，并按工作数分配线程，
+    避免多个转码任务占满所有CPU核心；排队中的任务可获知自己的排队位置。
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        self._waiting: list[object] = []
+        self.running = 0
+
+    @property
+    def threads_per_worker(self) -> int:
+        return max(1, (os.cpu_count() or 1) // self.max_workers)
+
+    def queue_length(self) -> int:
+        return len(self._waiting)
+
+    async def transcode(
+        self,
+        input_path: Path,
+        output_path: Path,
+        duration_seconds: float,
+        max_size_mb: float,
+        on_queued: Callable[[int], Awaitable[None]] | None = None,
+    ) -> bool:
+        """排队执行转码；需要等待时通过 on_queued 回调告知排队位置（从1开始）"""
+        ticket = object()
+        self._waiting.append(ticket)
+        try:
+            if self._semaphore.locked() and on_queued:
+                try:
+                    await on_queued(len(self._waiting))
+                except (ActionFailed, NetworkError) as e:
+                    logger.warning(f"发送转码排队提示失败: {e}")
+            await self._semaphore.acquire()
+        finally:
+            self._waiting.remove(ticket)
+
+        self.running += 1
+        try:
+            logger.info(
+                f"开始转码: {input_path.name} -> {max_size_mb}MB "
+                f"(运行中 {self.running}/{self.max_workers}, 排队 {len(self._waiting)})"
+            )
+            return await transcode_to_target_size(
+                input_path,
+                output_path,
+                duration_seconds,
+                max_size_mb,
+                audio_bitrate_kbps=TRANSCODE_AUDIO_BITRATE_KBPS,
+                threads=self.threads_per_worker,
+            )
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+
+transcode_pool = TranscodePool(MAX_CONCURRENT_TRANSCODES)
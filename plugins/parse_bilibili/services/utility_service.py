@@ -1,18 +1,179 @@
 import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 from nonebot_plugin_htmlrender import get_browser
+from playwright.async_api import Error as PlaywrightError
 from zhenxun.services.log import logger
 from zhenxun.utils.image_utils import BuildImage
 
 from ..config import (
+    SCREENSHOT_CONTEXT_MAX_USES,
     SCREENSHOT_ELEMENT_ARTICLE,
     SCREENSHOT_ELEMENT_OPUS,
+    SCREENSHOT_POOL_SIZE,
     SCREENSHOT_TIMEOUT,
+    get_credential,
 )
 from ..utils.exceptions import ScreenshotError
 
 
+@dataclass
+class _PooledPage:
+    """池中的一个浏览器上下文及其页面"""
+
+    context: Any
+    page: Any
+    credential_key: str
+    uses: int = 0
+
+
+class BrowserPagePool:
+    """预热的浏览器上下文/页面池
+
+    每个上下文在创建时注入B站 Cookie，使用 max_uses 次或登录凭证变化后重建。
+    池大小有上限，并发截图请求会排队等待空闲页面，而不是无限创建上下文。
+    """
+
+    def __init__(self, max_size: int, max_uses: int):
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self._idle: list[_PooledPage] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+        self.created = 0
+        self.waiting = 0
+        self.borrowed = 0
+        self.recycled = 0
+        self.wait_times: deque[float] = deque(maxlen=100)
+        self.screenshot_times: deque[float] = deque(maxlen=100)
+
+    @staticmethod
+    def _get_credential_cookies() -> tuple[str, list[dict[str, str]]]:
+        """返回当前凭证的标识与 Playwright 格式的 Cookie 列表"""
+        credential = get_credential()
+        if not (credential and credential.has_sessdata()):
+            return "", []
+        cookies_dict = credential.get_cookies()
+        playwright_cookies = [
+            {"name": k, "value": v, "domain": ".bilibili.com", "path": "/"}
+            for k, v in cookies_dict.items()
+        ]
+        return str(credential.sessdata), playwright_cookies
+
+    async def _create(self) -> _PooledPage:
+        browser = await get_browser()
+        if not browser:
+            raise ScreenshotError("Browser is not available.")
+
+        credential_key, playwright_cookies = self._get_credential_cookies()
+        if playwright_cookies:
+            logger.debug(
+                f"已加载 {len(playwright_cookies)} 个B站Cookies用于截图", "B站截图"
+            )
+        else:
+            logger.warning("未找到有效的B站登录凭证，截图可能会失败", "B站截图")
+
+        context = await browser.new_context(
+            viewport={"width": 1280, "height": 800},
+            java_script_enabled=True,
+        )
+        try:
+            if playwright_cookies:
+                await context.add_cookies(playwright_cookies)  # type: ignore
+            page = await context.new_page()
+        except Exception:
+            await context.close()
+            raise
+
+        self.created += 1
+        logger.debug(f"截图池创建新的浏览器上下文 (累计 {self.created})", "B站截图")
+        return _PooledPage(context=context, page=page, credential_key=credential_key)
+
+    async def _close(self, item: _PooledPage):
+        self.recycled += 1
+        try:
+            await item.context.close()
+        except PlaywrightError as e:
+            logger.debug(f"关闭截图池浏览器上下文失败: {e}", "B站截图")
+
+    async def _take(self) -> _PooledPage:
+        credential_key, _ = self._get_credential_cookies()
+        while self._idle:
+            item = self._idle.pop()
+            if item.credential_key == credential_key and not item.page.is_closed():
+                return item
+            await self._close(item)
+        return await self._create()
+
+    async def _give_back(self, item: _PooledPage, healthy: bool):
+        item.uses += 1
+        credential_key, _ = self._get_credential_cookies()
+        if (
+            not healthy
+            or item.uses >= self.max_uses
+            or item.credential_key != credential_key
+            or item.page.is_closed()
+        ):
+            await self._close(item)
+            return
+        self._idle.append(item)
+
+    @asynccontextmanager
+    async def borrow(self) -> AsyncIterator[Any]:
+        """借出一个已注入 Cookie 的页面，使用出错时该页面会被回收重建"""
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_times.append(time.monotonic() - start)
+
+        item: _PooledPage | None = None
+        healthy = False
+        try:
+            item = await self._take()
+            self.borrowed += 1
+            yield item.page
+            healthy = True
+        finally:
+            if item:
+                self.borrowed -= 1
+                await self._give_back(item, healthy)
+            self._semaphore.release()
+
+    async def close(self):
+        """关闭池中所有空闲上下文"""
+        while self._idle:
+            await self._close(self._idle.pop())
+
+    def stats(self) -> dict[str, Any]:
+        """返回池大小、排队等待与截图耗时统计"""
+
+        def _avg(values: deque[float]) -> float:
+            return sum(values) / len(values) if values else 0.0
+
+        return {
+            "max_size": self.max_size,
+            "idle": len(self._idle),
+            "borrowed": self.borrowed,
+            "waiting": self.waiting,
+            "created": self.created,
+            "recycled": self.recycled,
+            "avg_wait_seconds": _avg(self.wait_times),
+            "max_wait_seconds": max(self.wait_times, default=0.0),
+            "avg_screenshot_seconds": _avg(self.screenshot_times),
+        }
+
+
+screenshot_pool = BrowserPagePool(SCREENSHOT_POOL_SIZE, SCREENSHOT_CONTEXT_MAX_USES)
+
+
 class ScreenshotService:
     """截图服务"""
 
@@ -35,138 +196,116 @@ class ScreenshotService:
 
     @staticmethod
     async def take_screenshot(url: str, element_selector: str) -> bytes:
-        """获取网页元素的截图（已注入Cookie）"""
-        from ..config import get_credential
-
-        browser = await get_browser()
-        if not browser:
-            raise ScreenshotError("Browser is not available.")
-
-        context = None
-        page = None
+        """获取网页元素的截图（使用已注入Cookie的页面池）"""
         screenshot_bytes = None
+        start_time = time.monotonic()
 
         try:
-            credential = get_credential()
-            playwright_cookies = []
-            if credential and credential.has_sessdata():
-                cookies_dict = credential.get_cookies()
-                playwright_cookies = [
-                    {"name": k, "value": v, "domain": ".bilibili.com", "path": "/"}
-                    for k, v in cookies_dict.items()
-                ]
-                logger.debug(
-                    f"已加载 {len(playwright_cookies)} 个B站Cookies用于截图", "B站截图"
+            async with screenshot_pool.borrow() as page:
+                screenshot_bytes = await ScreenshotService._capture_element(
+                    page, url, element_selector
                 )
-            else:
-                logger.warning("未找到有效的B站登录凭证，截图可能会失败", "B站截图")
-
-            context = await browser.new_context(
-                viewport={"width": 1280, "height": 800},
-                java_script_enabled=True,
+        except ScreenshotError:
+            raise
+        except Exception as e:
+            logger.error(f"截图失败 for {url}: {e}")
+            raise ScreenshotError(
+                f"截图失败: {e}",
+                cause=e,
+                context={"url": url, "selector": element_selector},
             )
+        finally:
+            screenshot_pool.screenshot_times.append(time.monotonic() - start_time)
 
-            if playwright_cookies:
-                await context.add_cookies(playwright_cookies)  # type: ignore
+        if not screenshot_bytes:
+            raise ScreenshotError(f"未能获取截图字节: {url}")
+        return screenshot_bytes
 
-            page = await context.new_page()
+    @staticmethod
+    async def _capture_element(page: Any, url: str, element_selector: str) -> bytes:
+        """在给定页面中打开URL，清理遮挡元素后截取指定元素"""
+        screenshot_bytes = b""
+        await page.goto(
+            url,
+            wait_until="networkidle",
+            timeout=SCREENSHOT_TIMEOUT * 1000,
+        )
+
+        login_popup_selectors = [
+            ".bili-mini-login-container",
+            ".login-panel",
+            ".unlogin-popover",
+        ]
+        header_selectors = ["#bili-header-m", ".fixed-header", ".bili-header__bar"]
 
-            await page.goto(
-                url,
-                wait_until="networkidle",
-                timeout=SCREENSHOT_TIMEOUT * 1000,
+        try:
+            js_code = """
+            (function() {
+                const loginSelectors = %s;
+                loginSelectors.forEach(selector => {
+                    const elements = document.querySelectorAll(selector);
+                    elements.forEach(el => el && el.remove());
+                });
+                const headerSelectors = %s;
+                headerSelectors.forEach(selector => {
+                    const elements = document.querySelectorAll(selector);
+                    elements.forEach(el => el && (el.style.display = 'none'));
+                });
+                const floatingElements = document.querySelectorAll('.fixed-element, .floating, .popup, .modal, [style*="position: fixed"]');
+                floatingElements.forEach(el => {
+                    if (el && !el.matches('%s')) {
+                        el.style.display = 'none';
+                    }
+                });
+                return 'Attempted to clean up page for screenshot';
+            })();
+            """ % (
+                str(login_popup_selectors),
+                str(header_selectors),
+                element_selector,
             )
 
-            login_popup_selectors = [
-                ".bili-mini-login-container",
-                ".login-panel",
-                ".unlogin-popover",
-            ]
-            header_selectors = ["#bili-header-m", ".fixed-header", ".bili-header__bar"]
+            result = await page.evaluate(js_code)
+            logger.debug(f"执行页面清理 JS 结果: {result}", "B站截图")
+            await asyncio.sleep(0.5)
+        except PlaywrightError as e:
+            logger.warning(f"移除/隐藏元素 JS 执行失败: {e}", "B站截图")
 
+        element = await page.query_selector(element_selector)
+        if not element:
+            logger.debug(
+                f"初始 query_selector 未找到 '{element_selector}'，尝试 wait_for_selector"
+            )
             try:
-                js_code = """
-                (function() {
-                    const loginSelectors = %s;
-                    loginSelectors.forEach(selector => {
-                        const elements = document.querySelectorAll(selector);
-                        elements.forEach(el => el && el.remove());
-                    });
-                    const headerSelectors = %s;
-                    headerSelectors.forEach(selector => {
-                        const elements = document.querySelectorAll(selector);
-                        elements.forEach(el => el && (el.style.display = 'none'));
-                    });
-                    const floatingElements = document.querySelectorAll('.fixed-element, .floating, .popup, .modal, [style*="position: fixed"]');
-                    floatingElements.forEach(el => {
-                        if (el && !el.matches('%s')) {
-                            el.style.display = 'none';
-                        }
-                    });
-                    return 'Attempted to clean up page for screenshot';
-                })();
-                """ % (
-                    str(login_popup_selectors),
-                    str(header_selectors),
-                    element_selector,
-                )
-
-                result = await page.evaluate(js_code)
-                logger.debug(f"执行页面清理 JS 结果: {result}", "B站截图")
-                await asyncio.sleep(0.5)
-            except Exception as e:
-                logger.warning(f"移除/隐藏元素 JS 执行失败: {e}", "B站截图")
-
-            element = await page.query_selector(element_selector)
-            if not element:
+                wait_timeout = 15000
                 logger.debug(
-                    f"初始 query_selector 未找到 '{element_selector}'，尝试 wait_for_selector"
+                    f"使用 wait_for_selector 等待: '{element_selector}', 超时: {wait_timeout}ms"
                 )
-                try:
-                    wait_timeout = 15000
-                    logger.debug(
-                        f"使用 wait_for_selector 等待: '{element_selector}', 超时: {wait_timeout}ms"
-                    )
-                    element = await page.wait_for_selector(
-                        element_selector, timeout=wait_timeout, state="visible"
-                    )
-                    logger.debug(f"wait_for_selector 成功找到 '{element_selector}'")
-                except Exception as e:
-                    logger.error(f"等待选择器 '{element_selector}' 超时或失败: {e}")
-                    try:
-                        debug_path = Path("./debug_screenshot.png").resolve()
-                        await page.screenshot(path=str(debug_path), full_page=True)
-                        logger.error(f"已保存当前页面截图到 {debug_path} 用于调试。")
-                    except Exception as ss_err:
-                        logger.error(f"保存调试截图失败: {ss_err}")
-                    raise ScreenshotError(
-                        f"未找到元素 '{element_selector}' 或超时: {e}"
-                    )
-
-            if element:
-                await asyncio.sleep(0.5)
-                screenshot_bytes = await element.screenshot(
-                    type="png",
-                    timeout=SCREENSHOT_TIMEOUT * 500,
-                    animations="disabled",
+                element = await page.wait_for_selector(
+                    element_selector, timeout=wait_timeout, state="visible"
                 )
-                logger.info(f"截图成功: {url}, element: {element_selector}")
+                logger.debug(f"wait_for_selector 成功找到 '{element_selector}'")
+            except PlaywrightError as e:
+                logger.error(f"等待选择器 '{element_selector}' 超时或失败: {e}")
+                try:
+                    debug_path = Path("./debug_screenshot.png").resolve()
+                    await page.screenshot(path=str(debug_path), full_page=True)
+                    logger.error(f"已保存当前页面截图到 {debug_path} 用于调试。")
+                except PlaywrightError as ss_err:
+                    logger.error(f"保存调试截图失败: {ss_err}")
+                raise ScreenshotError(
+                    f"未找到元素 '{element_selector}' 或超时: {e}"
+                ) from e
 
-        except Exception as e:
-            logger.error(f"截图失败 for {url}: {e}")
-            raise ScreenshotError(
-                f"截图失败: {e}",
-                cause=e,
-                context={"url": url, "selector": element_selector},
+        if element:
+            await asyncio.sleep(0.5)
+            screenshot_bytes = await element.screenshot(
+                type="png",
+                timeout=SCREENSHOT_TIMEOUT * 500,
+                animations="disabled",
             )
-        finally:
-            if page:
-                await page.close()
-            if context:
-                await context.close()
+            logger.info(f"截图成功: {url}, element: {element_selector}")
 
-        if not screenshot_bytes:
-            raise ScreenshotError(f"未能获取截图字节: {url}")
         return screenshot_bytes
 
     @staticmethod
@@ -0,0 +1,143 @@
+import asyncio
+import contextlib
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+from zhenxun.services.log import logger
+from zhenxun.utils.http_utils import AsyncHttpx
+
+from ..config import ASSET_CACHE_DIR, ASSET_CACHE_MAX_BYTES
+from .headers import get_bilibili_headers
+
+_SUFFIX_PATTERN = re.compile(r"\.(jpe?g|png|webp|gif|avif)", re.IGNORECASE)
+
+
+class AssetCache:
+    """渲染用图片资源（封面、头像等）的磁盘缓存
+
+    以URL为键保存到缓存目录，总大小超出 max_bytes 时按最近使用时间淘汰；
+    相同URL的并发请求只下载一次，prefetch 可在渲染前提前并行发起下载。
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def entries(self) -> OrderedDict[str, int]:
+        """按最近使用顺序排列的 文件名->大小，首次访问时扫描缓存目录"""
+        if self._entries is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            files = [
+                (file, file.stat())
+                for file in self.cache_dir.iterdir()
+                if file.is_file() and not file.name.endswith(".tmp")
+            ]
+            files.sort(key=lambda item: item[1].st_mtime)
+            self._entries = OrderedDict(
+                (file.name, stat.st_size) for file, stat in files
+            )
+            self.total_bytes = sum(self._entries.values())
+        return self._entries
+
+    def get_path(self, url: str) -> Path:
+        digest = hashlib.sha1(url.encode(), usedforsecurity=False).hexdigest()
+        match = _SUFFIX_PATTERN.search(Path(urlparse(url).path).name)
+        suffix = f".{match.group(1).lower()}" if match else ".img"
+        return self.cache_dir / f"{digest}{suffix}"
+
+    def get(self, url: str) -> Path | None:
+        """查询已缓存的资源，命中时刷新其使用时间"""
+        path = self.get_path(url)
+        if path.name not in self.entries:
+            return None
+        if not path.exists():
+            self._remove(path.name)
+            return None
+        self.entries.move_to_end(path.name)
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return path
+
+    async def fetch(self, url: str) -> Path | None:
+        """获取资源的本地路径，未缓存时下载；下载失败返回 None"""
+        if path := self.get(url):
+            self.hits += 1
+            return path
+        if task := self._inflight.get(url):
+            self.hits += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        return await asyncio.shield(self._start_download(url))
+
+    def prefetch(self, urls: Iterable[str | None]):
+        """在后台并行下载尚未缓存的资源，不等待结果"""
+        for url in urls:
+            if url and url not in self._inflight and not self.get(url):
+                self._start_download(url)
+
+    def _start_download(self, url: str) -> asyncio.Task:
+        task = asyncio.create_task(self._download(url))
+        self._inflight[url] = task
+        return task
+
+    async def _download(self, url: str) -> Path | None:
+        path = self.get_path(url)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        try:
+            if not await AsyncHttpx.download_file(
+                url=url, path=tmp_path, headers=get_bilibili_headers(), timeout=30
+            ):
+                return None
+            size = tmp_path.stat().st_size
+            if size <= 0:
+                return None
+            tmp_path.replace(path)
+            self._store(path.name, size)
+            return path
+        except OSError as e:
+            logger.warning(f"下载图片资源失败 {url}: {e}", "B站解析")
+            return None
+        finally:
+            tmp_path.unlink(missing_ok=True)
+            self._inflight.pop(url, None)
+
+    def _store(self, name: str, size: int):
+        self._remove(name)
+        self.entries[name] = size
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            oldest_name = next(iter(self.entries))
+            self._remove(oldest_name)
+            (self.cache_dir / oldest_name).unlink(missing_ok=True)
+
+    def _remove(self, name: str):
+        size = self.entries.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "downloading": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+asset_cache = AssetCache(ASSET_CACHE_DIR, ASSET_CACHE_MAX_BYTES)
@@ -1,5 +1,6 @@
 import re
 import time
+import urllib.parse
 from pathlib import Path
 
 from zhenxun.services.log import logger
@@ -33,6 +34,14 @@ def format_duration(seconds: int) -> str:
     )
 
 
+def get_page_number(url: str) -> int | None:
+    """获取链接中 p 参数指定的分P序号（从1开始），未指定时返回 None"""
+    p_value = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get("p")
+    if p_value and p_value[0].isdigit():
+        return int(p_value[0])
+    return None
+
+
 def format_timestamp(timestamp: int, format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
     """格式化Unix时间戳为指定格式的时间字符串"""
     try:
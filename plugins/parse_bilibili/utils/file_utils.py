@@ -6,6 +6,154 @@ from zhenxun.services.log import logger
 from ..config import PLUGIN_TEMP_DIR
 
 
+async def _run_ffmpeg_process(
+    command: list[str], output_path: Path, log_output: bool = False
+) -> tuple[bool, str]:
+    """运行FFmpeg命令并确保其进程在任何情况下都能被正确终止"""
+    logger.info(f"执行FFmpeg命令: {' '.join(command)}")
+
+    process = None
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE
+            if log_output
+            else asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+
+        error_msg = stderr.decode("utf-8", errors="ignore") if stderr else ""
+
+        if process.returncode != 0:
+            return False, error_msg
+
+        if not output_path.exists() or output_path.stat().st_size == 0:
+            logger.error(f"FFmpeg执行后文件不存在或为空: {output_path}")
+            return False, "输出文件为空"
+
+        return True, ""
+
+    finally:
+        if process and process.returncode is None:
+            logger.warning(f"FFmpeg 进程 ({process.pid}) 未正常结束，将强制终止。")
+            try:
+                process.terminate()
+                await asyncio.wait_for(process.wait(), timeout=2.0)
+            except asyncio.TimeoutError:
+                logger.warning(f"终止 FFmpeg 进程 ({process.pid}) 超时，将强制杀死。")
+                process.kill()
+            except ProcessLookupError as e:
+                logger.error(f"终止/杀死 FFmpeg 进程时出错: {e}")
+
+
+async def stream_merge_media(
+    video_url: str,
+    audio_url: str | None,
+    output_path: Path,
+    headers: dict[str, str],
+    rw_timeout_seconds: int = 30,
+) -> bool:
+    """
+    边下载边合并：由 FFmpeg 直接读取远程音视频流并写出 MP4。
+    - 不落地中间 m4s 文件，合并结果在最后一个字节到达后即可使用。
+    - 失败时删除不完整的输出文件，由调用方回退到临时文件模式。
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    header_str = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+    input_options = [
+        "-headers",
+        header_str,
+        "-rw_timeout",
+        str(rw_timeout_seconds * 1_000_000),
+    ]
+
+    command = ["ffmpeg", "-y", *input_options, "-i", video_url]
+    if audio_url:
+        command.extend([*input_options, "-i", audio_url])
+    command.extend(["-map", "0:v:0"])
+    if audio_url:
+        command.extend(["-map", "1:a:0"])
+    command.extend(["-c", "copy", "-nostdin", "-loglevel", "error"])
+    command.append(str(output_path.resolve()))
+
+    try:
+        success, error_log = await _run_ffmpeg_process(command, output_path)
+    except OSError as e:
+        success, error_log = False, str(e)
+
+    if success:
+        logger.info(f"边下载边合并成功: {output_path.name}")
+    else:
+        logger.warning(f"边下载边合并失败: {error_log[:200]}")
+        output_path.unlink(missing_ok=True)
+    return success
+
+
+async def transcode_to_target_size(
+    input_path: Path,
+    output_path: Path,
+    duration_seconds: float,
+    max_size_mb: float,
+    audio_bitrate_kbps: int = 96,
+    threads: int = 0,
+) -> bool:
+    """
+    将视频重新编码到目标大小以内。
+    - 根据时长和大小上限计算目标码率，使用 CRF 编码并以 maxrate 限制峰值码率。
+    - threads 为 0 时由 FFmpeg 自行决定线程数。
+    """
+    if duration_seconds <= 0:
+        logger.warning("视频时长未知，无法计算转码目标码率")
+        return False
+
+    total_kbps = max_size_mb * 8 * 1024 / duration_seconds * 0.95
+    video_kbps = int(total_kbps - audio_bitrate_kbps)
+    if video_kbps < 100:
+        logger.warning(f"目标码率过低 ({video_kbps}kbps)，转码后画质无法接受，放弃转码")
+        return False
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    command = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        str(input_path.resolve()),
+        "-c:v",
+        "libx264",
+        "-preset",
+        "veryfast",
+        "-crf",
+        "26",
+        "-maxrate",
+        f"{video_kbps}k",
+        "-bufsize",
+        f"{video_kbps * 2}k",
+        "-c:a",
+        "aac",
+        "-b:a",
+        f"{audio_bitrate_kbps}k",
+        "-movflags",
+        "+faststart",
+    ]
+    if threads > 0:
+        command.extend(["-threads", str(threads)])
+    command.extend(["-nostdin", "-loglevel", "error", str(output_path.resolve())])
+
+    success, error_log = await _run_ffmpeg_process(command, output_path)
+    if success:
+        size_mb = output_path.stat().st_size / (1024 * 1024)
+        logger.info(
+            f"转码完成: {output_path.name}, 目标码率 {video_kbps}kbps, "
+            f"大小 {size_mb:.2f}MB"
+        )
+    else:
+        logger.error(f"转码失败: {error_log[:200]}")
+        output_path.unlink(missing_ok=True)
+    return success
+
+
 async def merge_media_files(
     video_path: Path,
     audio_path: Path | None,
@@ -40,46 +188,12 @@ async def merge_media_files(
 
         command.extend(["-nostdin", "-loglevel", "error", str(output_path.resolve())])
 
-        logger.info(f"执行FFmpeg命令: {' '.join(command)}")
-
-        process = None
-        try:
-            process = await asyncio.create_subprocess_exec(
-                *command,
-                stdout=asyncio.subprocess.PIPE
-                if log_output
-                else asyncio.subprocess.DEVNULL,
-                stderr=asyncio.subprocess.PIPE,
+        success, error_msg = await _run_ffmpeg_process(command, output_path, log_output)
+        if not success:
+            logger.error(
+                f"FFmpeg执行失败 (vcodec={vcodec}, acodec={acodec}): {error_msg}"
             )
-            _, stderr = await process.communicate()
-
-            error_msg = stderr.decode("utf-8", errors="ignore") if stderr else ""
-
-            if process.returncode != 0:
-                logger.error(
-                    f"FFmpeg执行失败 (vcodec={vcodec}, acodec={acodec}): {error_msg}"
-                )
-                return False, error_msg
-
-            if not output_path.exists() or output_path.stat().st_size == 0:
-                logger.error(f"FFmpeg执行后文件不存在或为空: {output_path}")
-                return False, "输出文件为空"
-
-            return True, ""
-
-        finally:
-            if process and process.returncode is None:
-                logger.warning(f"FFmpeg 进程 ({process.pid}) 未正常结束，将强制终止。")
-                try:
-                    process.terminate()
-                    await asyncio.wait_for(process.wait(), timeout=2.0)
-                except asyncio.TimeoutError:
-                    logger.warning(
-                        f"终止 FFmpeg 进程 ({process.pid}) 超时，将强制杀死。"
-                    )
-                    process.kill()
-                except Exception as e:
-                    logger.error(f"终止/杀死 FFmpeg 进程时出错: {e}")
+        return success, error_msg
 
     try:
         logger.info("尝试快速合并 (stream copy)...")
@@ -4,8 +4,8 @@ import re
 import time
 from io import BytesIO
 from pathlib import Path
+from typing import Any
 
-import aiofiles
 import jinja2
 from bilibili_api import comment
 from bilibili_api.comment import CommentResourceType, OrderType
@@ -28,21 +28,16 @@ from ..config import (
 )
 from ..model import ArticleInfo, LiveInfo, SeasonInfo, UserInfo, VideoInfo
 from ..utils.exceptions import DownloadError
-from .common import format_duration, format_number
+from .asset_cache import asset_cache
+from .common import format_duration, format_number, get_page_number
+from .metrics import download_metrics
+from .render_cache import cached_render, coarse_bucket
 
 TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
 FONT_FILE = TEMPLATE_DIR / "vanfont.ttf"
-FONT_BASE64_CONTENT = ""
-try:
-    if FONT_FILE.exists():
-        with open(FONT_FILE, "rb") as f:
-            font_bytes = f.read()
-        FONT_BASE64_CONTENT = base64.b64encode(font_bytes).decode()
-        logger.debug("成功加载并编码 vanfont.ttf")
-    else:
-        logger.error(f"图标字体文件未找到: {FONT_FILE}")
-except Exception as e:
-    logger.error(f"加载或编码 vanfont.ttf 时出错: {e}")
+FONT_URL = FONT_FILE.resolve().as_uri()
+if not FONT_FILE.exists():
+    logger.error(f"图标字体文件未找到: {FONT_FILE}")
 template_loader = jinja2.FileSystemLoader(str(TEMPLATE_DIR))
 template_env = jinja2.Environment(loader=template_loader, enable_async=True)
 
@@ -66,20 +61,38 @@ class ImageHelper:
             return False
 
     @staticmethod
-    async def get_image_as_base64(path: Path) -> str | None:
-        """转换图片为Base64"""
+    def get_image_uri(path: Path) -> str | None:
+        """获取本地图片的 file:// URI，由浏览器直接读取，避免在HTML中内联Base64"""
         if not (path.exists() and path.stat().st_size > 0):
             return None
+        return path.resolve().as_uri()
 
-        try:
-            async with aiofiles.open(path, "rb") as f:
-                img_bytes = await f.read()
-            img_base64 = base64.b64encode(img_bytes).decode()
-            img_format = path.suffix.lstrip(".") or "jpeg"
-            return f"data:image/{img_format};base64,{img_base64}"
-        except Exception as e:
-            logger.error(f"读取或编码图片失败: {path}", e=e)
+    @staticmethod
+    async def get_asset_uri(url: str | None) -> str | None:
+        """通过资源缓存获取远程图片的本地 file:// URI，下载失败时返回 None"""
+        if not url:
             return None
+        path = await asset_cache.fetch(url)
+        return ImageHelper.get_image_uri(path) if path else None
+
+
+def _get_asset_urls(info: Any) -> list[str | None]:
+    """返回渲染信息卡片所需的图片资源URL"""
+    if isinstance(info, VideoInfo):
+        cover = info.pic if base_config.get("SEND_VIDEO_PIC", True) else None
+        return [cover, info.owner.face]
+    if isinstance(info, SeasonInfo):
+        return [info.target_ep_cover or info.cover]
+    if isinstance(info, UserInfo):
+        return [info.face, info.top_photo]
+    if isinstance(info, LiveInfo):
+        return [info.cover, info.face]
+    return []
+
+
+def prefetch_assets(info: Any):
+    """信息模型获取后立即在后台并行下载卡片所需图片，与消息构建过程重叠"""
+    asset_cache.prefetch(_get_asset_urls(info))
 
 
 class MessageBuilder:
@@ -90,11 +103,12 @@ class MessageBuilder:
         """构建视频信息消息"""
         segments = []
 
-        if base_config.get("SEND_VIDEO_PIC", True) and info.pic:
-            file_name = f"bili_video_cover_{info.bvid or info.aid}.jpg"
-            cover_path = IMAGE_CACHE_DIR / file_name
-            if await ImageHelper.download_image(info.pic, cover_path):
-                segments.append(Image(path=cover_path))
+        if (
+            base_config.get("SEND_VIDEO_PIC", True)
+            and info.pic
+            and (cover_path := await asset_cache.fetch(info.pic))
+        ):
+            segments.append(Image(path=cover_path))
 
         pub_date_str = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.pubdate))
 
@@ -132,11 +146,12 @@ class MessageBuilder:
         segments = []
         status_text = {0: "未开播", 1: "直播中", 2: "轮播中"}
 
-        if base_config.get("SEND_LIVE_PIC", True) and info.cover:
-            file_name = f"bili_live_cover_{info.room_id}.jpg"
-            cover_path = IMAGE_CACHE_DIR / file_name
-            if await ImageHelper.download_image(info.cover, cover_path):
-                segments.append(Image(path=cover_path))  # type: ignore
+        if (
+            base_config.get("SEND_LIVE_PIC", True)
+            and info.cover
+            and (cover_path := await asset_cache.fetch(info.cover))
+        ):
+            segments.append(Image(path=cover_path))  # type: ignore
 
         start_time_str = ""
         if info.live_status == 1 and info.live_start_time:
@@ -233,11 +248,12 @@ class MessageBuilder:
         segments = []
 
         send_cover_enabled = True
-        if send_cover_enabled and info.cover:
-            file_name = f"bili_season_cover_{info.season_id or info.media_id}.jpg"
-            cover_path = IMAGE_CACHE_DIR / file_name
-            if await ImageHelper.download_image(info.cover, cover_path):
-                segments.append(Image(path=cover_path))
+        if (
+            send_cover_enabled
+            and info.cover
+            and (cover_path := await asset_cache.fetch(info.cover))
+        ):
+            segments.append(Image(path=cover_path))
 
         status_text = {
             2: "未开播",
@@ -292,11 +308,8 @@ class MessageBuilder:
         """构建用户信息消息"""
         segments = []
 
-        if info.face:
-            avatar_filename = f"bili_avatar_{info.mid}.jpg"
-            avatar_path = IMAGE_CACHE_DIR / avatar_filename
-            if await ImageHelper.download_image(info.face, avatar_path):
-                segments.append(Image(path=avatar_path))
+        if info.face and (avatar_path := await asset_cache.fetch(info.face)):
+            segments.append(Image(path=avatar_path))
 
         live_status_text = " (直播中)" if info.live_room_status == 1 else ""
         birthday_str = f"生日: {info.birthday} | " if info.birthday else ""
@@ -323,39 +336,14 @@ class MessageBuilder:
         return UniMessage(segments)
 
 
-async def render_video_info_to_image(info: VideoInfo) -> bytes | None:
-    """渲染视频信息为图片"""
-    logger.debug("开始渲染 VideoInfo (style_blue with icons)")
-
-    cover_image_src = None
-    if base_config.get("SEND_VIDEO_PIC", True) and info.pic:
-        file_name = f"bili_video_cover_{info.bvid or info.aid}.jpg"
-        cover_path = IMAGE_CACHE_DIR / file_name
-
-        if not (cover_path.exists() and cover_path.stat().st_size > 0):
-            await ImageHelper.download_image(info.pic, cover_path)
-
-        cover_image_src = await ImageHelper.get_image_as_base64(cover_path)
-
-    up_avatar_src = None
-    if info.owner.face:
-        avatar_filename = f"bili_avatar_{info.owner.mid}.jpg"
-        avatar_path = IMAGE_CACHE_DIR / avatar_filename
-
-        if not (avatar_path.exists() and avatar_path.stat().st_size > 0):
-            await ImageHelper.download_image(info.owner.face, avatar_path)
-
-        up_avatar_src = await ImageHelper.get_image_as_base64(avatar_path)
-
+async def _fetch_hot_comments(aid: int, comment_count: int) -> list[dict]:
+    """获取视频的热门评论，失败时返回空列表"""
     comments_list = []
-    show_comments = True
-    comment_count = 3
-
-    if show_comments and comment_count > 0:
-        logger.debug(f"尝试获取视频 {info.aid} 的热门评论 (最多 {comment_count} 条)")
+    if comment_count > 0:
+        logger.debug(f"尝试获取视频 {aid} 的热门评论 (最多 {comment_count} 条)")
         try:
             c = await comment.get_comments(
-                oid=info.aid,
+                oid=aid,
                 type_=CommentResourceType.VIDEO,
                 order=OrderType.LIKE,
                 credential=bili_credential,
@@ -393,9 +381,49 @@ async def render_video_info_to_image(info: VideoInfo) -> bytes | None:
                             count += 1
                 logger.debug(f"成功获取到 {len(comments_list)} 条评论")
             else:
-                logger.debug(f"视频 {info.aid} 没有评论或获取失败")
+                logger.debug(f"视频 {aid} 没有评论或获取失败")
         except Exception as e:
-            logger.error(f"获取视频评论失败: {info.aid}", e=e)
+            logger.error(f"获取视频评论失败: {aid}", e=e)
+    return comments_list
+
+
+async def _render_template(
+    template_name: str, template_data: dict, width: int
+) -> bytes | None:
+    """渲染模板为图片，并记录模板数据大小与渲染耗时"""
+    payload_size = sum(len(str(v)) for v in template_data.values())
+    start_time = time.monotonic()
+    component = ui.template(path=TEMPLATE_DIR / template_name, data=template_data)
+    image_bytes = await ui.render(component, viewport={"width": width, "height": 10})
+    logger.debug(
+        f"渲染 {template_name} 完成: 模板数据 {payload_size / 1024:.1f}KB, "
+        f"耗时 {(time.monotonic() - start_time) * 1000:.0f}ms",
+        "B站解析",
+    )
+    return image_bytes
+
+
+@cached_render(
+    "style_blue_video",
+    # AI总结按分P获取，分P与元数据缓存键的 _p{n} 保持一致；封面开关也会改变卡片内容
+    lambda info: (
+        info.bvid or info.aid,
+        get_page_number(info.parsed_url),
+        base_config.get("SEND_VIDEO_PIC", True),
+        coarse_bucket(info.stat.view),
+        coarse_bucket(info.stat.like),
+    ),
+)
+async def render_video_info_to_image(info: VideoInfo) -> bytes | None:
+    """渲染视频信息为图片"""
+    logger.debug("开始渲染 VideoInfo (style_blue with icons)")
+
+    cover_url = info.pic if base_config.get("SEND_VIDEO_PIC", True) else None
+    cover_image_src, up_avatar_src, comments_list = await asyncio.gather(
+        ImageHelper.get_asset_uri(cover_url),
+        ImageHelper.get_asset_uri(info.owner.face),
+        _fetch_hot_comments(info.aid, comment_count=3),
+    )
 
     display_summary = None
     if info.ai_summary:
@@ -428,15 +456,21 @@ async def render_video_info_to_image(info: VideoInfo) -> bytes | None:
         "comments": comments_list,
         "online_count": info.online_count,
         "ai_summary": display_summary,
-        "font_van_base64": FONT_BASE64_CONTENT,
+        "font_van_url": FONT_URL,
     }
 
-    template_path = TEMPLATE_DIR / "style_blue_video.html"
-    component = ui.template(path=template_path, data=template_data)
-
-    return await ui.render(component, viewport={"width": 780, "height": 10})
+    return await _render_template("style_blue_video.html", template_data, 780)
 
 
+@cached_render(
+    "style_blue_season",
+    lambda info: (
+        info.season_id or info.media_id,
+        info.target_ep_id,
+        coarse_bucket(info.stat.views),
+        coarse_bucket(info.stat.likes),
+    ),
+)
 async def render_season_info_to_image(info: SeasonInfo) -> bytes | None:
     """渲染番剧信息为图片"""
     logger.debug("开始渲染 SeasonInfo (style_blue)")
@@ -444,16 +478,7 @@ async def render_season_info_to_image(info: SeasonInfo) -> bytes | None:
     cover_image_src = None
     cover_url_to_download = info.target_ep_cover or info.cover
     if cover_url_to_download:
-        file_prefix = (
-            f"bili_ep_cover_{info.target_ep_id}"
-            if info.target_ep_id
-            else f"bili_season_cover_{info.season_id or info.media_id}"
-        )
-        cover_path = IMAGE_CACHE_DIR / f"{file_prefix}.jpg"
-
-        if not (cover_path.exists() and cover_path.stat().st_size > 0):
-            await ImageHelper.download_image(cover_url_to_download, cover_path)
-        cover_image_src = await ImageHelper.get_image_as_base64(cover_path)
+        cover_image_src = await ImageHelper.get_asset_uri(cover_url_to_download)
     else:
         logger.warning(f"番剧/分集均无封面: {info.season_id or info.media_id}")
 
@@ -483,23 +508,37 @@ async def render_season_info_to_image(info: SeasonInfo) -> bytes | None:
         "like_count": format_number(stat_to_display.likes),
         "coin_count": format_number(stat_to_display.coins),
         "share_count": format_number(stat_to_display.share),
-        "font_van_base64": FONT_BASE64_CONTENT,
+        "font_van_url": FONT_URL,
     }
 
-    template_path = TEMPLATE_DIR / "style_blue_season.html"
-    component = ui.template(path=template_path, data=template_data)
-
-    return await ui.render(component, viewport={"width": 420, "height": 10})
+    return await _render_template("style_blue_season.html", template_data, 420)
 
 
+@cached_render(
+    "user_card",
+    lambda info: (
+        info.mid,
+        info.live_room_status,
+        coarse_bucket(info.stat.follower),
+        coarse_bucket(info.stat.likes),
+    ),
+)
 async def render_user_info_to_image(info: UserInfo) -> bytes | None:
     """使用 zhenxun.ui 渲染更美观的用户信息为图片"""
     logger.debug(f"开始使用 zhenxun.ui 渲染更美观的用户信息: {info.name}")
 
+    top_photo_url = (
+        info.top_photo
+        or "https://i0.hdslb.com/bfs/space/cb1c36594b2de665b1b10a22a30b4923e3e41b31.png"
+    )
+    top_photo_src, face_src = await asyncio.gather(
+        ImageHelper.get_asset_uri(top_photo_url),
+        ImageHelper.get_asset_uri(info.face),
+    )
+
     template_data = {
-        "top_photo": info.top_photo
-        or "https://i0.hdslb.com/bfs/space/cb1c36594b2de665b1b10a22a30b4923e3e41b31.png",
-        "face": info.face,
+        "top_photo": top_photo_src or top_photo_url,
+        "face": face_src or info.face,
         "name": info.name,
         "sign": info.sign or "这个人很神秘，什么都没有写...",
         "level": info.level,
@@ -512,15 +551,16 @@ async def render_user_info_to_image(info: UserInfo) -> bytes | None:
         "article_view": format_number(info.stat.article_view),
         "live_status": info.live_room_status,
         "live_title": info.live_room_title,
-        "font_van_base64": FONT_BASE64_CONTENT,
+        "font_van_url": FONT_URL,
     }
 
-    template_path = TEMPLATE_DIR / "user_card.html"
-    component = ui.template(path=template_path, data=template_data)
-
-    return await ui.render(component, viewport={"width": 500, "height": 10})
+    return await _render_template("user_card.html", template_data, 500)
 
 
+@cached_render(
+    "live_card",
+    lambda info: (info.room_id, info.live_status, info.title, info.live_start_time),
+)
 async def render_live_info_to_image(info: LiveInfo) -> bytes | None:
     """使用 zhenxun.ui 渲染直播间信息为图片"""
     logger.debug(f"开始使用 zhenxun.ui 渲染直播间信息: {info.title}")
@@ -533,9 +573,14 @@ async def render_live_info_to_image(info: LiveInfo) -> bytes | None:
             "%Y-%m-%d %H:%M", time.localtime(info.live_start_time)
         )
 
+    cover_src, face_src = await asyncio.gather(
+        ImageHelper.get_asset_uri(info.cover),
+        ImageHelper.get_asset_uri(info.face),
+    )
+
     template_data = {
-        "cover": info.cover,
-        "face": info.face,
+        "cover": cover_src or info.cover,
+        "face": face_src or info.face,
         "uname": info.uname,
         "title": info.title,
         "area_name": f"{info.parent_area_name} / {info.area_name}",
@@ -543,13 +588,10 @@ async def render_live_info_to_image(info: LiveInfo) -> bytes | None:
         "start_time": start_time_str,
         "description": plain_description,
         "keyframe": info.keyframe_url,
-        "font_van_base64": FONT_BASE64_CONTENT,
+        "font_van_url": FONT_URL,
     }
 
-    template_path = TEMPLATE_DIR / "live_card.html"
-    component = ui.template(path=template_path, data=template_data)
-
-    return await ui.render(component, viewport={"width": 500, "height": 10})
+    return await _render_template("live_card.html", template_data, 500)
 
 
 async def render_unimsg_to_image(message: UniMsg) -> bytes | None:
@@ -685,6 +727,7 @@ async def send_video_with_retry(bot, event, video_path: Path) -> bool:
     file_uri = "file:///" + path_str
     video_segment = V11MessageSegment.video(file_uri)
 
+    start_time = time.monotonic()
     try:
         await _send_video_core(bot, event, video_segment)
         logger.info(f"视频文件发送成功: {video_path.name}")
@@ -697,3 +740,5 @@ async def send_video_with_retry(bot, event, video_path: Path) -> bool:
             context={"video_path": str(video_path)},
             cause=e,
         ) from e
+    finally:
+        download_metrics.record_stage("upload", time.monotonic() - start_time)
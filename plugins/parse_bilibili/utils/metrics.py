@@ -0,0 +1,107 @@
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class DownloadTaskMetrics:
+    """单个下载任务各阶段的耗时与吞吐记录"""
+
+    title: str
+    created_at: float = field(default_factory=time.monotonic)
+    queue_wait: float | None = None
+    streams: dict[str, tuple[int, float]] = field(default_factory=dict)
+    stages: dict[str, float] = field(default_factory=dict)
+    cache_hit: bool = False
+    success: bool = False
+
+
+_current_task: ContextVar[DownloadTaskMetrics | None] = ContextVar(
+    "bili_download_task_metrics", default=None
+)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """计算百分位数（最近邻插值）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class DownloadMetrics:
+    """下载流程的埋点统计，仅保留最近 max_records 个任务"""
+
+    def __init__(self, max_records: int = 200):
+        self.records: deque[DownloadTaskMetrics] = deque(maxlen=max_records)
+
+    def start_task(self, title: str) -> DownloadTaskMetrics:
+        """为当前协程上下文创建任务记录"""
+        record = DownloadTaskMetrics(title=title)
+        _current_task.set(record)
+        return record
+
+    def finish_task(self, record: DownloadTaskMetrics, success: bool):
+        record.success = success
+        self.records.append(record)
+
+    @staticmethod
+    def current() -> DownloadTaskMetrics | None:
+        return _current_task.get()
+
+    def record_stage(self, stage: str, seconds: float):
+        """记录当前任务某个阶段（合并、转码、上传等）的耗时"""
+        if record := self.current():
+            record.stages[stage] = record.stages.get(stage, 0.0) + seconds
+
+    def record_stream(self, name: str, size_bytes: int, seconds: float):
+        """记录当前任务某个媒体流的下载字节数与耗时"""
+        if record := self.current():
+            record.streams[name] = (size_bytes, seconds)
+
+    def mark_cache_hit(self):
+        if record := self.current():
+            record.cache_hit = True
+
+    def summary(self) -> dict[str, Any]:
+        """汇总最近任务的成功率、各阶段耗时与吞吐的百分位数"""
+        records = list(self.records)
+        result: dict[str, Any] = {
+            "tasks": len(records),
+            "succeeded": sum(r.success for r in records),
+            "cache_hits": sum(r.cache_hit for r in records),
+        }
+
+        waits = [r.queue_wait for r in records if r.queue_wait is not None]
+        result["queue_wait"] = self._describe(waits)
+
+        stage_values: dict[str, list[float]] = {}
+        for r in records:
+            for stage, seconds in r.stages.items():
+                stage_values.setdefault(stage, []).append(seconds)
+        result["stages"] = {k: self._describe(v) for k, v in stage_values.items()}
+
+        throughput_values: dict[str, list[float]] = {}
+        for r in records:
+            for name, (size_bytes, seconds) in r.streams.items():
+                if seconds > 0:
+                    throughput_values.setdefault(name, []).append(size_bytes / seconds)
+        result["throughput"] = {
+            k: self._describe(v) for k, v in throughput_values.items()
+        }
+        return result
+
+    @staticmethod
+    def _describe(values: list[float]) -> dict[str, float]:
+        return {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "max": max(values, default=0.0),
+        }
+
+
+download_metrics = DownloadMetrics()
@@ -0,0 +1,107 @@
+import functools
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from zhenxun.services.log import logger
+
+from ..config import RENDER_CACHE_MAX_BYTES, RENDER_CACHE_TTL
+
+InfoT = TypeVar("InfoT")
+
+
+def coarse_bucket(num: int, significant_digits: int = 2) -> int:
+    """将统计数值按有效数字取整，用于缓存键，避免播放/点赞的细微变化导致缓存失效"""
+    if num <= 0:
+        return 0
+    magnitude = math.floor(math.log10(num)) - significant_digits + 1
+    if magnitude <= 0:
+        return num
+    factor = 10**magnitude
+    return round(num / factor) * factor
+
+
+class RenderCache:
+    """渲染结果（PNG字节）缓存，带TTL与总字节预算，超出预算时按LRU淘汰"""
+
+    def __init__(self, ttl: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[float, bytes]] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expire_at, data = entry
+        if time.monotonic() >= expire_at:
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def set(self, key: Hashable, data: bytes):
+        if self.ttl <= 0 or len(data) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, data)
+        self.total_bytes += len(data)
+        while self.total_bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def _remove(self, key: Hashable):
+        if entry := self._entries.pop(key, None):
+            self.total_bytes -= len(entry[1])
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+render_cache = RenderCache(RENDER_CACHE_TTL, RENDER_CACHE_MAX_BYTES)
+
+
+def cached_render(
+    template_name: str, key_func: Callable[[Any], tuple[Hashable, ...]]
+) -> Callable[
+    [Callable[[InfoT], Awaitable[bytes | None]]],
+    Callable[[InfoT], Awaitable[bytes | None]],
+]:
+    """为渲染函数添加结果缓存，缓存键为 (模板名, *key_func(info))"""
+
+    def decorator(
+        func: Callable[[InfoT], Awaitable[bytes | None]],
+    ) -> Callable[[InfoT], Awaitable[bytes | None]]:
+        @functools.wraps(func)
+        async def wrapper(info: InfoT) -> bytes | None:
+            key = (template_name, *key_func(info))
+            if (data := render_cache.get(key)) is not None:
+                logger.debug(f"渲染缓存命中: {key}", "B站解析")
+                return data
+            data = await func(info)
+            if data:
+                render_cache.set(key, data)
+            return data
+
+        return wrapper
+
+    return decorator
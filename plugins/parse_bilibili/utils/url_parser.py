@@ -251,6 +251,76 @@ UrlParserRegistry.register(BangumiUrlParser)
 UrlParserRegistry.register(PureVideoIdParser)
 
 
+class BilibiliUrlScanner:
+    """单次扫描的B站链接识别器
+
+    先用子串预筛快速排除绝大多数不含B站内容的消息，
+    命中后用一个合并了所有解析器规则的正则在同一次扫描中得到资源类型和ID。
+    """
+
+    KEYWORDS: ClassVar[tuple[str, ...]] = ("b23.tv", "bilibili.com")
+    PATTERN: ClassVar[Pattern] = re.compile(
+        r"b23\.tv/(?P<short>[A-Za-z0-9]+)"
+        r"|live\.bilibili\.com/(?P<live>\d+)"
+        r"|space\.bilibili\.com/(?P<user>\d+)"
+        r"|t\.bilibili\.com/(?P<opus_t>\d+)"
+        r"|bilibili\.com/read/(?P<article>cv\d+)"
+        r"|bilibili\.com/opus/(?P<opus>\d+)"
+        r"|bilibili\.com/bangumi/play/(?P<bangumi>ss\d+|ep\d+)"
+        r"|bilibili\.com/\S*?(?:video/(?P<video>av\d+|BV[A-Za-z0-9]+)"
+        r"|[?&]bvid=(?P<bvid>BV[A-Za-z0-9]+))"
+    )
+    PURE_ID_PATTERN: ClassVar[Pattern] = re.compile(
+        r"(?:av|AV)(\d+)|(?:bv|BV)([A-Za-z0-9]+)"
+    )
+    GROUP_TYPES: ClassVar[dict[str, ResourceType]] = {
+        "short": ResourceType.SHORT_URL,
+        "live": ResourceType.LIVE,
+        "user": ResourceType.USER,
+        "opus_t": ResourceType.OPUS,
+        "article": ResourceType.ARTICLE,
+        "opus": ResourceType.OPUS,
+        "bangumi": ResourceType.BANGUMI,
+        "video": ResourceType.VIDEO,
+        "bvid": ResourceType.VIDEO,
+    }
+    URL_TEMPLATES: ClassVar[dict[ResourceType, str]] = {
+        ResourceType.SHORT_URL: "https://b23.tv/{}",
+        ResourceType.LIVE: "https://live.bilibili.com/{}",
+        ResourceType.USER: "https://space.bilibili.com/{}",
+        ResourceType.ARTICLE: "https://www.bilibili.com/read/{}",
+        ResourceType.OPUS: "https://www.bilibili.com/opus/{}",
+        ResourceType.BANGUMI: "https://www.bilibili.com/bangumi/play/{}",
+        ResourceType.VIDEO: "https://www.bilibili.com/video/{}",
+    }
+
+    @classmethod
+    def scan(cls, text: str) -> tuple[ResourceType, str] | None:
+        """扫描文本，返回第一个B站资源的类型和ID；纯视频ID需独占整条消息"""
+        if not any(keyword in text for keyword in cls.KEYWORDS):
+            if text[:2] in ("av", "AV", "bv", "BV") and (
+                match := cls.PURE_ID_PATTERN.fullmatch(text)
+            ):
+                av_id, bv_id = match.groups()
+                return ResourceType.VIDEO, f"av{av_id}" if av_id else f"BV{bv_id}"
+            return None
+
+        match = cls.PATTERN.search(text)
+        if not match or not match.lastgroup:
+            return None
+        return cls.GROUP_TYPES[match.lastgroup], match.group(match.lastgroup)
+
+    @classmethod
+    def to_url(cls, resource_type: ResourceType, resource_id: str) -> str:
+        """生成扫描结果对应的规范链接，用于URL去重缓存与获取资源信息"""
+        return cls.URL_TEMPLATES[resource_type].format(resource_id)
+
+    @classmethod
+    def may_contain(cls, raw: str) -> bool:
+        """对小程序/卡片原始数据做子串预筛"""
+        return any(keyword in raw for keyword in cls.KEYWORDS)
+
+
 def _extract_url_from_hyper_or_json(raw_str: str) -> str | None:
     """从Hyper(小程序/JSON卡片)的原始数据中提取B站URL"""
     qqdocurl_match = re.search(r'"qqdocurl"\s*:\s*"([^"]+)"', raw_str)